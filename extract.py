@@ -0,0 +1,267 @@
+"""
+Extract Utility
+
+This module pulls a subset of fields and calls out of a generated dataset without loading
+it. The input (CSV, Parquet, Arrow IPC, or a Hive-partitioned directory) is scanned lazily
+with polars; the column selection and the agency, date and priority filters are pushed down
+into the scan, so Parquet row groups and partitions outside the filters are skipped and CSV
+rows are dropped while parsing. The date range is also applied to ``year``/``month``/``day``
+partition keys, so whole partitions outside it are never opened. The result is streamed
+straight to the output file.
+
+Usage:
+    python extract.py computer_aided_dispatch.parquet injector.csv \\
+        --columns address,problem,priority_number --agencies LAW --start-date 2024-03-01 \\
+        --end-date 2024-03-01
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import unquote
+
+import polars as pl
+
+from shared.constants import TIMESTAMP_FORMAT
+
+# Columns kept when none are given: what the injector needs to replay a call
+INJECTOR_COLUMNS = ["call_id", "event_time", "agency", "address", "problem", "priority_number"]
+
+# Part-file suffixes of a partitioned directory, in probing order, with their scanners
+PART_SCANNERS = [
+    (".parquet", pl.scan_parquet),
+    (".arrow", pl.scan_ipc),
+    (".csv", pl.scan_csv),
+    (".csv.gz", pl.scan_csv),
+    (".csv.zst", pl.scan_csv),
+]
+
+# Date partition keys, coarsest first; the date range prunes a leading run of them
+DATE_KEYS = ["year", "month", "day"]
+
+
+def _part_files(source):
+    """Return the suffix, scanner and files of the first part-file kind found under a directory."""
+    for suffix, scan in PART_SCANNERS:
+        files = sorted(source.rglob(f"*{suffix}"))
+        if files:
+            return suffix, scan, files
+    raise ValueError(f"No Parquet, Arrow or CSV files found under '{source}'.")
+
+
+def _hive_keys(source, path):
+    """Return the ``key=value`` partition keys of a part file; digit values become integers."""
+    keys = {}
+    for part in path.relative_to(source).parent.parts:
+        key, separator, value = part.partition("=")
+        if separator:
+            value = unquote(value)
+            keys[unquote(key)] = int(value) if value.isdigit() else value
+    return keys
+
+
+def partition_keys(source):
+    """
+    List the Hive partition keys of a dataset.
+
+    Args:
+        source (str or Path): Generated dataset; see scan_dataset().
+
+    Returns:
+        list: Partition key names, empty for a single file.
+    """
+    source = Path(source)
+    if not source.is_dir():
+        return []
+    _, _, files = _part_files(source)
+    return list(_hive_keys(source, files[0]))
+
+
+def scan_dataset(source, partitions=None):
+    """
+    Lazily scan a generated dataset.
+
+    Args:
+        source (str or Path): CSV, Parquet, Arrow or NDJSON file, or a Hive-partitioned directory
+            of Parquet, Arrow or (optionally compressed) CSV parts.
+        partitions (pl.Expr, optional): Predicate on the partition keys; parts outside it are
+            not scanned. Defaults to None (every part).
+
+    Returns:
+        pl.LazyFrame: The unevaluated dataset.
+
+    Raises:
+        ValueError: If the directory holds no Parquet, Arrow or CSV parts.
+    """
+    source = Path(source)
+    if source.is_dir():
+        _, scan, files = _part_files(source)
+        # Parts outside the partition predicate are dropped before anything is read
+        keys = [_hive_keys(source, path) for path in files]
+        if partitions is not None and keys[0]:
+            kept = pl.DataFrame(keys).with_row_index("_part").filter(partitions)["_part"].to_list()
+            # An empty selection still scans one part, so the frame keeps its schema
+            kept = kept or [0]
+            files, keys = [files[index] for index in kept], [keys[index] for index in kept]
+        if scan is not pl.scan_csv:
+            return scan(files, hive_partitioning=True)
+        # The CSV scanner has no Hive support: each part gets its keys as constant columns
+        return pl.concat(
+            [pl.scan_csv(path).with_columns(pl.lit(value).alias(key) for key, value in row.items())
+             for path, row in zip(files, keys)],
+            how="diagonal_relaxed",
+        )
+    suffix = source.suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return pl.scan_parquet(source)
+    if suffix in (".arrow", ".feather", ".ipc"):
+        return pl.scan_ipc(source)
+    if suffix in (".ndjson", ".jsonl"):
+        return pl.scan_ndjson(source)
+    return pl.scan_csv(source)
+
+
+def _date_partitions(keys, day, after):
+    """
+    Build the predicate keeping the date partitions that reach a day.
+
+    Args:
+        keys (list): Partition key names of the dataset.
+        day (date): Boundary day.
+        after (bool): Keep partitions ending on or after the day when True, starting on or
+            before it when False.
+
+    Returns:
+        pl.Expr: The predicate, or None without a ``year`` key.
+    """
+    date_keys = []
+    for key in DATE_KEYS:
+        if key not in keys:
+            break
+        date_keys.append(key)
+    if not date_keys:
+        return None
+    values = [day.year, day.month, day.day][:len(date_keys)]
+    strict, inclusive = ("gt", "ge") if after else ("lt", "le")
+    # Compare (year, month, day) lexicographically, down to the finest key present
+    predicate = getattr(pl.col(date_keys[-1]), inclusive)(values[-1])
+    for key, value in zip(reversed(date_keys[:-1]), reversed(values[:-1])):
+        predicate = getattr(pl.col(key), strict)(value) | ((pl.col(key) == value) & predicate)
+    return predicate
+
+
+def extract(source, output, columns=None, agencies=None, start_date=None, end_date=None, priorities=None):
+    """
+    Stream the selected columns of the matching calls from a dataset to an output file.
+
+    Args:
+        source (str or Path): Generated dataset; see scan_dataset().
+        output (str or Path): Output file; ``.parquet``, ``.arrow``, ``.ndjson``/``.jsonl``
+            or CSV otherwise.
+        columns (list, optional): Columns to keep. Defaults to INJECTOR_COLUMNS.
+        agencies (list, optional): Agencies to keep. Defaults to all.
+        start_date (str, optional): First day to keep, YYYY-MM-DD. Defaults to the first call.
+        end_date (str, optional): Last day to keep, inclusive. Defaults to the last call.
+        priorities (list, optional): Priority numbers to keep. Defaults to all.
+
+    Returns:
+        int: Number of calls written.
+
+    Raises:
+        ValueError: If a column is not in the dataset or a date is malformed.
+    """
+    keys = partition_keys(source)
+    partition_predicates = []
+    if agencies and "agency" in keys:
+        partition_predicates.append(pl.col("agency").cast(pl.Utf8).is_in(agencies))
+    days = {}
+    for bound, value in (("start", start_date), ("end", end_date)):
+        if not value:
+            continue
+        try:
+            days[bound] = date.fromisoformat(value)
+        except ValueError as exc:
+            raise ValueError(f"The {bound} date must be in YYYY-MM-DD format.") from exc
+        predicate = _date_partitions(keys, days[bound], after=bound == "start")
+        if predicate is not None:
+            partition_predicates.append(predicate)
+    partitions = pl.all_horizontal(partition_predicates) if partition_predicates else None
+
+    frame = scan_dataset(source, partitions)
+    schema = frame.collect_schema()
+    columns = columns or [column for column in INJECTOR_COLUMNS if column in schema]
+    missing = [column for column in columns if column not in schema]
+    if missing:
+        raise ValueError(f"Columns not in the dataset: {', '.join(missing)}.")
+
+    # CSV timestamps are compared as text, which sorts like the timestamps themselves
+    text_times = schema.get("event_time") == pl.Utf8
+    predicates = list(partition_predicates)
+    if agencies:
+        predicates.append(pl.col("agency").cast(pl.Utf8).is_in(agencies))
+    if priorities:
+        predicates.append(pl.col("priority_number").is_in([int(priority) for priority in priorities]))
+    for bound, operator in (("start", "ge"), ("end", "lt")):
+        if bound not in days:
+            continue
+        day = days[bound] + timedelta(days=1) if bound == "end" else days[bound]
+        limit = day.strftime(TIMESTAMP_FORMAT) if text_times else pl.lit(day).cast(pl.Datetime("us"))
+        predicates.append(getattr(pl.col("event_time"), operator)(limit))
+    if predicates:
+        frame = frame.filter(pl.all_horizontal(predicates))
+    frame = frame.select(columns)
+    if text_times and "event_time" in columns:
+        frame = frame.with_columns(pl.col("event_time").str.to_datetime(TIMESTAMP_FORMAT))
+
+    # Count the rows as they stream into the sink instead of reading the output back
+    batch_rows = []
+
+    def count_rows(batch):
+        batch_rows.append(len(batch))
+        return batch
+
+    frame = frame.map_batches(count_rows, streamable=True, schema=frame.collect_schema())
+    output = Path(output)
+    suffix = output.suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        frame.sink_parquet(output)
+    elif suffix in (".arrow", ".feather", ".ipc"):
+        frame.sink_ipc(output)
+    elif suffix in (".ndjson", ".jsonl"):
+        frame.sink_ndjson(output)
+    else:
+        frame.sink_csv(output, datetime_format=TIMESTAMP_FORMAT)
+    return sum(batch_rows)
+
+def main():
+    """Extract columns and calls from a generated dataset from the command line."""
+    parser = argparse.ArgumentParser(description="Extract columns and calls from a generated dataset")
+    parser.add_argument("source", help="Generated CSV, Parquet or Arrow file, or a partitioned directory")
+    parser.add_argument("output", help="Output file (.csv, .parquet, .arrow or .ndjson)")
+    parser.add_argument("--columns", type=str, default="",
+                        help=f"Comma-separated columns to keep (default: {','.join(INJECTOR_COLUMNS)})")
+    parser.add_argument("--agencies", type=str, default="", help="Comma-separated agencies to keep")
+    parser.add_argument("--start-date", type=str, default="", help="First day to keep (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=str, default="", help="Last day to keep, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--priorities", type=str, default="", help="Comma-separated priority numbers to keep")
+    args = parser.parse_args()
+
+    try:
+        count = extract(
+            args.source,
+            args.output,
+            columns=args.columns.split(",") if args.columns else None,
+            agencies=args.agencies.split(",") if args.agencies else None,
+            start_date=args.start_date or None,
+            end_date=args.end_date or None,
+            priorities=args.priorities.split(",") if args.priorities else None,
+        )
+    except (OSError, ValueError, pl.exceptions.PolarsError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Extracted {count} calls from {args.source} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,170 @@
 """
 CSV to JSON Serializer Utility
 
-This module provides a utility function to convert CSV files to JSON format.
-It includes an example usage that demonstrates how to create a sample CSV file
-and convert it to JSON for demonstration or testing purposes.
+This module converts CSV files, such as the generator's output, to NDJSON (one object per
+line) or to a JSON array. The CSV is read in batches and every batch is written out before
+the next one is read, so memory stays constant however large the file is. Column types are
+inferred once from the head of the file and every batch is parsed against them, so numbers
+are written as JSON numbers and timestamps as ISO-style strings rather than everything as
+text. A column whose later values do not fit its inferred type is widened (integer to
+float, anything to text) from that batch on instead of aborting the conversion.
+
+Usage:
+    python serializer.py computer_aided_dispatch.csv calls.ndjson
+    python serializer.py computer_aided_dispatch.csv calls.json --array
 """
 
-import csv
-import json
+import argparse
+import io
+import sys
+from itertools import islice
+from pathlib import Path
+
+import polars as pl
+import pyarrow as pa
+
+from shared.constants import TIMESTAMP_FORMAT
+
+# Rows read and written per batch
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Rows used to infer the column types
+SCHEMA_INFERENCE_ROWS = 10_000
+
+# Output suffixes written as NDJSON when the layout is not given
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
 
-def csv_to_json(csv_file_path, json_file_path):
+# Values starting like this are tried as timestamps and dates while inferring the types
+ISO_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}"
+
+# Next type tried for a column whose values no longer parse; other types fall back to text
+WIDER_TYPES = {pl.Int64: pl.Float64, pl.Float64: pl.Utf8}
+
+
+def _parse_column(column, dtype):
     """
-    Converts a CSV file to a JSON file.
+    Parse a text column as the given type.
+
+    Raises:
+        pl.exceptions.PolarsError or ValueError: If a value does not fit the type.
+    """
+    if dtype == pl.Datetime:
+        try:
+            # The generator's own format parses far faster than an inferred one
+            return column.str.to_datetime(TIMESTAMP_FORMAT, strict=True)
+        except pl.exceptions.PolarsError:
+            return column.str.to_datetime(strict=True)
+    if dtype == pl.Date:
+        return column.str.to_date(strict=True)
+    if dtype == pl.Boolean:
+        lowered = column.str.to_lowercase()
+        if not lowered.is_in(["true", "false"]).or_(lowered.is_null()).all():
+            raise ValueError(f"Column '{column.name}' holds values other than true and false.")
+        return lowered == "true"
+    return column.cast(dtype, strict=True)
+
+
+def _parse_batch(batch, schema):
+    """Parse a batch of text columns, widening in schema every column that does not fit."""
+    columns = []
+    for column in batch.get_columns():
+        while schema[column.name] != pl.Utf8:
+            try:
+                column = _parse_column(column, schema[column.name])
+                break
+            except (pl.exceptions.PolarsError, ValueError):
+                schema[column.name] = WIDER_TYPES.get(schema[column.name], pl.Utf8)
+        columns.append(column)
+    return pl.DataFrame(columns)
+
+
+def csv_to_json(csv_file_path, json_file_path, lines=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Converts a CSV file to an NDJSON or JSON array file, one batch at a time.
 
     Args:
         csv_file_path (str): The path to the input CSV file.
         json_file_path (str): The path to the output JSON file.
+        lines (bool, optional): Write NDJSON when True, a JSON array when False. Defaults to
+            NDJSON for ``.ndjson``/``.jsonl`` outputs and a JSON array otherwise.
+        chunk_size (int, optional): Rows per batch. Defaults to DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        int: Number of records written.
+
+    Raises:
+        ValueError: If chunk_size is not positive.
     """
-    data = []
-    with open(csv_file_path, mode='r', encoding='utf-8') as csv_file:
-        # Use DictReader to read each row as a dictionary where keys are CSV headers
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            data.append(row)
-
-    with open(json_file_path, mode='w', encoding='utf-8') as json_file:
-        # Write the list of dictionaries to the JSON file
-        # indent=4 for pretty-printing the JSON output
-        json.dump(data, json_file, indent=4)
-
-# Example usage:
-# Create a dummy CSV file for demonstration
-with open('input.csv', 'w', newline='', encoding='utf-8') as f:
-    writer = csv.writer(f)
-    writer.writerow(['Name', 'Age', 'City'])
-    writer.writerow(['John', '28', 'New York'])
-    writer.writerow(['Alice', '24', 'Los Angeles'])
-
-# Convert the CSV to JSON
-csv_to_json('input.csv', 'output.json')
-
-print("CSV file successfully converted to JSON.")
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be a positive integer.")
+    if lines is None:
+        lines = str(json_file_path).lower().endswith(NDJSON_SUFFIXES)
+    # Types come from the header and the first rows only; .gz and .zst inputs are decompressed
+    with pa.input_stream(str(csv_file_path), compression="detect") as stream:
+        head = b"".join(islice(io.BufferedReader(stream), SCHEMA_INFERENCE_ROWS + 1))
+    head = pl.read_csv(io.BytesIO(head), infer_schema_length=SCHEMA_INFERENCE_ROWS)
+    schema = dict(head.schema)
+    for name, dtype in schema.items():
+        if dtype == pl.Null:
+            # Columns empty throughout the head have no type to parse as, so they stay text
+            schema[name] = pl.Utf8
+        elif dtype == pl.Utf8 and head[name].str.contains(ISO_DATE_PATTERN).all():
+            # Timestamps are recognized here rather than by polars' much slower date inference
+            for temporal in (pl.Date, pl.Datetime):
+                try:
+                    _parse_column(head[name], temporal)
+                except (pl.exceptions.PolarsError, ValueError):
+                    continue
+                schema[name] = temporal
+                break
+    # Batches are read as text and parsed by _parse_batch, which can widen a column mid-file
+    reader = pl.read_csv_batched(
+        csv_file_path, schema_overrides={name: pl.Utf8 for name in schema}, batch_size=chunk_size
+    )
+
+    written = 0
+    try:
+        with open(json_file_path, mode="wb") as json_file:
+            if not lines:
+                json_file.write(b"[")
+            while batches := reader.next_batches(1):
+                batch = _parse_batch(batches[0], schema)
+                if lines:
+                    batch.write_ndjson(json_file)
+                else:
+                    # Records never contain raw newlines, so the line breaks separate the objects
+                    text = batch.write_ndjson().rstrip("\n").replace("\n", ",\n")
+                    json_file.write((("," if written else "") + text).encode("utf-8"))
+                written += len(batch)
+            if not lines:
+                json_file.write(b"]\n")
+    except BaseException:
+        # Never leave a truncated JSON file behind
+        Path(json_file_path).unlink(missing_ok=True)
+        raise
+    return written
+
+def main():
+    """Convert a CSV file to NDJSON or a JSON array from the command line."""
+    parser = argparse.ArgumentParser(description="Convert a CSV file to NDJSON or a JSON array")
+    parser.add_argument("csv_file", help="Input CSV file")
+    parser.add_argument("json_file", help="Output JSON file")
+    layout = parser.add_mutually_exclusive_group()
+    layout.add_argument("--ndjson", dest="lines", action="store_true", default=None,
+                        help="Write one JSON object per line (default for .ndjson/.jsonl outputs)")
+    layout.add_argument("--array", dest="lines", action="store_false",
+                        help="Write a single JSON array (default for other outputs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows read and written per batch (default: {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    try:
+        records = csv_to_json(args.csv_file, args.json_file, lines=args.lines, chunk_size=args.chunk_size)
+    except (OSError, ValueError, pl.exceptions.PolarsError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Converted {records} records from {args.csv_file} to {args.json_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Real address points for the Synth911 application.
+
+An address file (CSV or Parquet) is converted once into an uncompressed Arrow IPC cache,
+which later runs open memory-mapped: the columns are read straight from the page cache, so
+several worker processes sampling the same county file share one copy of it. Rows are
+weighted by configurable attribute terms, such as a population column or a land-use
+category multiplier.
+
+Whether the addresses come from a file or from the Faker pool, an AddressModel makes their
+popularity realistic: Zipf-like weights make a few addresses produce many calls, and
+address classes (shelters, bars, nursing homes) attract particular call types. Rather than
+one table per call type, each call first picks an address class from its call type's small
+class distribution, then an address from that class's alias table, so every row costs O(1)
+and all tables are built once per run.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from shared.catalog import default_cache_dir
+from shared.sampling import AliasTable
+
+# Bump whenever the layout of the converted cache changes
+CACHE_FORMAT_VERSION = 1
+
+# Accepted source column names, mapped to the names used in the cache
+COLUMN_ALIASES = {
+    "address": ("address", "full_address", "street_address"),
+    "latitude": ("latitude", "lat", "y"),
+    "longitude": ("longitude", "lon", "lng", "long", "x"),
+}
+
+# Exponent of the Zipf-like popularity curve; 0 gives every address the same weight
+DEFAULT_ADDRESS_SKEW = 0.7
+
+# Address classes: share of the pool, popularity boost, and call types they attract
+DEFAULT_ADDRESS_CLASSES = {
+    "SHELTER": {
+        "share": 0.004,
+        "weight": 15.0,
+        "affinity": {
+            "MENTAL HEALTH": 6.0, "DISORDERLY CONDUCT": 6.0, "OVERDOSE ALS": 6.0,
+            "ASSAULT": 4.0, "TRESPASSING": 4.0, "WELFARE CHECK": 4.0, "SICK PERSON BLS": 3.0,
+        },
+    },
+    "BAR": {
+        "share": 0.006,
+        "weight": 8.0,
+        "affinity": {
+            "DISORDERLY CONDUCT": 8.0, "ASSAULT": 6.0, "DWI - DRUNK/INTOX DRIVER": 5.0,
+            "NOISE COMPLAINT IN PROG": 5.0, "ASSAULT ALS": 4.0, "STABBING": 4.0, "SHOOTING": 3.0,
+        },
+    },
+    "NURSING HOME": {
+        "share": 0.004,
+        "weight": 12.0,
+        "affinity": {
+            "FALL BLS": 10.0, "ROUTINE TRANSPORT": 10.0, "SICK PERSON BLS": 8.0,
+            "MEDICAL ALARM": 6.0, "ALTERED LOC ALS": 6.0, "TROUBLE BREATHING ALS": 5.0,
+            "UNCONSCIOUS ALS": 4.0, "CARDIAC ARREST ALS": 3.0, "FIRE ALARM": 3.0,
+        },
+    },
+}
+
+
+def _normalize(frame):
+    """Rename the address and coordinate columns of a source frame to their cache names."""
+    lowered = {column.lower(): column for column in frame.columns}
+    renames = {}
+    for target, candidates in COLUMN_ALIASES.items():
+        for candidate in candidates:
+            if candidate in lowered:
+                renames[lowered[candidate]] = target
+                break
+    if "address" not in renames.values():
+        raise ValueError(f"Address file needs one of the columns {COLUMN_ALIASES['address']}.")
+    frame = frame.rename(renames)
+    for coordinate in ("latitude", "longitude"):
+        if coordinate in frame.columns:
+            frame = frame.with_columns(pl.col(coordinate).cast(pl.Float64))
+    return frame.with_columns(pl.col("address").cast(pl.Utf8)).filter(pl.col("address").is_not_null())
+
+
+def convert_addresses(path, cache_path):
+    """
+    Convert a CSV or Parquet address file into an Arrow IPC cache.
+
+    The cache is written next to its destination and renamed into place, so concurrent
+    runs never map a partially written file.
+
+    Args:
+        path (Path): Source address file.
+        cache_path (Path): Destination cache file.
+    """
+    if path.suffix.lower() in (".parquet", ".pq"):
+        frame = pl.read_parquet(path)
+    else:
+        frame = pl.read_csv(path, infer_schema_length=10000)
+    frame = _normalize(frame)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    frame.write_ipc(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, cache_path)
+
+
+class AddressSource:
+    """
+    Memory-mapped address points.
+
+    Args:
+        frame (pl.DataFrame): Address points with an ``address`` column and optional
+            ``latitude``/``longitude`` and attribute columns.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.has_coordinates = {"latitude", "longitude"} <= set(frame.columns)
+
+    def weights(self, terms=None):
+        """
+        Compute the sampling weight of every address point.
+
+        Each term multiplies the weights: ``column`` multiplies by a numeric column, and
+        ``column:VALUE:factor`` multiplies the rows whose column equals VALUE by factor.
+
+        Args:
+            terms (list, optional): Weight terms. Defaults to equal weights.
+
+        Returns:
+            np.ndarray: Weight per address point.
+
+        Raises:
+            ValueError: If a term names an unknown column or is malformed.
+        """
+        weight = pl.lit(1.0)
+        for term in terms or []:
+            parts = term.split(":")
+            column = parts[0]
+            if column not in self.frame.columns:
+                raise ValueError(f"Address weight column '{column}' is not in the address file.")
+            if len(parts) == 1:
+                weight = weight * pl.col(column).cast(pl.Float64).fill_null(0.0)
+            elif len(parts) == 3:
+                try:
+                    factor = float(parts[2])
+                except ValueError as exc:
+                    raise ValueError(f"Address weight term '{term}' needs a numeric factor.") from exc
+                weight = weight * pl.when(pl.col(column).cast(pl.Utf8) == parts[1]).then(factor).otherwise(1.0)
+            else:
+                raise ValueError(f"Address weight term '{term}' must be 'column' or 'column:VALUE:factor'.")
+        return self.frame.select(weight.alias("weight"))["weight"].to_numpy().clip(min=0.0)
+
+    def columns(self, rows):
+        """
+        Return the address and, when available, coordinate columns of the given rows.
+
+        Args:
+            rows (np.ndarray): Row indices, such as those drawn by an AddressModel.
+
+        Returns:
+            list: pl.Series for ``address`` and optionally ``latitude`` and ``longitude``.
+        """
+        names = ["address", "latitude", "longitude"] if self.has_coordinates else ["address"]
+        return [self.frame[name].gather(rows) for name in names]
+
+
+class AddressModel:
+    """
+    Address popularity with call-type affinity.
+
+    Args:
+        weights (np.ndarray): Base weight of every address (1.0 for a plain pool).
+        catalog (CallTypeCatalog): Catalog whose call-type codes the calls use.
+        rng (np.random.Generator): Random generator for the popularity ranks and the class
+            assignment.
+        skew (float, optional): Zipf exponent; address ``k`` in a random ranking gets weight
+            ``1 / k ** skew``. Defaults to DEFAULT_ADDRESS_SKEW.
+        classes (dict, optional): Class name mapped to ``share``, ``weight`` and ``affinity``
+            (call-type name to multiplier). Defaults to DEFAULT_ADDRESS_CLASSES.
+        labels (np.ndarray, optional): Class name of every address, e.g. from an
+            ``address_class`` column; by default addresses are assigned at random by share.
+
+    Raises:
+        ValueError: If the skew is negative, a class is malformed, or no address has weight.
+    """
+
+    def __init__(self, weights, catalog, rng, skew=DEFAULT_ADDRESS_SKEW, classes=None, labels=None):
+        weights = np.asarray(weights, dtype=np.float64)
+        if skew < 0:
+            raise ValueError("Address skew must not be negative.")
+        classes = DEFAULT_ADDRESS_CLASSES if classes is None else classes
+        self.class_names = ["GENERAL"] + list(classes)
+        size = len(weights)
+
+        # Class code of every address; code 0 holds the addresses of no particular class
+        codes = np.zeros(size, dtype=np.int64)
+        if labels is not None:
+            for code, name in enumerate(self.class_names[1:], start=1):
+                codes[np.asarray(labels) == name] = code
+        else:
+            order = rng.permutation(size)
+            start = 0
+            for code, spec in enumerate(classes.values(), start=1):
+                count = int(round(float(spec.get("share", 0.0)) * size))
+                codes[order[start:start + count]] = code
+                start += count
+            if start > size:
+                raise ValueError("Address class shares add up to more than the whole pool.")
+
+        # Zipf-like popularity over a random ranking, boosted by the address's class
+        ranks = rng.permutation(size) + 1
+        boosts = np.array([1.0] + [float(spec.get("weight", 1.0)) for spec in classes.values()])
+        popularity = weights * ranks.astype(np.float64) ** -float(skew) * boosts[codes]
+        if popularity.sum() <= 0:
+            raise ValueError("Address weights must not all be zero.")
+
+        # One alias table per class over its own addresses
+        self._members = []
+        self._tables = []
+        mass = np.zeros(len(self.class_names))
+        for code in range(len(self.class_names)):
+            members = np.flatnonzero(codes == code)
+            mass[code] = popularity[members].sum()
+            self._members.append(members)
+            self._tables.append(AliasTable(popularity[members]) if mass[code] > 0 else None)
+
+        # P(class | call type) is the class's popularity mass times its affinity multiplier
+        affinity = np.ones((len(catalog.names), len(self.class_names)))
+        for code, spec in enumerate(classes.values(), start=1):
+            for problem, factor in spec.get("affinity", {}).items():
+                # Affinities for call types missing from a custom catalog are skipped
+                if problem in catalog.index:
+                    affinity[catalog.index[problem], code] = float(factor)
+        if (affinity < 0).any():
+            raise ValueError("Address class affinities must not be negative.")
+        table = affinity * mass
+        table[table.sum(axis=1) <= 0] = mass
+        cdf = np.cumsum(table, axis=1) / table.sum(axis=1, keepdims=True)
+        cdf[:, -1] = 1.0
+        self._class_cdf = cdf
+
+    def sample(self, problem_codes, rng):
+        """
+        Draw an address for each call, given its call type.
+
+        Args:
+            problem_codes (np.ndarray): Call-type code of each call.
+            rng (np.random.Generator): Random generator to draw from.
+
+        Returns:
+            np.ndarray: Address indices.
+        """
+        cdf = self._class_cdf[np.asarray(problem_codes, dtype=np.int64)]
+        class_codes = (cdf <= rng.random(len(cdf))[:, None]).sum(axis=1)
+        rows = np.empty(len(class_codes), dtype=np.int64)
+        for code, (members, table) in enumerate(zip(self._members, self._tables)):
+            calls = np.flatnonzero(class_codes == code)
+            if len(calls):
+                rows[calls] = members[table.sample(len(calls), rng)]
+        return rows
+
+
+def load_address_classes(path):
+    """
+    Load address class definitions from a JSON file shaped like DEFAULT_ADDRESS_CLASSES.
+
+    Args:
+        path (str or Path): Address class JSON file; ``{}`` disables the classes.
+
+    Returns:
+        dict: Class name mapped to its ``share``, ``weight`` and ``affinity``.
+
+    Raises:
+        ValueError: If the file is not a JSON object of class objects.
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(data, dict) or not all(isinstance(spec, dict) for spec in data.values()):
+        raise ValueError("Address classes must be a JSON object of class objects.")
+    return data
+
+
+_LOADED_SOURCES = {}
+
+
+def load_address_source(path, cache_dir=None):
+    """
+    Open an address file, converting it to a memory-mapped cache on first use.
+
+    The cache is keyed by the file's resolved path, size and modification time.
+
+    Args:
+        path (str or Path): CSV or Parquet address file.
+        cache_dir (str or Path, optional): Directory for converted caches. Defaults to default_cache_dir().
+
+    Returns:
+        AddressSource: The mapped address points.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    digest = hashlib.sha256(
+        f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{CACHE_FORMAT_VERSION}".encode()
+    ).hexdigest()[:16]
+    if digest in _LOADED_SOURCES:
+        return _LOADED_SOURCES[digest]
+
+    cache_path = Path(cache_dir or default_cache_dir()) / f"addresses-{path.stem}-{digest}.arrow"
+    if not cache_path.exists():
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        convert_addresses(path, cache_path)
+    source = AddressSource(pl.read_ipc(cache_path, memory_map=True))
+    _LOADED_SOURCES[digest] = source
+    return source
@@ -0,0 +1,283 @@
+"""
+Agency registry for the Synth911 application.
+
+An agency belongs to a discipline (LAW, EMS, FIRE, RESCUE, ...) and inherits that
+discipline's call-type table from the catalog, optionally re-weighted by its own call mix.
+Agencies are grouped into PSAPs (public safety answering points), each with its own
+call-taker and dispatcher rosters. All per-agency attributes are held as arrays indexed by
+agency code, so sampling and call_id sequencing cost the same for 4 agencies or 40.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+# call_id prefixes of the built-in single-discipline agencies
+DEFAULT_PREFIXES = {"LAW": "L", "EMS": "M", "FIRE": "F", "RESCUE": "R"}
+
+# PSAP name used when the registry does not define any
+DEFAULT_PSAP = "PSAP"
+
+
+class Agency:
+    """
+    A single agency entry of the registry.
+
+    Args:
+        name (str): Agency name, as written to the ``agency`` column.
+        discipline (str): Catalog discipline whose call types the agency handles.
+        prefix (str): call_id prefix, unique per agency.
+        psap (str): Name of the PSAP that answers the agency's calls.
+        share (float): Default share of calls.
+        call_mix (dict, optional): Call-type name mapped to a weight multiplier.
+        start_number (int, optional): First call_id sequence number; random when None.
+        units (int, optional): Number of units in the agency's fleet; a default is used when None.
+        unit_means (list, optional): Mean number of extra units sent per priority 1-5;
+            the discipline default is used when None.
+        duration_scales (dict, optional): Duration column mapped to five scale factors, one
+            per priority; the defaults are used for columns not listed.
+    """
+
+    def __init__(self, name, discipline, prefix, psap=DEFAULT_PSAP, share=1.0, call_mix=None,
+                 start_number=None, units=None, unit_means=None, duration_scales=None):
+        self.name = name
+        self.discipline = discipline
+        self.prefix = prefix
+        self.psap = psap
+        self.share = float(share)
+        self.call_mix = dict(call_mix or {})
+        self.start_number = start_number
+        self.units = units
+        self.unit_means = unit_means
+        self.duration_scales = dict(duration_scales or {})
+
+
+class AgencyRegistry:
+    """
+    Agencies and PSAPs of a simulated region, compiled against a call-type catalog.
+
+    Args:
+        agencies (list): Agency entries.
+        catalog (CallTypeCatalog): Catalog supplying each discipline's call types.
+        psap_names (dict, optional): PSAP name mapped to its roster size per shift.
+    """
+
+    def __init__(self, agencies, catalog, psap_names=None):
+        if not agencies:
+            raise ValueError("Agency registry must define at least one agency.")
+        self.agencies = list(agencies)
+        self.catalog = catalog
+        self.names = [agency.name for agency in self.agencies]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Agency names must be unique.")
+        prefixes = [agency.prefix for agency in self.agencies]
+        if len(set(prefixes)) != len(prefixes):
+            raise ValueError("Agency call_id prefixes must be unique.")
+        self.prefixes = pl.Series("prefix", prefixes, dtype=pl.Utf8)
+        self.shares = np.array([agency.share for agency in self.agencies], dtype=np.float64)
+        self.discipline_codes = np.array(
+            [catalog.discipline_code(agency.discipline) for agency in self.agencies], dtype=np.int16
+        )
+
+        psap_names = dict(psap_names or {})
+        for agency in self.agencies:
+            psap_names.setdefault(agency.psap, None)
+        self.psaps = list(psap_names)
+        self.roster_sizes = psap_names
+        self.psap_codes = np.array([self.psaps.index(agency.psap) for agency in self.agencies], dtype=np.int16)
+        self.agency_dtype = pl.Enum(self.names)
+        self.psap_dtype = pl.Enum(self.psaps)
+
+        # Agencies with the same discipline and call mix share one call-type distribution
+        mix_keys = [(agency.discipline, tuple(sorted(agency.call_mix.items()))) for agency in self.agencies]
+        unique_keys = list(dict.fromkeys(mix_keys))
+        self.mix_ids = np.array([unique_keys.index(key) for key in mix_keys], dtype=np.int64)
+        self._mix_weights = []
+        for discipline, call_mix in unique_keys:
+            codes = catalog.codes_for(discipline)
+            weights = catalog.weights[codes].copy()
+            for name, multiplier in call_mix:
+                if name not in catalog.index or catalog.index[name] not in codes:
+                    raise ValueError(f"Call mix entry '{name}' is not a {discipline} call type.")
+                weights[np.flatnonzero(codes == catalog.index[name])] *= float(multiplier)
+            self._mix_weights.append((codes, weights))
+
+    @property
+    def multi_psap(self):
+        """True when the registry answers calls at more than one PSAP."""
+        return len(self.psaps) > 1
+
+    def indices(self, names):
+        """Return the agency codes of the given agency names, in registry order."""
+        return [code for code, name in enumerate(self.names) if name in names]
+
+    def selected_share(self, agency_code, mask):
+        """
+        Return the share of an agency's call mix held by the call types in a selection mask.
+
+        Args:
+            agency_code (int): Agency code.
+            mask (np.ndarray): Selection mask from CallTypeCatalog.selection_mask().
+
+        Returns:
+            float: Share of the agency's sampling weight that matches the selection.
+        """
+        codes, weights = self._mix_weights[self.mix_ids[agency_code]]
+        total = weights.sum()
+        if total <= 0:
+            return 0.0
+        return float(weights[mask[codes]].sum() / total)
+
+    def sample_problems(self, agency_codes, rng, mask=None):
+        """
+        Draw a call-type code for each call from its agency's call mix.
+
+        The cumulative distributions of all call mixes are laid end to end, mix ``m``
+        occupying the interval ``(m, m + 1]``. Each row then draws ``mix_id + u`` and a
+        single searchsorted over the concatenated table finds its call type, so the work
+        does not grow with the number of agencies.
+
+        Args:
+            agency_codes (np.ndarray): Agency code of each call.
+            rng (np.random.Generator): Random generator to draw from.
+            mask (np.ndarray, optional): Restrict draws to the call types in this selection mask.
+
+        Returns:
+            np.ndarray: Call-type codes.
+        """
+        all_codes, all_cdf = [], []
+        for mix_id, (codes, weights) in enumerate(self._mix_weights):
+            if mask is not None:
+                weights = np.where(mask[codes], weights, 0.0)
+            total = weights.sum()
+            cdf = np.zeros(len(weights))
+            if total > 0:
+                cdf = np.cumsum(weights) / total
+                # Pin the top of the distribution so rounding never spills into the next mix
+                cdf[np.flatnonzero(weights)[-1]:] = 1.0
+            all_codes.append(codes)
+            all_cdf.append(mix_id + cdf)
+        codes_table = np.concatenate(all_codes)
+        cdf_table = np.concatenate(all_cdf)
+        keys = self.mix_ids[agency_codes] + rng.random(len(agency_codes))
+        positions = np.searchsorted(cdf_table, keys, side="right")
+        return codes_table[np.minimum(positions, len(codes_table) - 1)].astype(np.uint32)
+
+    def start_numbers(self, start_date_dt, rng):
+        """
+        Return the first call_id sequence number of every agency.
+
+        Numbering restarts at 1 on January 1st; otherwise a random number between 1000
+        and 100000 is used unless the agency pins its own ``start_number``.
+
+        Args:
+            start_date_dt (datetime): Start of the generated date range.
+            rng (np.random.Generator): Random generator to draw from.
+
+        Returns:
+            np.ndarray: Next sequence number per agency.
+        """
+        if start_date_dt.month == 1 and start_date_dt.day == 1:
+            numbers = np.ones(len(self.agencies), dtype=np.int64)
+        else:
+            numbers = rng.integers(1000, 100001, size=len(self.agencies))
+        for code, agency in enumerate(self.agencies):
+            if agency.start_number is not None:
+                numbers[code] = int(agency.start_number)
+        return numbers
+
+    def assign_call_ids(self, agency_codes, year_suffix, counters):
+        """
+        Build sequential per-agency call_ids for a batch of calls in time order.
+
+        Args:
+            agency_codes (np.ndarray): Agency code of each call, in event_time order.
+            year_suffix (str): Two-digit year written in front of each call_id.
+            counters (np.ndarray): Next sequence number per agency; updated in place so
+                the following batch continues the sequences.
+
+        Returns:
+            pl.Series: call_id strings such as ``24-L000123``.
+        """
+        counts = np.bincount(agency_codes, minlength=len(self.agencies))
+        order = np.argsort(agency_codes, kind="stable")
+        group_starts = np.cumsum(counts) - counts
+        ranks = np.empty(len(agency_codes), dtype=np.int64)
+        ranks[order] = np.arange(len(agency_codes)) - np.repeat(group_starts, counts)
+        numbers = counters[agency_codes] + ranks
+        counters += counts
+
+        call_ids = pl.DataFrame({
+            "prefix": self.prefixes.gather(agency_codes),
+            "number": numbers,
+        }).select(
+            pl.concat_str(
+                pl.lit(f"{year_suffix}-"),
+                pl.col("prefix"),
+                pl.col("number").cast(pl.Utf8).str.zfill(6),
+            ).alias("call_id")
+        )
+        return call_ids.to_series()
+
+
+def default_registry(catalog):
+    """
+    Build the built-in registry: one agency per catalog discipline, answered by one PSAP.
+
+    Args:
+        catalog (CallTypeCatalog): The call-type catalog.
+
+    Returns:
+        AgencyRegistry: The default registry.
+    """
+    agencies = [
+        Agency(
+            name=discipline,
+            discipline=discipline,
+            prefix=DEFAULT_PREFIXES.get(discipline, discipline[:1]),
+            share=share,
+        )
+        for discipline, share in zip(catalog.disciplines, catalog.shares)
+    ]
+    return AgencyRegistry(agencies, catalog)
+
+
+def load_registry(path, catalog):
+    """
+    Load an agency registry from a JSON file.
+
+    The file holds an optional ``psaps`` list (``name`` and optional ``num_names``) and an
+    ``agencies`` list whose entries take the Agency arguments.
+
+    Args:
+        path (str or Path): Registry JSON file.
+        catalog (CallTypeCatalog): The call-type catalog.
+
+    Returns:
+        AgencyRegistry: The compiled registry.
+
+    Raises:
+        ValueError: If the registry is malformed.
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    psap_names = {psap["name"]: psap.get("num_names") for psap in data.get("psaps", [])}
+    agencies = []
+    for entry in data.get("agencies", []):
+        try:
+            agencies.append(Agency(
+                name=entry["name"],
+                discipline=entry["discipline"],
+                prefix=entry.get("prefix", entry["name"][:1]),
+                psap=entry.get("psap", next(iter(psap_names), DEFAULT_PSAP)),
+                share=entry.get("share", 1.0),
+                call_mix=entry.get("call_mix"),
+                start_number=entry.get("start_number"),
+                units=entry.get("units"),
+                unit_means=entry.get("unit_means"),
+                duration_scales=entry.get("duration_scales"),
+            ))
+        except KeyError as exc:
+            raise ValueError(f"Agency entry is missing required field {exc}.") from exc
+    return AgencyRegistry(agencies, catalog, psap_names)
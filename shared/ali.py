@@ -0,0 +1,155 @@
+"""
+ALI-style fixed-width records for the Synth911 application.
+
+Legacy CAD interfaces take Automatic Location Identification spills and similar
+fixed-width text records. A layout lists the record's fields in order, each with a width,
+a source column (or a constant value), and optional timestamp format, value map,
+alignment and fill character. Every field is rendered for a whole batch at once with
+polars string padding and slicing, the fields are concatenated into one record column, and
+the records are written to a buffered binary file.
+"""
+
+import json
+from pathlib import Path
+
+import polars as pl
+
+from shared.writers import BatchWriter, writer_format
+
+# Call-back numbers are not generated with the calls, so one is derived from the call_id in
+# the fictitious 555 area code. The digits are an affine mix, modulo 10**7, of the call_id's
+# number and its agency letters read in base 36; plain integer arithmetic, unlike a hash,
+# gives the same call the same number on every platform and polars version
+_CALLBACK_MODULUS = 10_000_000
+_CALL_NUMBER = pl.col("call_id").str.replace_all(r"\D", "").str.slice(-15).str.to_integer(strict=False)
+_CALL_LETTERS = (
+    pl.col("call_id").str.replace_all(r"[^A-Za-z]", "").str.slice(-12).str.to_integer(base=36, strict=False)
+)
+_CALLBACK_DIGITS = (
+    ((_CALL_NUMBER % _CALLBACK_MODULUS) * 7_368_787 + (_CALL_LETTERS.fill_null(0) % _CALLBACK_MODULUS) * 1_299_709
+     + 5_550_911) % _CALLBACK_MODULUS
+).cast(pl.Utf8).str.zfill(7)
+CALLBACK_NUMBER = pl.concat_str(
+    pl.lit("(555) "), _CALLBACK_DIGITS.str.slice(0, 3), pl.lit("-"), _CALLBACK_DIGITS.str.slice(3, 4)
+)
+
+# Derived columns a layout can use besides the generated ones
+DERIVED_COLUMNS = {"callback_number": CALLBACK_NUMBER}
+
+# ALI-style spill: class of service from the reception method, then call-back number,
+# timestamps, location and routing
+DEFAULT_ALI_LAYOUT = {
+    "terminator": "\r\n",
+    "fields": [
+        {"name": "record_type", "width": 3, "value": "ALI"},
+        {"name": "class_of_service", "width": 4, "column": "call_reception",
+         "map": {"E-911": "WPH2", "PHONE": "RESD", "OFFICER": "OTHR", "TEXT": "TEXT", "C2C": "VOIP"}},
+        {"name": "callback_number", "width": 14, "column": "callback_number"},
+        {"name": "date", "width": 8, "column": "event_time", "format": "%m/%d/%y"},
+        {"name": "time", "width": 8, "column": "event_time", "format": "%H:%M:%S"},
+        {"name": "call_id", "width": 12, "column": "call_id"},
+        {"name": "address", "width": 40, "column": "address"},
+        {"name": "agency", "width": 8, "column": "agency"},
+        {"name": "priority", "width": 2, "column": "priority_number", "align": "right", "fill": "0"},
+    ],
+}
+
+
+def _field(spec, schema):
+    """Return the expression rendering one layout field at its exact width."""
+    width = int(spec.get("width", 0))
+    if width < 1:
+        raise ValueError(f"ALI field '{spec.get('name')}' needs a positive width.")
+    fill = str(spec.get("fill", " "))
+    if len(fill) != 1:
+        raise ValueError(f"ALI field '{spec.get('name')}' needs a single fill character.")
+    if "value" in spec:
+        value = pl.lit(str(spec["value"]))
+    else:
+        column = spec.get("column")
+        if column in DERIVED_COLUMNS and column not in schema:
+            value = DERIVED_COLUMNS[column]
+        elif column in schema:
+            value = pl.col(column)
+        else:
+            raise ValueError(f"ALI field '{spec.get('name')}' uses unknown column '{column}'.")
+        if "format" in spec:
+            value = value.dt.strftime(spec["format"])
+        value = value.cast(pl.Utf8)
+        if "map" in spec:
+            value = value.replace(spec["map"])
+    value = value.fill_null("")
+    if spec.get("align", "left") == "right":
+        # Right-aligned fields keep their last characters when too long
+        return value.str.pad_start(width, fill).str.slice(-width)
+    return value.str.pad_end(width, fill).str.slice(0, width)
+
+
+def load_ali_layout(path):
+    """
+    Load a fixed-width layout from a JSON file shaped like DEFAULT_ALI_LAYOUT.
+
+    Args:
+        path (str or Path): Layout JSON file.
+
+    Returns:
+        dict: The layout.
+
+    Raises:
+        ValueError: If the layout has no fields.
+    """
+    layout = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(layout, dict) or not layout.get("fields"):
+        raise ValueError("ALI layout needs a non-empty 'fields' list.")
+    return layout
+
+
+def encode_records(batch, layout=None):
+    """
+    Render a batch of calls as fixed-width records.
+
+    Args:
+        batch (pl.DataFrame): Generated calls with native datetime columns.
+        layout (dict, optional): Record layout. Defaults to DEFAULT_ALI_LAYOUT.
+
+    Returns:
+        pl.Series: One record string per call, without the terminator.
+
+    Raises:
+        ValueError: If a field is malformed or names an unknown column.
+    """
+    layout = layout or DEFAULT_ALI_LAYOUT
+    fields = [_field(spec, batch.schema) for spec in layout["fields"]]
+    return batch.select(pl.concat_str(fields).alias("record"))["record"]
+
+
+@writer_format("ali")
+class AliWriter(BatchWriter):
+    """
+    Fixed-width records, one per call, in a buffered binary file.
+
+    Args:
+        path (str or Path): Destination text file.
+        layout (dict or str, optional): Layout, or a layout JSON file. Defaults to
+            DEFAULT_ALI_LAYOUT.
+    """
+
+    def __init__(self, path, layout=None, **options):
+        super().__init__(path)
+        if isinstance(layout, (str, Path)):
+            layout = load_ali_layout(layout)
+        self.layout = layout or DEFAULT_ALI_LAYOUT
+        self.terminator = self.layout.get("terminator", "\n")
+        self._handle = open(self.path, "wb", buffering=1 << 20)
+
+    def write(self, batch):
+        records = encode_records(batch, self.layout)
+        if len(records):
+            # Join the whole batch in polars and encode it once; non-ASCII characters become '?'
+            text = (records + self.terminator).str.join("").item()
+            self._handle.write(text.encode("ascii", "replace"))
+        self.rows += len(batch)
+
+    def close(self):
+        if not self._handle.closed:
+            self._handle.close()
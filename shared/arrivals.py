@@ -0,0 +1,162 @@
+"""
+Call arrival model for the Synth911 application.
+
+Calls arrive as a non-homogeneous Poisson process whose intensity is piecewise constant
+per hour: an hour-of-week curve scaled by a month factor and by holiday multipliers. For a
+fixed number of calls the process reduces to a multinomial draw of per-hour counts followed
+by uniform offsets inside each hour. The offsets come from exponential spacings, which are
+already sorted, so event times are produced in order in O(n) without a global sort.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Relative call volume per hour of the day, 00:00 to 23:00
+DEFAULT_HOURLY = [
+    0.60, 0.50, 0.45, 0.40, 0.35, 0.35, 0.45, 0.60, 0.80, 0.95, 1.05, 1.10,
+    1.15, 1.15, 1.20, 1.25, 1.30, 1.35, 1.30, 1.20, 1.10, 1.00, 0.90, 0.75,
+]
+
+# Relative call volume per day of the week, Monday first
+DEFAULT_WEEKLY = [0.97, 0.95, 0.96, 0.98, 1.06, 1.10, 0.98]
+
+# Relative call volume per month, January first
+DEFAULT_MONTHLY = [0.90, 0.88, 0.95, 0.98, 1.03, 1.06, 1.10, 1.08, 1.02, 1.00, 0.96, 0.94]
+
+# Volume multipliers for whole days, keyed by "MM-DD" (every year) or "YYYY-MM-DD"
+DEFAULT_HOLIDAYS = {
+    "01-01": 1.25,  # New Year's Day
+    "07-04": 1.30,  # Independence Day
+    "10-31": 1.15,  # Halloween
+    "12-24": 0.90,  # Christmas Eve
+    "12-25": 0.85,  # Christmas Day
+    "12-31": 1.20,  # New Year's Eve
+}
+
+_HOUR = np.timedelta64(1, "h")
+
+
+class ArrivalProfile:
+    """
+    Piecewise-constant call intensity over hour-of-week and month, with holiday multipliers.
+
+    Args:
+        hour_of_week (list, optional): 168 relative rates, Monday 00:00 first. Built from
+            DEFAULT_HOURLY and DEFAULT_WEEKLY when None.
+        monthly (list, optional): 12 month multipliers. Defaults to DEFAULT_MONTHLY.
+        holidays (dict, optional): "MM-DD" or "YYYY-MM-DD" mapped to a day multiplier.
+            Defaults to DEFAULT_HOLIDAYS.
+    """
+
+    def __init__(self, hour_of_week=None, monthly=None, holidays=None):
+        if hour_of_week is None:
+            hour_of_week = np.outer(DEFAULT_WEEKLY, DEFAULT_HOURLY).ravel()
+        self.hour_of_week = np.asarray(hour_of_week, dtype=np.float64)
+        self.monthly = np.asarray(DEFAULT_MONTHLY if monthly is None else monthly, dtype=np.float64)
+        self.holidays = dict(DEFAULT_HOLIDAYS if holidays is None else holidays)
+        if self.hour_of_week.shape != (168,):
+            raise ValueError("Arrival profile needs 168 hour-of-week rates.")
+        if self.monthly.shape != (12,):
+            raise ValueError("Arrival profile needs 12 month multipliers.")
+        if (self.hour_of_week < 0).any() or (self.monthly < 0).any():
+            raise ValueError("Arrival profile rates must not be negative.")
+
+    def intensity(self, hours):
+        """
+        Return the relative call rate of each hourly bucket.
+
+        Args:
+            hours (np.ndarray): Bucket start times as datetime64 values.
+
+        Returns:
+            np.ndarray: Relative rate per bucket.
+        """
+        days = hours.astype("datetime64[D]")
+        months = days.astype("datetime64[M]")
+        hour_of_day = (hours - days) // _HOUR
+        # 1970-01-01 was a Thursday; shift so Monday is day 0
+        day_of_week = (days.astype(np.int64) + 3) % 7
+        rates = (
+            self.hour_of_week[day_of_week * 24 + hour_of_day]
+            * self.monthly[months.astype(np.int64) % 12]
+        )
+        if self.holidays:
+            day_strings = np.datetime_as_string(days)
+            for key, multiplier in self.holidays.items():
+                match = day_strings == key if len(key) == 10 else np.char.endswith(day_strings, key)
+                rates[match] *= float(multiplier)
+        return rates
+
+
+def load_arrival_profile(path):
+    """
+    Load an arrival profile from a JSON file.
+
+    The file may hold ``hour_of_week`` (168 rates), or ``hourly`` (24) and ``weekly``
+    (7, Monday first) whose product is used instead, plus optional ``monthly`` (12) and
+    ``holidays`` entries. Omitted entries take the defaults.
+
+    Args:
+        path (str or Path): Profile JSON file.
+
+    Returns:
+        ArrivalProfile: The loaded profile.
+
+    Raises:
+        ValueError: If the profile is malformed.
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    hour_of_week = data.get("hour_of_week")
+    if hour_of_week is None and ("hourly" in data or "weekly" in data):
+        hourly = data.get("hourly", DEFAULT_HOURLY)
+        weekly = data.get("weekly", DEFAULT_WEEKLY)
+        if len(hourly) != 24 or len(weekly) != 7:
+            raise ValueError("Arrival profile needs 24 hourly and 7 weekly rates.")
+        hour_of_week = np.outer(weekly, hourly).ravel()
+    return ArrivalProfile(hour_of_week, data.get("monthly"), data.get("holidays"))
+
+
+def arrival_offsets(start, end, num_records, rng, profile=None):
+    """
+    Draw sorted call arrival times between two datetimes.
+
+    Args:
+        start (datetime): Start of the range.
+        end (datetime): End of the range (exclusive).
+        num_records (int): Number of calls.
+        rng (np.random.Generator): Random generator to draw from.
+        profile (ArrivalProfile, optional): Intensity profile. Defaults to ArrivalProfile().
+
+    Returns:
+        np.ndarray: Non-decreasing offsets from ``start`` in whole seconds.
+    """
+    profile = profile or ArrivalProfile()
+    total_seconds = int((end - start).total_seconds())
+    if total_seconds <= 0:
+        raise ValueError("End date must be after start date.")
+
+    # Hourly buckets; the last one may be partial
+    bucket_starts = np.arange(0, total_seconds, 3600, dtype=np.int64)
+    widths = np.minimum(3600, total_seconds - bucket_starts)
+    hours = np.datetime64(start, "s") + bucket_starts.astype("timedelta64[s]")
+    weights = profile.intensity(hours) * widths
+    if weights.sum() <= 0:
+        raise ValueError("Arrival profile has no intensity inside the date range.")
+    counts = rng.multinomial(num_records, weights / weights.sum())
+
+    # A bucket with k calls takes k + 1 exponential spacings; the normalized cumulative sums
+    # of the first k are k sorted uniforms, so every bucket comes out ordered
+    segment_sizes = counts + 1
+    spacings = rng.exponential(size=int(segment_sizes.sum()))
+    cumulative = np.cumsum(spacings)
+    segment_ends = np.cumsum(segment_sizes) - 1
+    segment_bases = np.concatenate(([0.0], cumulative[segment_ends[:-1]]))
+    totals = cumulative[segment_ends] - segment_bases
+    keep = np.ones(len(spacings), dtype=bool)
+    keep[segment_ends] = False
+    uniforms = (cumulative[keep] - np.repeat(segment_bases, counts)) / np.repeat(totals, counts)
+
+    offsets = np.repeat(bucket_starts, counts) + (uniforms * np.repeat(widths, counts)).astype(np.int64)
+    return np.minimum(offsets, total_seconds - 1)
@@ -0,0 +1,405 @@
+"""
+Call-type catalog for the Synth911 application.
+
+Loads call types, priorities, sampling weights, allowed dispositions and per-locale
+translations from a JSON catalog file and compiles them into integer-coded numpy tables.
+The compiled tables are cached as a ``.npz`` file keyed by the catalog's content hash, so
+the JSON only has to be parsed and validated again when the catalog itself changes.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+# Catalog shipped with the application
+DEFAULT_CATALOG_PATH = Path(__file__).with_name("call_types.json")
+
+# Bump whenever the layout of the compiled cache changes
+CACHE_FORMAT_VERSION = 1
+
+
+def default_cache_dir():
+    """Return the directory used for compiled catalog caches.
+
+    Returns:
+        Path: ``$XDG_CACHE_HOME/synth911gen2`` or ``~/.cache/synth911gen2``.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "synth911gen2"
+
+
+class CallTypeCatalog:
+    """
+    Integer-coded call-type tables compiled from a catalog file.
+
+    Every call type has a code (its position in ``names``); all per-type attributes are
+    numpy arrays indexed by that code, so sampling and lookups are vectorized gathers.
+
+    Args:
+        names (list): Call-type names, in code order.
+        disciplines (list): Discipline names (LAW, EMS, ...), in code order.
+        shares (np.ndarray): Default share of calls for each discipline.
+        discipline_codes (np.ndarray): Discipline code of each call type.
+        priorities (np.ndarray): Priority number of each call type.
+        weights (np.ndarray): Relative sampling weight of each call type within its discipline.
+        dispositions (list): Disposition names, in code order.
+        disposition_mask (np.ndarray): Boolean (call type x disposition) table of allowed dispositions.
+        translations (dict): Language or locale code mapped to a list of translated names.
+    """
+
+    def __init__(self, names, disciplines, shares, discipline_codes, priorities, weights,
+                 dispositions, disposition_mask, translations):
+        self.names = [sys.intern(str(name)) for name in names]
+        self.disciplines = [sys.intern(str(name)) for name in disciplines]
+        self.shares = np.asarray(shares, dtype=np.float64)
+        self.discipline_codes = np.asarray(discipline_codes, dtype=np.int16)
+        self.priorities = np.asarray(priorities, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.dispositions = [sys.intern(str(name)) for name in dispositions]
+        self.disposition_mask = np.asarray(disposition_mask, dtype=bool)
+        self.translations = {
+            lang: [sys.intern(str(name)) for name in translated]
+            for lang, translated in translations.items()
+        }
+        self.index = {name: code for code, name in enumerate(self.names)}
+        self.problem_dtype = pl.Enum(self.names)
+        self.disposition_dtype = pl.Enum(self.dispositions)
+
+    def discipline_code(self, discipline):
+        """Return the integer code of a discipline, raising ValueError if it is unknown."""
+        try:
+            return self.disciplines.index(discipline)
+        except ValueError as exc:
+            raise ValueError(f"Discipline '{discipline}' is not defined in the call-type catalog.") from exc
+
+    def codes_for(self, discipline):
+        """Return the call-type codes belonging to a discipline."""
+        return np.flatnonzero(self.discipline_codes == self.discipline_code(discipline))
+
+    def problems(self, discipline):
+        """Return ``(name, priority)`` tuples for a discipline, in catalog order."""
+        return [(self.names[code], int(self.priorities[code])) for code in self.codes_for(discipline)]
+
+    def priority_map(self, discipline):
+        """Return a ``{name: priority}`` mapping for a discipline."""
+        return dict(self.problems(discipline))
+
+    def selection_mask(self, problems=None, priorities=None):
+        """
+        Build a boolean mask of the call types matching a problem and/or priority filter.
+
+        Args:
+            problems (list, optional): Call-type names to keep. Defaults to None (all).
+            priorities (list, optional): Priority numbers to keep. Defaults to None (all).
+
+        Returns:
+            np.ndarray or None: Mask over call-type codes, or None when no filter is given.
+
+        Raises:
+            ValueError: If a problem name is not in the catalog or nothing matches.
+        """
+        if not problems and not priorities:
+            return None
+        mask = np.ones(len(self.names), dtype=bool)
+        if problems:
+            wanted = [name.strip().upper() for name in problems if name.strip()]
+            unknown = [name for name in wanted if name not in self.index]
+            if unknown:
+                raise ValueError(f"Unknown call types: {', '.join(unknown)}")
+            mask &= np.isin(np.arange(len(self.names)), [self.index[name] for name in wanted])
+        if priorities:
+            mask &= np.isin(self.priorities, [int(priority) for priority in priorities])
+        if not mask.any():
+            raise ValueError("No call types match the selected problems and priorities.")
+        return mask
+
+    def problem_probabilities(self, discipline, mask=None):
+        """
+        Return the call-type codes of a discipline and their normalized sampling probabilities.
+
+        Args:
+            discipline (str): The discipline name.
+            mask (np.ndarray, optional): Selection mask from selection_mask(); the weights of
+                the matching call types are renormalized. Defaults to None (all call types).
+
+        Returns:
+            tuple: (np.ndarray of codes, np.ndarray of probabilities summing to 1)
+        """
+        codes = self.codes_for(discipline)
+        if mask is not None:
+            codes = codes[mask[codes]]
+        weights = self.weights[codes]
+        total = weights.sum()
+        if total <= 0:
+            raise ValueError(f"Call-type weights for discipline '{discipline}' must sum to a positive value.")
+        return codes, weights / total
+
+    def selected_share(self, discipline, mask):
+        """
+        Return the probability that a call of a discipline falls inside a selection mask.
+
+        Args:
+            discipline (str): The discipline name.
+            mask (np.ndarray): Selection mask from selection_mask().
+
+        Returns:
+            float: Share of the discipline's sampling weight held by the selected call types.
+        """
+        codes = self.codes_for(discipline)
+        total = self.weights[codes].sum()
+        if total <= 0:
+            return 0.0
+        return float(self.weights[codes[mask[codes]]].sum() / total)
+
+    def sample_problems(self, discipline, size, rng, mask=None):
+        """
+        Draw call-type codes for one discipline.
+
+        Args:
+            discipline (str): The discipline name.
+            size (int): Number of codes to draw.
+            rng (np.random.Generator): Random generator to draw from.
+            mask (np.ndarray, optional): Restrict draws to the call types in this selection mask.
+
+        Returns:
+            np.ndarray: Call-type codes.
+        """
+        codes, probabilities = self.problem_probabilities(discipline, mask)
+        return rng.choice(codes, size=size, p=probabilities)
+
+    def sample_dispositions(self, problem_codes, rng):
+        """
+        Draw a disposition code for each call, uniformly among the dispositions its call type allows.
+
+        Rows are grouped by their distinct allowed-disposition sets, so the work is one
+        vectorized draw per set rather than one per row.
+
+        Args:
+            problem_codes (np.ndarray): Call-type code of each call.
+            rng (np.random.Generator): Random generator to draw from.
+
+        Returns:
+            np.ndarray: Disposition codes.
+        """
+        mask_rows, mask_ids = np.unique(self.disposition_mask, axis=0, return_inverse=True)
+        row_mask_ids = mask_ids.reshape(-1)[problem_codes]
+        result = np.empty(len(problem_codes), dtype=np.uint32)
+        for mask_id, allowed in enumerate(mask_rows):
+            selected = row_mask_ids == mask_id
+            choices = np.flatnonzero(allowed)
+            result[selected] = choices[rng.integers(0, len(choices), size=int(selected.sum()))]
+        return result
+
+    def translated_names(self, locale):
+        """
+        Return the call-type names translated for a locale.
+
+        The exact locale (e.g. ``fr_CA``) is tried first, then its language (``fr``).
+
+        Args:
+            locale (str): Faker-style locale code.
+
+        Returns:
+            list or None: Translated names in code order, or None if no translation exists.
+        """
+        if locale in self.translations:
+            return self.translations[locale]
+        return self.translations.get(locale.split("_")[0])
+
+    def translate(self, df, locale, column="problem"):
+        """
+        Translate a call-type Enum column of a DataFrame.
+
+        Only the Enum categories are swapped; the physical codes are reused as-is, so the
+        cost does not depend on the number of rows.
+
+        Args:
+            df (pl.DataFrame): Frame holding a column of dtype ``problem_dtype``.
+            locale (str): Faker-style locale code.
+            column (str, optional): Column to translate. Defaults to "problem".
+
+        Returns:
+            pl.DataFrame: Frame with the translated column, or ``df`` unchanged if the
+            catalog has no translation for the locale.
+        """
+        translated = self.translated_names(locale)
+        if translated is None:
+            return df
+        return df.with_columns(pl.col(column).to_physical().cast(pl.Enum(translated)))
+
+
+def compile_catalog(data):
+    """
+    Validate a parsed catalog document and compile it into a CallTypeCatalog.
+
+    Args:
+        data (dict): Parsed JSON catalog.
+
+    Returns:
+        CallTypeCatalog: The compiled catalog.
+
+    Raises:
+        ValueError: If the catalog is malformed.
+    """
+    dispositions = list(data.get("dispositions", []))
+    if not dispositions:
+        raise ValueError("Catalog must define at least one disposition.")
+    disposition_index = {name: code for code, name in enumerate(dispositions)}
+
+    disciplines, shares = [], []
+    names, discipline_codes, priorities, weights, masks = [], [], [], [], []
+    raw_translations = []
+    for discipline_code, discipline in enumerate(data.get("disciplines", [])):
+        disciplines.append(discipline["name"])
+        shares.append(float(discipline.get("share", 1.0)))
+        default_allowed = discipline.get("dispositions", dispositions)
+        call_types = discipline.get("call_types", [])
+        if not call_types:
+            raise ValueError(f"Discipline '{discipline['name']}' has no call types.")
+        for call_type in call_types:
+            allowed = call_type.get("dispositions", default_allowed)
+            unknown = [name for name in allowed if name not in disposition_index]
+            if unknown:
+                raise ValueError(f"Call type '{call_type['name']}' uses unknown dispositions: {', '.join(unknown)}")
+            mask = np.zeros(len(dispositions), dtype=bool)
+            mask[[disposition_index[name] for name in allowed]] = True
+            priority = int(call_type["priority"])
+            if not 1 <= priority <= 5:
+                raise ValueError(f"Call type '{call_type['name']}' has priority {priority}; expected 1-5.")
+            names.append(call_type["name"])
+            discipline_codes.append(discipline_code)
+            priorities.append(priority)
+            weights.append(float(call_type.get("weight", 1.0)))
+            masks.append(mask)
+            raw_translations.append(call_type.get("translations", {}))
+
+    if not disciplines:
+        raise ValueError("Catalog must define at least one discipline.")
+    if len(set(names)) != len(names):
+        raise ValueError("Call-type names must be unique across the catalog.")
+    if min(weights) < 0:
+        raise ValueError("Call-type weights must be non-negative.")
+
+    # Untranslated call types keep their catalog name
+    translations = {}
+    for lang in sorted({lang for entry in raw_translations for lang in entry}):
+        translated = [entry.get(lang, name) for entry, name in zip(raw_translations, names)]
+        if len(set(translated)) != len(translated):
+            raise ValueError(f"Translated call-type names for '{lang}' must be unique.")
+        translations[lang] = translated
+
+    return CallTypeCatalog(
+        names=names,
+        disciplines=disciplines,
+        shares=shares,
+        discipline_codes=discipline_codes,
+        priorities=priorities,
+        weights=weights,
+        dispositions=dispositions,
+        disposition_mask=np.vstack(masks),
+        translations=translations,
+    )
+
+
+def save_compiled(catalog, path):
+    """
+    Write a compiled catalog to a ``.npz`` cache file.
+
+    The file is written next to its destination and renamed into place, so concurrent
+    runs never read a partially written cache.
+
+    Args:
+        catalog (CallTypeCatalog): The compiled catalog.
+        path (Path): Destination file.
+    """
+    languages = sorted(catalog.translations)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as handle:
+        np.savez(
+            handle,
+            names=np.array(catalog.names, dtype=np.str_),
+            disciplines=np.array(catalog.disciplines, dtype=np.str_),
+            shares=catalog.shares,
+            discipline_codes=catalog.discipline_codes,
+            priorities=catalog.priorities,
+            weights=catalog.weights,
+            dispositions=np.array(catalog.dispositions, dtype=np.str_),
+            disposition_mask=catalog.disposition_mask,
+            languages=np.array(languages, dtype=np.str_),
+            translations=np.array([catalog.translations[lang] for lang in languages], dtype=np.str_)
+            .reshape(len(languages), len(catalog.names)),
+        )
+    os.replace(tmp_path, path)
+
+
+def load_compiled(path):
+    """
+    Read a compiled catalog from a ``.npz`` cache file.
+
+    Args:
+        path (Path): Cache file written by save_compiled.
+
+    Returns:
+        CallTypeCatalog: The compiled catalog.
+    """
+    with np.load(path, allow_pickle=False) as tables:
+        languages = tables["languages"].tolist()
+        translated = tables["translations"].tolist()
+        return CallTypeCatalog(
+            names=tables["names"].tolist(),
+            disciplines=tables["disciplines"].tolist(),
+            shares=tables["shares"],
+            discipline_codes=tables["discipline_codes"],
+            priorities=tables["priorities"],
+            weights=tables["weights"],
+            dispositions=tables["dispositions"].tolist(),
+            disposition_mask=tables["disposition_mask"],
+            translations=dict(zip(languages, translated)),
+        )
+
+
+_LOADED_CATALOGS = {}
+
+
+def load_catalog(path=None, cache_dir=None, use_cache=True):
+    """
+    Load a call-type catalog, compiling and caching it on first use.
+
+    Args:
+        path (str or Path, optional): Catalog JSON file. Defaults to the bundled catalog.
+        cache_dir (str or Path, optional): Directory for compiled caches. Defaults to default_cache_dir().
+        use_cache (bool, optional): Read and write the on-disk cache. Defaults to True.
+
+    Returns:
+        CallTypeCatalog: The compiled catalog.
+    """
+    path = Path(path) if path is not None else DEFAULT_CATALOG_PATH
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw + str(CACHE_FORMAT_VERSION).encode()).hexdigest()[:16]
+    if digest in _LOADED_CATALOGS:
+        return _LOADED_CATALOGS[digest]
+
+    cache_path = Path(cache_dir or default_cache_dir()) / f"{path.stem}-{digest}.npz"
+    catalog = None
+    if use_cache and cache_path.exists():
+        try:
+            catalog = load_compiled(cache_path)
+        except (OSError, ValueError, KeyError):
+            catalog = None
+    if catalog is None:
+        catalog = compile_catalog(json.loads(raw.decode("utf-8")))
+        if use_cache:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                save_compiled(catalog, cache_path)
+            except OSError:
+                # A read-only cache location only costs a recompile on the next run
+                pass
+
+    _LOADED_CATALOGS[digest] = catalog
+    return catalog
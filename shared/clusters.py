@@ -0,0 +1,164 @@
+"""
+Clustered multi-call incidents for the Synth911 application.
+
+Large incidents draw several calls about the same event. Clusters are simulated as a Hawkes
+self-exciting process using its branching representation: every call of an eligible call
+type spawns a Poisson number of follow-up calls, each arriving an exponential delay after
+its parent, and those calls spawn their own. Each generation is drawn for all calls at
+once, and with a branching ratio below 1 the generations shrink geometrically, so the total
+work stays linear in the number of calls. Follow-up calls that would arrive after the end
+of the date range are never made. Follow-up calls keep the incident's agency and address,
+usually its call type and otherwise a related one, and carry the first call's call_id as
+``incident_id``.
+"""
+
+import numpy as np
+
+
+class ClusterModel:
+    """
+    Parameters of the incident cluster process.
+
+    Args:
+        branching_ratio (float, optional): Mean follow-up calls spawned by each call of an
+            eligible call type; must be below 1. Defaults to 0.6.
+        decay (float, optional): Mean delay in seconds between a call and the follow-up calls
+            it spawns. Defaults to 180.
+        max_priority (int, optional): Only call types with this priority number or lower
+            start clusters. Defaults to 2.
+        same_problem (float, optional): Probability that a follow-up call keeps the
+            incident's call type; otherwise a related call type (same discipline and
+            priority) is drawn from the agency's call mix. Defaults to 0.8.
+    """
+
+    def __init__(self, branching_ratio=0.6, decay=180.0, max_priority=2, same_problem=0.8):
+        if not 0 <= branching_ratio < 1:
+            raise ValueError("Cluster branching ratio must be at least 0 and below 1.")
+        if decay <= 0:
+            raise ValueError("Cluster decay must be positive.")
+        if not 0 <= same_problem <= 1:
+            raise ValueError("Cluster same-problem probability must be between 0 and 1.")
+        self.branching_ratio = float(branching_ratio)
+        self.decay = float(decay)
+        self.max_priority = int(max_priority)
+        self.same_problem = float(same_problem)
+
+
+def related_problems(parents, agency_codes, rng, catalog, agency_registry, mask=None):
+    """
+    Draw call types related to the incidents' own, for follow-up calls.
+
+    A related call type shares its incident's discipline and priority, so a shooting brings
+    other priority 1 law calls rather than noise complaints. It is drawn from the agency's
+    call mix restricted to those call types; agencies whose mix holds none of them keep the
+    incident's call type.
+
+    Args:
+        parents (np.ndarray): Call-type code of each follow-up call's incident.
+        agency_codes (np.ndarray): Agency code of each follow-up call.
+        rng (np.random.Generator): Random generator to draw from.
+        catalog (CallTypeCatalog): Catalog supplying call-type disciplines and priorities.
+        agency_registry (AgencyRegistry): Registry supplying the call mixes.
+        mask (np.ndarray, optional): Call-type selection mask for the drawn call types.
+
+    Returns:
+        np.ndarray: Call-type codes.
+    """
+    categories = catalog.discipline_codes.astype(np.int64) * 6 + catalog.priorities
+    parent_categories = categories[parents]
+    problems = parents.copy()
+    for category in np.unique(parent_categories):
+        related = categories == category
+        if mask is not None:
+            related &= mask
+        supported = np.array([
+            agency_registry.selected_share(code, related) > 0 for code in range(len(agency_registry.agencies))
+        ])
+        rows = np.flatnonzero(parent_categories == category)
+        rows = rows[supported[agency_codes[rows]]]
+        if len(rows):
+            problems[rows] = agency_registry.sample_problems(agency_codes[rows], rng, mask=related)
+    return problems
+
+
+def expand_clusters(offsets, agency_codes, problem_codes, num_records, total_seconds, rng, model,
+                    catalog, agency_registry, mask=None):
+    """
+    Grow incident clusters from independent calls and keep ``num_records`` calls.
+
+    Every input call is an incident root. After the cascades are drawn, whole incidents are
+    kept in random order until ``num_records`` calls are reached, which thins the roots
+    uniformly and so preserves the arrival profile; the incidents kept may lose some of
+    their latest follow-up calls.
+
+    Args:
+        offsets (np.ndarray): Sorted root arrival offsets in seconds.
+        agency_codes (np.ndarray): Agency code of each root.
+        problem_codes (np.ndarray): Call-type code of each root.
+        num_records (int): Number of calls to return.
+        total_seconds (int): Length of the date range; follow-up calls past it are dropped.
+        rng (np.random.Generator): Random generator to draw from.
+        model (ClusterModel): Cluster process parameters.
+        catalog (CallTypeCatalog): Catalog supplying call-type priorities.
+        agency_registry (AgencyRegistry): Registry used to redraw follow-up call types.
+        mask (np.ndarray, optional): Call-type selection mask for redrawn call types.
+
+    Returns:
+        tuple: (offsets, agency_codes, problem_codes, incident_rows) in chronological order;
+        ``incident_rows`` holds, for every call, the row of its incident's first call.
+    """
+    num_roots = len(offsets)
+    eligible = catalog.priorities[problem_codes] <= model.max_priority
+    ratios = np.where(eligible, model.branching_ratio, 0.0)
+
+    # Branching: draw each generation of follow-up calls for all parents at once
+    all_times, all_roots = [offsets.astype(np.float64)], [np.arange(num_roots)]
+    times, roots = all_times[0], all_roots[0]
+    while len(roots):
+        children = rng.poisson(ratios[roots])
+        roots = np.repeat(roots, children)
+        times = np.repeat(times, children) + rng.exponential(model.decay, size=len(roots))
+        # Calls past the end of the range are never made, so they spawn nothing either
+        inside = times < total_seconds
+        roots, times = roots[inside], times[inside]
+        all_times.append(times)
+        all_roots.append(roots)
+    event_times = np.concatenate(all_times)
+    event_roots = np.concatenate(all_roots)
+
+    # Keep whole incidents in random order until num_records calls are reached
+    sizes = np.bincount(event_roots, minlength=num_roots)
+    order = rng.permutation(num_roots)
+    kept_roots = order[:np.searchsorted(np.cumsum(sizes[order]), num_records) + 1]
+    keep_root = np.zeros(num_roots, dtype=bool)
+    keep_root[kept_roots] = True
+    # Generations are laid out in order, so trimming the tail drops the latest-generation
+    # follow-up calls first; roots always come first and are never dropped
+    kept = np.flatnonzero(keep_root[event_roots])[:num_records]
+    event_times, event_roots = event_times[kept], event_roots[kept]
+    is_root = kept < num_roots
+
+    # Follow-up calls inherit the agency and usually the call type of their incident
+    agencies = agency_codes[event_roots]
+    problems = problem_codes[event_roots].copy()
+    redraw = np.flatnonzero(~is_root & (rng.random(len(kept)) >= model.same_problem))
+    if len(redraw):
+        problems[redraw] = related_problems(
+            problems[redraw], agencies[redraw], rng, catalog, agency_registry, mask
+        )
+
+    # The roots and the follow-up calls are each nearly sorted, so a stable merge sort is
+    # close to linear here
+    seconds = event_times.astype(np.int64)
+    chronological = np.argsort(seconds, kind="stable")
+    positions = np.empty(len(kept), dtype=np.int64)
+    positions[chronological] = np.arange(len(kept))
+    root_positions = np.full(num_roots, -1, dtype=np.int64)
+    root_positions[event_roots[is_root]] = positions[is_root]
+    incident_rows = root_positions[event_roots][chronological]
+    return (
+        seconds[chronological],
+        agencies[chronological],
+        problems[chronological],
+        incident_rows,
+    )
@@ -27,6 +27,9 @@ SUPPORTED_LOCALES = [
     "fr_CA",  # Canadian French
 ]
 
+# Format used for timestamp columns in text output
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 def validate_locale(locale):
     """Validate if a given locale is supported.
 
@@ -0,0 +1,66 @@
+"""
+Priority-conditioned elapsed times for the Synth911 application.
+
+Each duration column keeps its base distribution, but the distribution's scale and clip
+bounds are multiplied by a factor looked up per row from an (agency, priority) table. The
+tables are small arrays indexed by agency code and priority number, so conditioning costs
+one gather per column and no Python loop over rows.
+"""
+
+import numpy as np
+
+# Scale factor per duration column and priority 1-5; P1 calls are handled fastest
+DEFAULT_DURATION_SCALES = {
+    "queue_time": [0.5, 0.8, 1.0, 1.2, 1.4],
+    "dispatch_time": [0.5, 0.75, 1.0, 1.3, 1.6],
+    "ack_time": [0.6, 0.8, 1.0, 1.1, 1.2],
+    "enroute_time": [0.7, 0.85, 1.0, 1.15, 1.3],
+    "on_scene_time": [1.0, 1.0, 1.0, 1.0, 1.0],
+}
+
+DURATION_COLUMNS = list(DEFAULT_DURATION_SCALES)
+
+
+def duration_scale_table(agency_registry, column):
+    """
+    Build the (agency, priority) table of scale factors for one duration column.
+
+    Agencies may override the defaults with a ``duration_scales`` entry mapping column
+    names to five factors, one per priority.
+
+    Args:
+        agency_registry (AgencyRegistry): Registry of the generated calls.
+        column (str): Duration column name.
+
+    Returns:
+        np.ndarray: Array of shape (number of agencies, 6) indexed by agency code and
+        priority number; column 0 is unused.
+    """
+    if column not in DEFAULT_DURATION_SCALES:
+        raise ValueError(f"Unknown duration column '{column}'.")
+    table = np.ones((len(agency_registry.agencies), 6))
+    for code, agency in enumerate(agency_registry.agencies):
+        scales = agency.duration_scales.get(column, DEFAULT_DURATION_SCALES[column])
+        if len(scales) != 5:
+            raise ValueError(f"Agency '{agency.name}' needs five {column} scales, one per priority.")
+        table[code, 1:] = scales
+    return table
+
+
+def row_scales(agency_registry, agency_codes, priorities):
+    """
+    Look up the scale factor of every duration column for each call.
+
+    Args:
+        agency_registry (AgencyRegistry): Registry of the generated calls.
+        agency_codes (np.ndarray): Agency code of each call.
+        priorities (np.ndarray): Priority number of each call.
+
+    Returns:
+        dict: Duration column mapped to an array of per-row scale factors.
+    """
+    priorities = np.clip(priorities, 1, 5)
+    return {
+        column: duration_scale_table(agency_registry, column)[agency_codes, priorities]
+        for column in DURATION_COLUMNS
+    }
@@ -0,0 +1,166 @@
+"""
+EIDO-style incident documents for the Synth911 application.
+
+Next-generation 911 integrations exchange nested incident documents (loosely following the
+NENA Emergency Incident Data Object) rather than flat rows. Each call becomes one document
+with ``incident``, ``call``, ``location``, ``units`` and ``dispositions`` sections. The
+documents are assembled with polars struct and list expressions over whole batches and
+serialized by polars' NDJSON writer, so no Python dict is ever built per document.
+"""
+
+from urllib.parse import quote
+
+import polars as pl
+
+from shared.writers import BatchWriter, writer_format
+
+# ISO 8601 local timestamps, as EIDO documents carry them
+EIDO_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Call timestamps used by the documents, formatted once per batch
+DOCUMENT_TIMESTAMPS = [
+    "event_time",
+    "time_call_disconnected",
+    "time_call_dispatched",
+    "time_call_acknowledged",
+    "time_unit_enroute",
+    "time_call_closed",
+]
+
+
+def _timestamp(column):
+    """Return an expression formatting a datetime column as an EIDO timestamp."""
+    return pl.col(column).dt.strftime(EIDO_TIMESTAMP_FORMAT)
+
+
+def unit_lists(units):
+    """
+    Group a units table into one list of unit structs per call.
+
+    Args:
+        units (pl.DataFrame): Output of generate_units.
+
+    Returns:
+        pl.DataFrame: call_id and a ``units`` list column.
+    """
+    return units.group_by("call_id", maintain_order=True).agg(
+        pl.struct(
+            pl.col("unit_id").alias("id"),
+            _timestamp("time_unit_dispatched").alias("dispatchedTime"),
+            _timestamp("time_unit_acknowledged").alias("acknowledgedTime"),
+            _timestamp("time_unit_enroute").alias("enrouteTime"),
+            _timestamp("time_unit_cleared").alias("clearedTime"),
+        ).alias("units")
+    )
+
+
+def eido_documents(batch, units=None):
+    """
+    Build one EIDO-style document per call.
+
+    Args:
+        batch (pl.DataFrame): Generated calls with native datetime columns.
+        units (pl.DataFrame, optional): Output of unit_lists(); without it every call lists
+            a single unit timed by the call's own dispatch timestamps.
+
+    Returns:
+        pl.DataFrame: One row per document with struct and list columns ``incident``,
+        ``call``, ``location``, ``units`` and ``dispositions``.
+    """
+    incident_id = "incident_id" if "incident_id" in batch.columns else "call_id"
+    batch = batch.with_columns(_timestamp(column) for column in DOCUMENT_TIMESTAMPS)
+    location = [pl.col("address")]
+    if "latitude" in batch.columns:
+        location += [pl.col("latitude"), pl.col("longitude")]
+    if units is not None:
+        batch = batch.join(units, on="call_id", how="left", maintain_order="left")
+        unit_column = pl.col("units").fill_null(pl.lit([], dtype=units.schema["units"]))
+    else:
+        unit_column = pl.concat_list(pl.struct(
+            pl.lit(None, dtype=pl.Utf8).alias("id"),
+            pl.col("time_call_dispatched").alias("dispatchedTime"),
+            pl.col("time_call_acknowledged").alias("acknowledgedTime"),
+            pl.col("time_unit_enroute").alias("enrouteTime"),
+            pl.col("time_call_closed").alias("clearedTime"),
+        ))
+    return batch.select(
+        pl.struct(
+            pl.col(incident_id).alias("id"),
+            pl.col("problem").cast(pl.Utf8).alias("type"),
+            pl.col("priority_number").alias("priority"),
+            pl.col("agency").cast(pl.Utf8).alias("agency"),
+            pl.col("event_time").alias("createdTime"),
+        ).alias("incident"),
+        pl.struct(
+            pl.col("call_id").alias("id"),
+            pl.col("event_time").alias("receivedTime"),
+            pl.col("time_call_disconnected").alias("disconnectedTime"),
+            pl.col("call_reception").cast(pl.Utf8).alias("reception"),
+            pl.col("call_taker").alias("callTaker"),
+            pl.col("dispatcher").alias("dispatcher"),
+        ).alias("call"),
+        pl.struct(location).alias("location"),
+        unit_column.alias("units"),
+        pl.concat_list(pl.struct(
+            pl.col("disposition").cast(pl.Utf8).alias("code"),
+            pl.col("time_call_closed").alias("time"),
+        )).alias("dispositions"),
+    )
+
+
+@writer_format("eido")
+class EidoWriter(BatchWriter):
+    """
+    EIDO-style documents as NDJSON, or one file per incident.
+
+    Args:
+        path (str or Path): Destination NDJSON file. With per_incident, the files go into a
+            directory named after it without its suffix.
+        units (pl.DataFrame, optional): Output of generate_units, listed in each document.
+        per_incident (bool, optional): Write ``<incident id>.ndjson`` files holding the
+            documents of each incident's calls. Defaults to False.
+    """
+
+    def __init__(self, path, units=None, per_incident=False, **options):
+        super().__init__(path)
+        # Unit lists sorted by call_id once; each batch finds its own by binary search
+        self.units = unit_lists(units).sort("call_id") if units is not None else None
+        self.per_incident = per_incident
+        if per_incident:
+            self.path = self.path.with_suffix("")
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._handle = None
+            # Incident files already started by this writer; the others are truncated first
+            self._started = set()
+        else:
+            self._handle = open(self.path, "wb")
+
+    def _batch_units(self, batch):
+        """Return the unit lists of a batch's calls, without scanning the whole run's units."""
+        if self.units is None or not len(self.units):
+            return self.units
+        call_ids = batch["call_id"]
+        positions = self.units["call_id"].search_sorted(call_ids).clip(0, len(self.units) - 1)
+        return self.units[positions].filter(pl.col("call_id") == call_ids)
+
+    def write(self, batch):
+        documents = eido_documents(batch, self._batch_units(batch))
+        if not self.per_incident:
+            documents.write_ndjson(self._handle)
+        else:
+            # Serialize the whole batch once, then route each line to its incident's file
+            ids = documents["incident"].struct.field("id").to_list()
+            lines = documents.write_ndjson().splitlines(keepends=True)
+            grouped = {}
+            for incident, line in zip(ids, lines):
+                grouped.setdefault(incident, []).append(line)
+            for incident, incident_lines in grouped.items():
+                mode = "a" if incident in self._started else "w"
+                self._started.add(incident)
+                with open(self.path / f"{quote(incident, safe='')}.ndjson", mode, encoding="utf-8") as handle:
+                    handle.writelines(incident_lines)
+        self.rows += len(batch)
+
+    def close(self):
+        if self._handle is not None and not self._handle.closed:
+            self._handle.close()
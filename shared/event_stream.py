@@ -0,0 +1,120 @@
+"""
+CAD status event stream for the Synth911 application.
+
+Replay tools want one row per status change rather than one wide row per call. The seven
+timestamp columns are unpivoted into (call_id, status, status_time) rows and merged into a
+single stream ordered by status time across all calls. Calls arrive in event_time order and
+every status happens at or after its call's event_time, so the merge streams: after
+unpivoting a batch of calls, every pending status earlier than the next batch's first
+event_time is final and can be written. Only the statuses of calls still in progress are
+held back.
+"""
+
+import polars as pl
+
+from shared.constants import TIMESTAMP_FORMAT
+
+# Status names and the timestamp column each one comes from, in lifecycle order
+STATUS_COLUMNS = {
+    "CREATED": "event_time",
+    "QUEUED": "time_call_queued",
+    "DISPATCHED": "time_call_dispatched",
+    "ACKNOWLEDGED": "time_call_acknowledged",
+    "ENROUTE": "time_unit_enroute",
+    "DISCONNECTED": "time_call_disconnected",
+    "CLOSED": "time_call_closed",
+}
+
+STATUS_DTYPE = pl.Enum(list(STATUS_COLUMNS))
+
+# Calls unpivoted per merge step
+DEFAULT_BATCH_SIZE = 100_000
+
+# Call attributes repeated on every status row
+CONTEXT_COLUMNS = ["agency", "problem", "priority_number"]
+
+
+def _status_rows(calls, first_row):
+    """
+    Unpivot a batch of calls into one row per status.
+
+    Args:
+        calls (pl.DataFrame): Consecutive calls with native datetime timestamp columns.
+        first_row (int): Position of the batch's first call in the whole frame.
+
+    Returns:
+        pl.DataFrame: call_id, status, status_time, the context columns and a ``_order``
+        tie-breaker (call position, then lifecycle order).
+    """
+    context = [column for column in CONTEXT_COLUMNS if column in calls.columns]
+    position = pl.int_range(first_row, first_row + len(calls), dtype=pl.Int64)
+    frames = [
+        calls.select(
+            pl.col("call_id"),
+            pl.lit(status).cast(STATUS_DTYPE).alias("status"),
+            pl.col(column).alias("status_time"),
+            *context,
+            (position * len(STATUS_COLUMNS) + code).alias("_order"),
+        )
+        for code, (status, column) in enumerate(STATUS_COLUMNS.items())
+    ]
+    return pl.concat(frames)
+
+
+def iter_status_events(df, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield the status events of generated calls in global status-time order.
+
+    Args:
+        df (pl.DataFrame): Output of generate_911_data, with formatted or native timestamps.
+        batch_size (int, optional): Calls unpivoted per step. Defaults to DEFAULT_BATCH_SIZE.
+
+    Yields:
+        pl.DataFrame: Consecutive, non-empty slices of the ordered status stream.
+
+    Raises:
+        ValueError: If batch_size is not positive.
+    """
+    if batch_size < 1:
+        raise ValueError("Event stream batch size must be a positive integer.")
+    columns = list(STATUS_COLUMNS.values())
+    if any(df.schema[column] == pl.Utf8 for column in columns):
+        df = df.with_columns(pl.col(column).str.to_datetime(TIMESTAMP_FORMAT) for column in columns)
+    if not df["event_time"].is_sorted():
+        df = df.sort("event_time", maintain_order=True)
+    event_times = df["event_time"]
+
+    pending = None
+    for start in range(0, len(df), batch_size):
+        rows = _status_rows(df.slice(start, batch_size), start)
+        pending = rows if pending is None else pl.concat([pending, rows])
+        end = start + batch_size
+        if end < len(df):
+            # No later call can produce a status before the next call's event_time
+            watermark = event_times[end]
+            ready = pending.filter(pl.col("status_time") < watermark)
+            pending = pending.filter(pl.col("status_time") >= watermark)
+        else:
+            ready, pending = pending, None
+        if len(ready):
+            yield ready.sort("status_time", "_order").drop("_order")
+
+
+def write_event_stream(df, path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write the long-format status stream of generated calls to a CSV file, batch by batch.
+
+    Args:
+        df (pl.DataFrame): Output of generate_911_data.
+        path (str or Path): Destination CSV file.
+        batch_size (int, optional): Calls unpivoted per step. Defaults to DEFAULT_BATCH_SIZE.
+
+    Returns:
+        int: Number of status rows written.
+    """
+    written = 0
+    with open(path, "wb") as handle:
+        for batch in iter_status_events(df, batch_size):
+            batch.write_csv(handle, include_header=written == 0, datetime_format=TIMESTAMP_FORMAT)
+            written += len(batch)
+    return written
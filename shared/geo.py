@@ -0,0 +1,197 @@
+"""
+Hotspot-weighted call coordinates for the Synth911 application.
+
+The service area is a polygon covered by a regular grid. Each grid cell inside the polygon
+gets a base intensity plus Gaussian hotspots around points (downtown, a stadium) or along
+polylines (highways); a hotspot may apply only to some agencies or hours of the day. One
+raster per (agency, hour) is precomputed, and their cumulative weights are laid end to end,
+raster ``k`` occupying the interval ``(k, k + 1]``, so every call's cell is found with a
+single searchsorted. The point is then jittered uniformly inside its cell.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Kilometres per degree of latitude; longitude degrees shrink with cos(latitude)
+KM_PER_DEGREE = 111.2
+
+# Jitter rounds for points that land outside the polygon before falling back to the cell center
+MAX_JITTER_ROUNDS = 20
+
+
+def points_in_polygon(lons, lats, polygon):
+    """
+    Test which points lie inside a polygon, by ray casting over its edges.
+
+    Args:
+        lons (np.ndarray): Point longitudes.
+        lats (np.ndarray): Point latitudes.
+        polygon (np.ndarray): (n, 2) array of [lon, lat] vertices.
+
+    Returns:
+        np.ndarray: Boolean mask of the points inside.
+    """
+    inside = np.zeros(len(lons), dtype=bool)
+    x1, y1 = polygon[-1]
+    for x2, y2 in polygon:
+        crosses = (y1 > lats) != (y2 > lats)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = x1 + (lats - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (lons < x_cross)
+        x1, y1 = x2, y2
+    return inside
+
+
+class GeoModel:
+    """
+    Grid intensity model over a service-area polygon.
+
+    Args:
+        polygon (list): [lon, lat] vertices of the service area.
+        grid (tuple, optional): Number of grid (rows, columns). Defaults to (100, 100).
+        base (float, optional): Intensity of every cell inside the polygon. Defaults to 1.0.
+        hotspots (list, optional): Hotspot dicts with ``center`` ([lon, lat]) or ``line``
+            (list of [lon, lat]), ``radius_km``, ``weight``, and optional ``agencies`` and
+            ``hours`` lists restricting when the hotspot applies.
+    """
+
+    def __init__(self, polygon, grid=(100, 100), base=1.0, hotspots=None):
+        self.polygon = np.asarray(polygon, dtype=np.float64)
+        if self.polygon.ndim != 2 or self.polygon.shape[0] < 3 or self.polygon.shape[1] != 2:
+            raise ValueError("Geo polygon needs at least three [lon, lat] vertices.")
+        self.rows, self.cols = (int(size) for size in grid)
+        if self.rows < 1 or self.cols < 1:
+            raise ValueError("Geo grid needs at least one row and one column.")
+        self.base = float(base)
+        self.hotspots = list(hotspots or [])
+
+        self.min_lon, self.min_lat = self.polygon.min(axis=0)
+        max_lon, max_lat = self.polygon.max(axis=0)
+        self.cell_lon = (max_lon - self.min_lon) / self.cols
+        self.cell_lat = (max_lat - self.min_lat) / self.rows
+        col_index, row_index = np.meshgrid(np.arange(self.cols), np.arange(self.rows))
+        self.center_lons = self.min_lon + (col_index.ravel() + 0.5) * self.cell_lon
+        self.center_lats = self.min_lat + (row_index.ravel() + 0.5) * self.cell_lat
+        self.inside = points_in_polygon(self.center_lons, self.center_lats, self.polygon)
+        if not self.inside.any():
+            raise ValueError("Geo grid is too coarse: no cell center lies inside the polygon.")
+        self._kernels = [self._kernel(hotspot) for hotspot in self.hotspots]
+        self._indices = {}
+
+    def _kernel(self, hotspot):
+        """Return a hotspot's weight in every grid cell."""
+        scale = np.cos(np.radians(self.center_lats.mean()))
+        if "center" in hotspot:
+            points = np.asarray([hotspot["center"]], dtype=np.float64)
+        elif "line" in hotspot:
+            points = np.asarray(hotspot["line"], dtype=np.float64)
+        else:
+            raise ValueError("Geo hotspot needs a 'center' or a 'line'.")
+        # Distance in km from each cell center to the point or the nearest polyline segment
+        x = self.center_lons * scale * KM_PER_DEGREE
+        y = self.center_lats * KM_PER_DEGREE
+        px = points[:, 0] * scale * KM_PER_DEGREE
+        py = points[:, 1] * KM_PER_DEGREE
+        distance = np.hypot(x - px[0], y - py[0])
+        for x1, y1, x2, y2 in zip(px[:-1], py[:-1], px[1:], py[1:]):
+            length = (x2 - x1) ** 2 + (y2 - y1) ** 2
+            t = np.clip(((x - x1) * (x2 - x1) + (y - y1) * (y2 - y1)) / length, 0, 1) if length else 0
+            distance = np.minimum(distance, np.hypot(x - x1 - t * (x2 - x1), y - y1 - t * (y2 - y1)))
+        radius = float(hotspot.get("radius_km", 1.0))
+        return float(hotspot.get("weight", 1.0)) * np.exp(-0.5 * (distance / radius) ** 2)
+
+    def raster_index(self, agency_names):
+        """
+        Build the concatenated cumulative-weight index of every (agency, hour) raster.
+
+        Args:
+            agency_names (list): Agency names, in agency code order.
+
+        Returns:
+            np.ndarray: Cumulative weights, raster ``agency * 24 + hour`` offset by its key.
+        """
+        key = tuple(agency_names)
+        if key in self._indices:
+            return self._indices[key]
+        cdfs = []
+        for raster_key in range(len(agency_names) * 24):
+            agency, hour = agency_names[raster_key // 24], raster_key % 24
+            weights = np.full(len(self.inside), self.base)
+            for hotspot, kernel in zip(self.hotspots, self._kernels):
+                if "agencies" in hotspot and agency not in hotspot["agencies"]:
+                    continue
+                if "hours" in hotspot and hour not in hotspot["hours"]:
+                    continue
+                weights = weights + kernel
+            weights = np.where(self.inside, np.maximum(weights, 0.0), 0.0)
+            if weights.sum() <= 0:
+                # No base and no active hotspot: spread the calls evenly over the area
+                weights = self.inside.astype(np.float64)
+            cdf = np.cumsum(weights) / weights.sum()
+            # Pin the top so rounding never spills into the next raster
+            cdf[np.flatnonzero(weights)[-1]:] = 1.0
+            cdfs.append(raster_key + cdf)
+        index = np.concatenate(cdfs)
+        self._indices[key] = index
+        return index
+
+    def sample(self, agency_codes, hours, rng, agency_names):
+        """
+        Draw a coordinate for each call from its agency's raster at its hour.
+
+        Args:
+            agency_codes (np.ndarray): Agency code of each call.
+            hours (np.ndarray): Hour of the day of each call.
+            rng (np.random.Generator): Random generator to draw from.
+            agency_names (list): Agency names, in agency code order.
+
+        Returns:
+            tuple: (latitudes, longitudes) as float arrays.
+        """
+        index = self.raster_index(agency_names)
+        keys = np.asarray(agency_codes, dtype=np.int64) * 24 + np.asarray(hours, dtype=np.int64)
+        positions = np.searchsorted(index, keys + rng.random(len(keys)), side="right")
+        cells = np.minimum(positions, len(index) - 1) % len(self.inside)
+
+        # Jitter inside the cell; redraw points that fall outside the polygon's edge
+        base_lons = self.center_lons[cells] - self.cell_lon / 2
+        base_lats = self.center_lats[cells] - self.cell_lat / 2
+        lons = base_lons + rng.random(len(cells)) * self.cell_lon
+        lats = base_lats + rng.random(len(cells)) * self.cell_lat
+        outside = np.flatnonzero(~points_in_polygon(lons, lats, self.polygon))
+        for _ in range(MAX_JITTER_ROUNDS):
+            if not len(outside):
+                break
+            lons[outside] = base_lons[outside] + rng.random(len(outside)) * self.cell_lon
+            lats[outside] = base_lats[outside] + rng.random(len(outside)) * self.cell_lat
+            outside = outside[~points_in_polygon(lons[outside], lats[outside], self.polygon)]
+        lons[outside] = self.center_lons[cells[outside]]
+        lats[outside] = self.center_lats[cells[outside]]
+        return lats, lons
+
+
+def load_geo_model(path):
+    """
+    Load a geo model from a JSON file with ``polygon`` and optional ``grid``, ``base`` and
+    ``hotspots`` entries.
+
+    Args:
+        path (str or Path): Geo profile JSON file.
+
+    Returns:
+        GeoModel: The compiled model.
+
+    Raises:
+        ValueError: If the profile is malformed.
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if "polygon" not in data:
+        raise ValueError("Geo profile needs a 'polygon'.")
+    return GeoModel(
+        data["polygon"],
+        grid=data.get("grid", (100, 100)),
+        base=data.get("base", 1.0),
+        hotspots=data.get("hotspots"),
+    )
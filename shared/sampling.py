@@ -0,0 +1,64 @@
+"""
+Weighted sampling helpers for the Synth911 application.
+
+Walker's alias method turns a discrete distribution into two flat tables once, in O(n);
+afterwards every draw costs one uniform index, one uniform coin and one comparison,
+regardless of how many outcomes the distribution has.
+"""
+
+import numpy as np
+
+
+class AliasTable:
+    """
+    Walker alias table over the outcomes ``0 .. len(weights) - 1``.
+
+    Args:
+        weights (array-like): Non-negative relative weight of each outcome.
+
+    Raises:
+        ValueError: If the weights are empty, negative or all zero.
+    """
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or not len(weights):
+            raise ValueError("Alias table needs a non-empty list of weights.")
+        if (weights < 0).any() or not np.isfinite(weights).all():
+            raise ValueError("Alias table weights must be finite and non-negative.")
+        total = weights.sum()
+        if total <= 0:
+            raise ValueError("Alias table weights must not all be zero.")
+
+        # Vose's construction: pair each under-full column with an over-full one
+        size = len(weights)
+        probability = weights * (size / total)
+        alias = np.arange(size, dtype=np.int64)
+        small = np.flatnonzero(probability < 1.0).tolist()
+        large = np.flatnonzero(probability >= 1.0).tolist()
+        scaled = probability.tolist()
+        while small and large:
+            less, more = small.pop(), large[-1]
+            alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(large.pop())
+        self.probability = np.array(scaled)
+        # Columns left over are full up to rounding error
+        self.probability[small + large] = 1.0
+        self.alias = alias
+        self.size = size
+
+    def sample(self, size, rng):
+        """
+        Draw outcomes from the table.
+
+        Args:
+            size (int): Number of draws.
+            rng (np.random.Generator): Random generator to draw from.
+
+        Returns:
+            np.ndarray: Outcome indices.
+        """
+        columns = rng.integers(0, self.size, size=size)
+        return np.where(rng.random(size) < self.probability[columns], columns, self.alias[columns])
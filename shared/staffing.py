@@ -0,0 +1,101 @@
+"""
+Workload-aware staff assignment for the Synth911 application.
+
+Instead of drawing a call taker or dispatcher at random, each call goes to the position of
+its PSAP and shift that became free first. Every roster keeps a heap of (free time,
+position) pairs, so a call costs one heap replace: O(n log k) for n calls and k positions.
+When every position is busy the call waits for the first one to clear, and that wait is
+reported so it can be added to the call's queue or dispatch time.
+"""
+
+import heapq
+
+import numpy as np
+import polars as pl
+
+from shared.constants import TIMESTAMP_FORMAT
+
+# Length of the day and night blocks worked by one shift, in seconds
+SHIFT_BLOCK_SECONDS = 12 * 3600
+
+# Day shifts start at 06:00, so blocks are counted from there
+SHIFT_BLOCK_START = 6 * 3600
+
+
+def assign_positions(arrivals, durations, group_codes, group_sizes, rng):
+    """
+    Assign every call to the position of its roster that frees up first.
+
+    Args:
+        arrivals (np.ndarray): Second at which each call needs a position.
+        durations (np.ndarray): Seconds the call keeps the position busy.
+        group_codes (np.ndarray): Roster (PSAP and shift) code of each call.
+        group_sizes (np.ndarray): Number of positions per roster code.
+        rng (np.random.Generator): Random generator; shuffles who takes the first calls.
+
+    Returns:
+        tuple: (positions within the roster, seconds each call waited for a position)
+    """
+    # Positions start idle in random order; the longest-idle position takes the next call
+    heaps = [
+        [(-int(rank), position) for position, rank in enumerate(rng.permutation(int(size)))]
+        for size in group_sizes
+    ]
+    for heap in heaps:
+        heapq.heapify(heap)
+
+    arrival = arrivals.tolist()
+    duration = durations.tolist()
+    group = group_codes.tolist()
+    positions = [0] * len(arrival)
+    waits = [0] * len(arrival)
+    heapreplace = heapq.heapreplace
+    for call in np.argsort(arrivals, kind="stable").tolist():
+        heap = heaps[group[call]]
+        free_at, position = heap[0]
+        start = max(arrival[call], free_at)
+        heapreplace(heap, (start + duration[call], position))
+        positions[call] = position
+        waits[call] = start - arrival[call]
+    return np.array(positions, dtype=np.int64), np.array(waits, dtype=np.int64)
+
+
+def staff_utilization(df):
+    """
+    Summarize the workload of every call taker and dispatcher.
+
+    Busy time is the phone time for call takers and the dispatch time for dispatchers.
+    Time on duty is counted in the 12-hour day and night blocks in which the position's
+    shift handled calls.
+
+    Args:
+        df (pl.DataFrame): Output of generate_911_data.
+
+    Returns:
+        pl.DataFrame: One row per role, PSAP, shift and name with calls, busy_seconds,
+        on_duty_seconds and utilization.
+    """
+    if df.schema["event_time"] == pl.Utf8:
+        df = df.with_columns(pl.col("event_time").str.to_datetime(TIMESTAMP_FORMAT))
+    psap = pl.col("psap").cast(pl.Utf8) if "psap" in df.columns else pl.lit("PSAP")
+    blocks = (
+        (pl.col("event_time").dt.epoch("s") - SHIFT_BLOCK_START) // SHIFT_BLOCK_SECONDS
+    ).alias("block")
+    frames = []
+    for role, column, busy in (("CALL TAKER", "call_taker", "phone_time"),
+                               ("DISPATCHER", "dispatcher", "dispatch_time")):
+        frames.append(df.select(
+            pl.lit(role).alias("role"), psap.alias("psap"), pl.col("shift"),
+            pl.col(column).alias("name"), pl.col(busy).alias("busy"), blocks,
+        ))
+    calls = pl.concat(frames)
+    on_duty = calls.group_by("role", "psap", "shift").agg(
+        (pl.col("block").n_unique() * SHIFT_BLOCK_SECONDS).alias("on_duty_seconds")
+    )
+    return (
+        calls.group_by("role", "psap", "shift", "name")
+        .agg(pl.len().alias("calls"), pl.col("busy").sum().alias("busy_seconds"))
+        .join(on_duty, on=["role", "psap", "shift"])
+        .with_columns((pl.col("busy_seconds") / pl.col("on_duty_seconds")).alias("utilization"))
+        .sort("role", "psap", "shift", "name")
+    )
@@ -0,0 +1,189 @@
+"""
+Star-schema output for the Synth911 application.
+
+Splits a generated call DataFrame into a compact fact table of integer keys and durations
+plus dimension tables for agencies, call types, staff, reception methods, dispositions and
+calendar days. Enum columns already carry integer codes, so their keys are the physical
+codes; only the staff keys need a join on names.
+"""
+
+from pathlib import Path
+
+import polars as pl
+
+from shared.constants import TIMESTAMP_FORMAT
+
+# Duration columns carried on the fact table; every other timestamp derives from them
+FACT_DURATIONS = [
+    "queue_time",
+    "dispatch_time",
+    "phone_time",
+    "ack_time",
+    "enroute_time",
+    "on_scene_time",
+]
+
+# Roles written to the staff dimension
+STAFF_ROLES = {"call_taker": "CALL TAKER", "dispatcher": "DISPATCHER"}
+
+
+def _dimension(series, key_name):
+    """
+    Split a column into integer keys and the distinct values they refer to.
+
+    Args:
+        series (pl.Series): An Enum or string column.
+        key_name (str): Name of the key column.
+
+    Returns:
+        tuple: (pl.Series of keys, pl.DataFrame with the key and value columns)
+    """
+    if not isinstance(series.dtype, pl.Enum):
+        series = series.cast(pl.Enum(series.drop_nulls().unique().sort().to_list()))
+    categories = series.dtype.categories
+    keys = series.to_physical().cast(pl.UInt32).alias(key_name)
+    dim = pl.DataFrame({
+        key_name: pl.Series(range(len(categories)), dtype=pl.UInt32),
+        series.name: categories,
+    })
+    return keys, dim
+
+
+def _event_times(df):
+    """Return the event_time column as a native datetime, parsing formatted strings."""
+    if df.schema["event_time"] == pl.Utf8:
+        return pl.col("event_time").str.to_datetime(TIMESTAMP_FORMAT)
+    return pl.col("event_time")
+
+
+def build_star_schema(df, call_taker_names, dispatcher_names, catalog, agency_registry):
+    """
+    Normalize generated calls into a fact table and its dimension tables.
+
+    Args:
+        df (pl.DataFrame): Output of generate_911_data.
+        call_taker_names (dict): Call-taker rosters returned by generate_911_data.
+        dispatcher_names (dict): Dispatcher rosters returned by generate_911_data.
+        catalog (CallTypeCatalog): Catalog the calls were generated from.
+        agency_registry (AgencyRegistry): Registry the calls were generated from.
+
+    Returns:
+        dict: Table name mapped to its DataFrame; ``fact_calls`` plus one ``dim_*`` per dimension.
+    """
+    tables = {}
+
+    # Agencies: keys are the registry's agency codes
+    agency_keys = df["agency"].to_physical().cast(pl.UInt32).alias("agency_key")
+    tables["dim_agency"] = pl.DataFrame({
+        "agency_key": pl.Series(range(len(agency_registry.names)), dtype=pl.UInt32),
+        "agency": agency_registry.names,
+        "discipline": [agency.discipline for agency in agency_registry.agencies],
+        "prefix": agency_registry.prefixes,
+        "psap": [agency.psap for agency in agency_registry.agencies],
+    })
+
+    # Call types: keys are catalog codes; the problem column may hold translated names
+    call_type_keys = df["problem"].to_physical().cast(pl.UInt32).alias("call_type_key")
+    tables["dim_call_type"] = pl.DataFrame({
+        "call_type_key": pl.Series(range(len(catalog.names)), dtype=pl.UInt32),
+        "problem": df["problem"].dtype.categories,
+        "catalog_name": catalog.names,
+        "discipline": [catalog.disciplines[code] for code in catalog.discipline_codes],
+        "priority_number": catalog.priorities,
+    })
+
+    reception_keys, tables["dim_reception"] = _dimension(df["call_reception"], "reception_key")
+    disposition_keys, tables["dim_disposition"] = _dimension(df["disposition"], "disposition_key")
+
+    # Staff: one row per roster slot, keyed across both roles
+    staff_rows = []
+    for column, rosters in (("call_taker", call_taker_names), ("dispatcher", dispatcher_names)):
+        by_psap = rosters if agency_registry.multi_psap else {agency_registry.psaps[0]: rosters}
+        for psap, shifts in by_psap.items():
+            for shift, names in shifts.items():
+                staff_rows.extend((STAFF_ROLES[column], psap, shift, name) for name in names)
+    tables["dim_staff"] = (
+        pl.DataFrame(staff_rows, schema=["role", "psap", "shift", "name"], orient="row")
+        .unique(maintain_order=True)
+        .with_row_index("staff_key")
+    )
+
+    event_times = df.select(_event_times(df).alias("event_time"))["event_time"]
+    date_keys = (
+        event_times.dt.year() * 10000 + event_times.dt.month() * 100 + event_times.dt.day()
+    ).cast(pl.UInt32).alias("date_key")
+
+    fact = pl.DataFrame([
+        df["call_id"],
+        agency_keys,
+        call_type_keys,
+        date_keys,
+        event_times,
+        reception_keys,
+        disposition_keys,
+    ]).with_columns(
+        df.select(FACT_DURATIONS).cast(pl.UInt32)
+    )
+    if "incident_id" in df.columns:
+        fact = fact.insert_column(1, df["incident_id"])
+
+    # Resolve staff names to keys within their role, PSAP and shift
+    psaps = (
+        df["psap"].cast(pl.Utf8) if "psap" in df.columns
+        else pl.Series("psap", [agency_registry.psaps[0]] * len(df), dtype=pl.Utf8)
+    )
+    for column, role in STAFF_ROLES.items():
+        staff = tables["dim_staff"].filter(pl.col("role") == role).drop("role")
+        lookup = pl.DataFrame({"psap": psaps, "shift": df["shift"], "name": df[column]}).join(
+            staff, on=["psap", "shift", "name"], how="left", maintain_order="left"
+        )
+        fact = fact.insert_column(
+            fact.columns.index("reception_key"), lookup["staff_key"].alias(f"{column}_key")
+        )
+    tables["fact_calls"] = fact
+
+    # Calendar: one row per day present in the fact table
+    tables["dim_calendar"] = (
+        event_times.dt.date().unique().sort().to_frame("date")
+        .with_columns(
+            (pl.col("date").dt.year() * 10000 + pl.col("date").dt.month() * 100
+             + pl.col("date").dt.day()).cast(pl.UInt32).alias("date_key"),
+            pl.col("date").dt.year().alias("year"),
+            pl.col("date").dt.quarter().alias("quarter"),
+            pl.col("date").dt.month().alias("month"),
+            pl.col("date").dt.day().alias("day"),
+            pl.col("date").dt.ordinal_day().alias("day_of_year"),
+            pl.col("date").dt.week().alias("week_no"),
+            pl.col("date").dt.strftime("%a").str.to_uppercase().alias("dow"),
+            (pl.col("date").dt.weekday() >= 6).alias("is_weekend"),
+        )
+        .select("date_key", pl.exclude("date_key"))
+    )
+    return {"fact_calls": tables.pop("fact_calls"), **tables}
+
+
+def write_star_schema(tables, output_dir, file_format="csv"):
+    """
+    Write star-schema tables to a directory, one file per table.
+
+    Args:
+        tables (dict): Output of build_star_schema.
+        output_dir (str or Path): Directory to write into; created if missing.
+        file_format (str, optional): "csv" or "parquet". Defaults to "csv".
+
+    Returns:
+        list: Paths of the written files.
+    """
+    if file_format not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported star-schema format '{file_format}'.")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, table in tables.items():
+        path = output_dir / f"{name}.{file_format}"
+        if file_format == "csv":
+            table.write_csv(path, datetime_format=TIMESTAMP_FORMAT)
+        else:
+            table.write_parquet(path)
+        paths.append(path)
+    return paths
@@ -0,0 +1,144 @@
+"""
+Multi-unit response generation for the Synth911 application.
+
+Builds a ``units`` child table keyed by call_id with one row per responding unit. The
+number of units per call depends on the agency and the call's priority, and the per-unit
+times for every unit of every call are drawn in one vectorized sample-and-explode pass:
+unit counts are drawn per call, call rows are repeated by their counts, and all unit
+durations are sampled as flat arrays.
+"""
+
+import numpy as np
+import polars as pl
+
+from shared.constants import TIMESTAMP_FORMAT
+from shared.distributions import load_distribution_profile
+from shared.durations import row_scales
+
+# Mean number of units sent in addition to the first one, per discipline and priority 1-5
+DEFAULT_UNIT_MEANS = {
+    "LAW": [2.0, 1.0, 0.3, 0.1, 0.0],
+    "FIRE": [3.5, 1.5, 0.5, 0.2, 0.0],
+    "EMS": [1.5, 0.5, 0.1, 0.0, 0.0],
+    "RESCUE": [3.0, 1.5, 0.5, 0.1, 0.0],
+}
+
+# Used for disciplines without an entry in DEFAULT_UNIT_MEANS
+FALLBACK_UNIT_MEANS = [1.0, 0.5, 0.1, 0.0, 0.0]
+
+# Fleet size used to number units when the agency does not define one
+DEFAULT_FLEET_SIZE = 40
+
+# Upper bound on the units sent to a single call
+MAX_UNITS = 12
+
+
+def unit_mean_table(agency_registry):
+    """
+    Build the (agency, priority) table of mean extra units.
+
+    Args:
+        agency_registry (AgencyRegistry): Registry of the generated calls.
+
+    Returns:
+        np.ndarray: Array of shape (number of agencies, 6) indexed by agency code and
+        priority number; column 0 is unused.
+    """
+    table = np.zeros((len(agency_registry.agencies), 6))
+    for code, agency in enumerate(agency_registry.agencies):
+        means = agency.unit_means or DEFAULT_UNIT_MEANS.get(agency.discipline, FALLBACK_UNIT_MEANS)
+        table[code, 1:] = means
+    return table
+
+
+def _native(df, column):
+    """Return a timestamp column as native datetimes, parsing formatted strings."""
+    if df.schema[column] == pl.Utf8:
+        return df[column].str.to_datetime(TIMESTAMP_FORMAT)
+    return df[column]
+
+
+def generate_units(df, agency_registry, rng=None, max_units=MAX_UNITS, distribution_profile=None):
+    """
+    Generate the responding units of each call.
+
+    The first unit of a call reuses the call's own ack, enroute and on-scene durations, so
+    its timestamps match the call row. Additional units are dispatched shortly after the
+    first one and get their own durations.
+
+    Args:
+        df (pl.DataFrame): Output of generate_911_data.
+        agency_registry (AgencyRegistry): Registry the calls were generated from.
+        rng (np.random.Generator, optional): Random generator. Defaults to a fresh generator.
+        max_units (int, optional): Upper bound on units per call. Defaults to MAX_UNITS.
+        distribution_profile (DistributionProfile, optional): Profile supplying the unit
+            duration and stagger distributions. Defaults to the bundled profile.
+
+    Returns:
+        pl.DataFrame: One row per unit with call_id, unit_seq, unit_id, agency, durations
+        and the unit's dispatched, acknowledged, enroute and cleared timestamps.
+    """
+    rng = rng or np.random.default_rng()
+    distribution_profile = distribution_profile or load_distribution_profile()
+    num_calls = len(df)
+    agency_codes = df["agency"].to_physical().to_numpy().astype(np.int64)
+    priorities = np.clip(df["priority_number"].to_numpy(), 1, 5)
+
+    # Sample: unit count per call from its (agency, priority) cell
+    means = unit_mean_table(agency_registry)[agency_codes, priorities]
+    counts = np.minimum(1 + rng.poisson(means), max_units)
+
+    # Explode: repeat each call once per unit and number the units within their call
+    call_rows = np.repeat(np.arange(num_calls), counts)
+    firsts = np.cumsum(counts) - counts
+    unit_seq = np.arange(len(call_rows)) - np.repeat(firsts, counts) + 1
+    is_first = unit_seq == 1
+    unit_agency = agency_codes[call_rows]
+
+    # Per-unit durations, drawn for all unit rows at once with the call's (agency, priority)
+    # scale factors; the first unit keeps the call's values
+    scales = row_scales(agency_registry, unit_agency, priorities[call_rows])
+    num_units = len(call_rows)
+    ack_time, enroute_time, on_scene_time = (
+        distribution_profile.sample(column, rng, num_units, scales[column])
+        for column in ("ack_time", "enroute_time", "on_scene_time")
+    )
+    stagger = np.where(is_first, 0, distribution_profile.sample("unit_stagger", rng, num_units))
+    first_rows = call_rows[is_first]
+    for values, column in ((ack_time, "ack_time"), (enroute_time, "enroute_time"),
+                           (on_scene_time, "on_scene_time")):
+        values[is_first] = df[column].to_numpy()[first_rows]
+
+    # Number units within the agency fleet; consecutive numbers keep a call's units distinct
+    fleet_sizes = np.array(
+        [agency.units or DEFAULT_FLEET_SIZE for agency in agency_registry.agencies], dtype=np.int64
+    )
+    fleet = fleet_sizes[unit_agency]
+    # The first unit's offset is drawn inside the call's fleet, so the sum stays small and exact
+    base = rng.integers(0, fleet_sizes[agency_codes])[call_rows]
+    unit_numbers = (base + unit_seq - 1) % fleet + 1
+
+    dispatched = _native(df, "time_call_dispatched").gather(call_rows)
+    units = pl.DataFrame({
+        "call_id": df["call_id"].gather(call_rows),
+        "unit_seq": pl.Series(unit_seq, dtype=pl.UInt16),
+        "unit_id": agency_registry.prefixes.gather(unit_agency),
+        "agency": df["agency"].gather(call_rows),
+        "ack_time": ack_time,
+        "enroute_time": enroute_time,
+        "on_scene_time": on_scene_time,
+        "time_unit_dispatched": dispatched,
+        "stagger": stagger,
+    })
+    return units.with_columns(
+        pl.concat_str(
+            pl.col("unit_id"), pl.Series(unit_numbers).cast(pl.Utf8).str.zfill(3), separator="-"
+        ).alias("unit_id"),
+        (pl.col("time_unit_dispatched") + pl.duration(seconds=pl.col("stagger"))).alias("time_unit_dispatched"),
+    ).with_columns(
+        (pl.col("time_unit_dispatched") + pl.duration(seconds=pl.col("ack_time"))).alias("time_unit_acknowledged"),
+    ).with_columns(
+        (pl.col("time_unit_acknowledged") + pl.duration(seconds=pl.col("enroute_time"))).alias("time_unit_enroute"),
+    ).with_columns(
+        (pl.col("time_unit_enroute") + pl.duration(seconds=pl.col("on_scene_time"))).alias("time_unit_cleared"),
+    ).drop("stagger")
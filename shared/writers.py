@@ -0,0 +1,709 @@
+"""
+Batch output writers for the Synth911 application.
+
+Every output format is a BatchWriter: it is opened once, receives the generated calls as a
+sequence of batches through write(), and finalizes the file in close(). Writers register
+themselves under a format name with the writer_format decorator, so the CLI resolves
+``--format`` through the WRITERS registry and a new format only needs a new class.
+
+Generation is vectorized over the whole run (unit simulation, staffing and incident
+clusters all carry state across the full date range), so the generated frame is fully in
+memory before anything is written and the batches handed to a writer are zero-copy slices
+of it. Batching bounds what the writers buffer (one serialized batch, or one row group, at
+a time), not the peak memory of a run, which grows with the number of records.
+"""
+
+import gzip
+import io
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from shared.constants import TIMESTAMP_FORMAT
+
+# Rows per batch handed to a writer; for Parquet this is also the row-group size
+DEFAULT_BATCH_SIZE = 100_000
+
+# Parquet compression codecs and the default one
+PARQUET_COMPRESSIONS = ("zstd", "lz4", "snappy", "none")
+DEFAULT_PARQUET_COMPRESSION = "zstd"
+
+# CSV compression: each batch becomes an independent gzip member or zstd frame
+CSV_COMPRESSIONS = ("gzip", "zstd")
+CSV_COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+# Compression threads, and batches compressing at once per thread before the writer waits
+DEFAULT_COMPRESS_WORKERS = os.cpu_count() or 1
+PENDING_PER_WORKER = 2
+
+# Batches waiting per fan-out writer before the generator blocks
+DEFAULT_QUEUE_DEPTH = 4
+
+# SQLite table loaded by default and the columns indexed once the load is done
+DEFAULT_SQLITE_TABLE = "calls"
+SQLITE_INDEX_COLUMNS = ("event_time", "agency", "call_id")
+
+# Bulk-load pragmas: large pages, one writer, WAL journal, no fsync per transaction, large cache
+SQLITE_PRAGMAS = (
+    "PRAGMA page_size=65536",
+    "PRAGMA locking_mode=EXCLUSIVE",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+)
+
+# Partition keys derived from event_time rather than read from a column
+DERIVED_PARTITION_KEYS = {
+    "year": pl.col("event_time").dt.year().cast(pl.Utf8),
+    "month": pl.col("event_time").dt.month().cast(pl.Utf8).str.zfill(2),
+    "day": pl.col("event_time").dt.day().cast(pl.Utf8).str.zfill(2),
+}
+
+# Partition files kept open at once; the least recently written one is closed first
+DEFAULT_MAX_OPEN_FILES = 64
+
+# Name of the per-partition index file
+PARTITION_INDEX = "_index.json"
+
+# Output format name mapped to its BatchWriter class
+WRITERS = {}
+
+# File suffixes recognized when no format is given
+SUFFIX_FORMATS = {
+    ".sqlite": "sqlite",
+    ".db": "sqlite",
+    ".csv": "csv",
+    ".gz": "csv",
+    ".zst": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+
+def writer_format(name):
+    """
+    Register a BatchWriter class under an output format name.
+
+    Args:
+        name (str): Format name used by ``--format`` and open_writer().
+
+    Returns:
+        Callable: Class decorator adding the class to WRITERS.
+    """
+    def register(cls):
+        cls.format_name = name
+        WRITERS[name] = cls
+        return cls
+    return register
+
+
+class BatchWriter:
+    """
+    Base class of the batch writers; usable as a context manager.
+
+    Args:
+        path (str or Path): Destination file or directory.
+    """
+
+    format_name = None
+
+    def __init__(self, path, **options):
+        self.path = Path(path)
+        self.rows = 0
+
+    def write(self, batch):
+        """
+        Append a batch of calls.
+
+        Args:
+            batch (pl.DataFrame): Consecutive generated calls.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and finalize the output."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+
+def _compressor(compress, level=None):
+    """Return a function compressing bytes into one self-contained gzip member or zstd frame."""
+    if compress == "gzip":
+        level = 6 if level is None else level
+        return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    codec = pa.Codec("zstd", compression_level=level)
+    return lambda data: codec.compress(data, asbytes=True)
+
+
+@writer_format("csv")
+class CsvWriter(BatchWriter):
+    """
+    CSV, with the header written before the first batch, optionally compressed.
+
+    When compressed, every batch is serialized and handed to a thread pool that compresses
+    it into an independent gzip member or zstd frame; the frames are written in batch order
+    as they complete. Concatenated members and frames form a valid multi-member gzip or
+    multi-frame zstd file, so no separate compression pass over the output is needed.
+
+    Args:
+        path (str or Path): Destination CSV file.
+        compress (str, optional): "gzip" or "zstd". Defaults to the path's ``.gz``/``.zst``
+            suffix, else uncompressed.
+        compression_level (int, optional): Codec level. Defaults to the codec's own.
+        workers (int, optional): Compression threads. Defaults to DEFAULT_COMPRESS_WORKERS.
+
+    Raises:
+        ValueError: If the compression is not supported.
+    """
+
+    def __init__(self, path, compress=None, compression_level=None, workers=DEFAULT_COMPRESS_WORKERS, **options):
+        super().__init__(path)
+        compress = compress or CSV_COMPRESSION_SUFFIXES.get(self.path.suffix.lower())
+        if compress is not None and compress not in CSV_COMPRESSIONS:
+            raise ValueError(
+                f"Unsupported CSV compression '{compress}'; choose from {', '.join(CSV_COMPRESSIONS)}."
+            )
+        self.compress = compress
+        self._pool = None
+        if compress is not None:
+            self._compress = _compressor(compress, compression_level)
+            self._pool = ThreadPoolExecutor(max_workers=max(int(workers), 1))
+            self._pending = deque()
+            self._max_pending = max(int(workers), 1) * PENDING_PER_WORKER
+        self._handle = open(self.path, "wb")
+
+    def write(self, batch):
+        include_header = self.rows == 0
+        self.rows += len(batch)
+        if self._pool is None:
+            batch.write_csv(self._handle, include_header=include_header, datetime_format=TIMESTAMP_FORMAT)
+            return
+        buffer = io.BytesIO()
+        batch.write_csv(buffer, include_header=include_header, datetime_format=TIMESTAMP_FORMAT)
+        self._pending.append(self._pool.submit(self._compress, buffer.getvalue()))
+        # Bound the memory held by batches waiting for compression
+        while len(self._pending) > self._max_pending:
+            self._handle.write(self._pending.popleft().result())
+
+    def close(self):
+        if self._pool is not None:
+            while self._pending:
+                self._handle.write(self._pending.popleft().result())
+            self._pool.shutdown()
+            self._pool = None
+        if not self._handle.closed:
+            self._handle.close()
+
+
+@writer_format("ndjson")
+class NdjsonWriter(BatchWriter):
+    """
+    Newline-delimited JSON, one flat object per call with typed values.
+
+    Args:
+        path (str or Path): Destination NDJSON file.
+    """
+
+    def __init__(self, path, **options):
+        super().__init__(path)
+        self._handle = open(self.path, "wb")
+
+    def write(self, batch):
+        batch.with_columns(pl.col(pl.Datetime).dt.strftime(TIMESTAMP_FORMAT)).write_ndjson(self._handle)
+        self.rows += len(batch)
+
+    def close(self):
+        if not self._handle.closed:
+            self._handle.close()
+
+
+@writer_format("parquet")
+class ParquetWriter(BatchWriter):
+    """
+    Parquet with one row group per batch, keeping native datetime and Enum types.
+
+    Column statistics (min/max per row group) are always written, so readers can skip row
+    groups by event time or agency.
+
+    Args:
+        path (str or Path): Destination Parquet file.
+        compression (str, optional): One of PARQUET_COMPRESSIONS. Defaults to
+            DEFAULT_PARQUET_COMPRESSION.
+        compression_level (int, optional): Codec level, for zstd. Defaults to the codec's own.
+
+    Raises:
+        ValueError: If the compression codec is not supported.
+    """
+
+    def __init__(self, path, compression=DEFAULT_PARQUET_COMPRESSION, compression_level=None, **options):
+        super().__init__(path)
+        if compression not in PARQUET_COMPRESSIONS:
+            raise ValueError(
+                f"Unsupported Parquet compression '{compression}'; choose from {', '.join(PARQUET_COMPRESSIONS)}."
+            )
+        self.compression = compression
+        self.compression_level = compression_level
+        # The schema comes from the first batch, so the file is opened on the first write
+        self._writer = None
+
+    def write(self, batch):
+        table = batch.to_arrow(compat_level=pl.CompatLevel.oldest())
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                self.path, table.schema, compression=self.compression,
+                compression_level=self.compression_level, write_statistics=True,
+            )
+        self._writer.write_table(table, row_group_size=max(len(batch), 1))
+        self.rows += len(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+@writer_format("arrow")
+class ArrowWriter(BatchWriter):
+    """
+    Arrow IPC file (Feather v2), one record batch per batch.
+
+    The file is written uncompressed so readers can memory-map it and use the buffers in
+    place, e.g. ``pl.read_ipc(path, memory_map=True)`` or ``pa.ipc.open_file(pa.memory_map(path))``;
+    reopening a dataset then costs only reading its footer.
+
+    Args:
+        path (str or Path): Destination Arrow file.
+    """
+
+    def __init__(self, path, **options):
+        super().__init__(path)
+        self._sink = None
+        self._writer = None
+
+    def write(self, batch):
+        table = batch.to_arrow(compat_level=pl.CompatLevel.oldest())
+        if self._writer is None:
+            self._sink = pa.OSFile(str(self.path), "wb")
+            self._writer = pa.ipc.new_file(self._sink, table.schema)
+        self._writer.write_table(table, max_chunksize=max(len(batch), 1))
+        self.rows += len(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = None
+
+
+def _sqlite_type(dtype):
+    """Return the SQLite column type of a polars dtype."""
+    if dtype.is_integer() or dtype == pl.Boolean:
+        return "INTEGER"
+    if dtype.is_float():
+        return "REAL"
+    return "TEXT"
+
+
+@writer_format("sqlite")
+class SqliteWriter(BatchWriter):
+    """
+    SQLite table loaded in bulk.
+
+    The table is created from the first batch's schema (integers, reals, and text for
+    names and ``YYYY-MM-DD HH:MM:SS`` timestamps). Every batch is inserted with one
+    executemany inside its own transaction, and the indexes are built only after the load,
+    which is far cheaper than maintaining them row by row.
+
+    Args:
+        path (str or Path): Destination database file; an existing table of the same name
+            is replaced.
+        table (str, optional): Table name. Defaults to DEFAULT_SQLITE_TABLE.
+        index_columns (tuple, optional): Columns indexed after the load. Defaults to
+            SQLITE_INDEX_COLUMNS.
+    """
+
+    def __init__(self, path, table=DEFAULT_SQLITE_TABLE, index_columns=SQLITE_INDEX_COLUMNS, **options):
+        super().__init__(path)
+        self.table = table
+        self.index_columns = index_columns
+        # A fan-out writer thread may load the table; only one thread uses it at a time
+        self._connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        for pragma in SQLITE_PRAGMAS:
+            self._connection.execute(pragma)
+        self._insert = None
+
+    def _create(self, schema):
+        """Create the table from a batch schema and prepare the insert statement."""
+        columns = ", ".join(f'"{name}" {_sqlite_type(dtype)}' for name, dtype in schema.items())
+        self._connection.execute(f'DROP TABLE IF EXISTS "{self.table}"')
+        self._connection.execute(f'CREATE TABLE "{self.table}" ({columns})')
+        self._insert = f'INSERT INTO "{self.table}" VALUES ({", ".join("?" * len(schema))})'
+
+    def write(self, batch):
+        if self._insert is None:
+            self._create(batch.schema)
+        # Timestamps become sortable text and Enum names plain strings
+        batch = batch.with_columns(
+            pl.col(pl.Datetime).dt.strftime(TIMESTAMP_FORMAT),
+            pl.col(pl.Enum, pl.Categorical).cast(pl.Utf8),
+        )
+        # Whole columns become Python lists at once; iter_rows builds every row in Python
+        rows = zip(*(batch[name].to_list() for name in batch.columns))
+        self._connection.execute("BEGIN")
+        self._connection.executemany(self._insert, rows)
+        self._connection.execute("COMMIT")
+        self.rows += len(batch)
+
+    def close(self):
+        if self._connection is None:
+            return
+        if self._insert is not None:
+            for column in self.index_columns:
+                self._connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{self.table}_{column}" ON "{self.table}" ("{column}")'
+                )
+            self._connection.execute("PRAGMA optimize")
+        self._connection.close()
+        self._connection = None
+
+
+class PartitionedWriter(BatchWriter):
+    """
+    Hive-partitioned output, e.g. ``year=2024/month=03/agency=LAW/part-0001.parquet``.
+
+    Each batch is split by its partition keys and routed to one writer per partition. At
+    most max_open partition files are open at once; a partition written to again after its
+    file was closed gets a new part file. On close every partition directory receives an
+    index file listing its parts with their row counts and event_time range. Partition
+    columns live in the directory names, not in the files.
+
+    Args:
+        path (str or Path): Root directory of the dataset.
+        partition_by (list): Partition keys: ``year``, ``month``, ``day`` (from event_time)
+            or column names.
+        file_format (str, optional): Format of the part files. Defaults to "parquet".
+        max_open (int, optional): Open file limit. Defaults to DEFAULT_MAX_OPEN_FILES.
+        **options: Options of the part-file writer.
+
+    Raises:
+        ValueError: If no key is given, the format is unknown or max_open is not positive.
+    """
+
+    def __init__(self, path, partition_by, file_format="parquet", max_open=DEFAULT_MAX_OPEN_FILES, **options):
+        super().__init__(path)
+        self.partition_by = list(partition_by)
+        if not self.partition_by:
+            raise ValueError("Partitioned output needs at least one partition key.")
+        if file_format not in WRITERS:
+            raise ValueError(f"Unsupported output format '{file_format}'; choose from {', '.join(WRITERS)}.")
+        if max_open < 1:
+            raise ValueError("The open partition file limit must be a positive integer.")
+        self.file_format = file_format
+        self.max_open = max_open
+        self.options = options
+        # Compressed CSV parts keep the compression suffix
+        self._suffix = ""
+        if file_format == "csv" and options.get("compress"):
+            self._suffix = {codec: suffix for suffix, codec in CSV_COMPRESSION_SUFFIXES.items()}[options["compress"]]
+        self._open = OrderedDict()
+        # Partition key tuple mapped to its directory and list of part entries
+        self._parts = {}
+
+    def _writer(self, key):
+        """Return the open writer of a partition, opening a new part file if needed."""
+        if key in self._open:
+            self._open.move_to_end(key)
+            return self._open[key]
+        if len(self._open) >= self.max_open:
+            _, oldest = self._open.popitem(last=False)
+            oldest.close()
+        if key not in self._parts:
+            directory = self.path.joinpath(*(
+                f"{name}={quote(value, safe=' ')}" for name, value in zip(self.partition_by, key)
+            ))
+            directory.mkdir(parents=True, exist_ok=True)
+            self._parts[key] = (directory, [])
+        directory, parts = self._parts[key]
+        file_name = f"part-{len(parts) + 1:04d}.{self.file_format}{self._suffix}"
+        parts.append({"file": file_name, "rows": 0, "min_event_time": None, "max_event_time": None})
+        writer = WRITERS[self.file_format](directory / file_name, **self.options)
+        self._open[key] = writer
+        return writer
+
+    def write(self, batch):
+        keys = []
+        for name in self.partition_by:
+            if name in DERIVED_PARTITION_KEYS:
+                keys.append(DERIVED_PARTITION_KEYS[name].alias(f"_{name}"))
+            elif name in batch.columns:
+                keys.append(pl.col(name).cast(pl.Utf8).fill_null("__null__").alias(f"_{name}"))
+            else:
+                raise ValueError(f"Unknown partition key '{name}'.")
+        key_columns = [f"_{name}" for name in self.partition_by]
+        dropped = [name for name in self.partition_by if name in batch.columns]
+        groups = batch.with_columns(keys).partition_by(key_columns, as_dict=True, maintain_order=True)
+        for key, part in groups.items():
+            writer = self._writer(key)
+            writer.write(part.drop(key_columns + dropped))
+            entry = self._parts[key][1][-1]
+            entry["rows"] += len(part)
+            low, high = part["event_time"].min(), part["event_time"].max()
+            entry["min_event_time"] = min(filter(None, (entry["min_event_time"], low)))
+            entry["max_event_time"] = max(filter(None, (entry["max_event_time"], high)))
+        self.rows += len(batch)
+
+    def close(self):
+        while self._open:
+            _, writer = self._open.popitem(last=False)
+            writer.close()
+        for key, (directory, parts) in self._parts.items():
+            index = {
+                "partition": dict(zip(self.partition_by, key)),
+                "rows": sum(part["rows"] for part in parts),
+                "files": [
+                    {**part, "min_event_time": str(part["min_event_time"]),
+                     "max_event_time": str(part["max_event_time"])}
+                    for part in parts
+                ],
+            }
+            (directory / PARTITION_INDEX).write_text(json.dumps(index, indent=2), encoding="utf-8")
+        self._parts = {}
+
+
+# Marks the end of a fan-out queue
+_CLOSE = object()
+
+
+class FanOutWriter(BatchWriter):
+    """
+    Hand every batch to several writers at once.
+
+    Each writer runs on its own thread behind a bounded queue, so all outputs are written
+    concurrently from a single generation pass and the total time approaches that of the
+    slowest writer. When a queue is full, write() blocks until that writer catches up.
+
+    Args:
+        writers (list): Opened BatchWriters.
+        queue_depth (int, optional): Batches queued per writer. Defaults to DEFAULT_QUEUE_DEPTH.
+    """
+
+    def __init__(self, writers, queue_depth=DEFAULT_QUEUE_DEPTH):
+        self.path = None
+        self.rows = 0
+        self.writers = list(writers)
+        self._queues = [queue.Queue(maxsize=max(int(queue_depth), 1)) for _ in self.writers]
+        self._errors = [None] * len(self.writers)
+        self._threads = [
+            threading.Thread(target=self._drain, args=(index,), daemon=True)
+            for index in range(len(self.writers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _drain(self, index):
+        """Write the batches of one queue until it is closed; keep the first error."""
+        writer, batches = self.writers[index], self._queues[index]
+        while (batch := batches.get()) is not _CLOSE:
+            if self._errors[index] is None:
+                try:
+                    writer.write(batch)
+                except Exception as exc:  # Re-raised on the generating thread
+                    self._errors[index] = exc
+
+    def _raise(self):
+        """Re-raise the first error of any writer."""
+        for error in self._errors:
+            if error is not None:
+                raise error
+
+    def write(self, batch):
+        self._raise()
+        for batches in self._queues:
+            # Writers may rechunk a frame in place, so each thread gets its own shallow clone
+            # sharing the same column buffers
+            batches.put(batch.clone())
+        self.rows += len(batch)
+
+    def close(self):
+        if not self._threads:
+            return
+        for batches in self._queues:
+            batches.put(_CLOSE)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for index, writer in enumerate(self.writers):
+            try:
+                writer.close()
+            except Exception as exc:
+                self._errors[index] = self._errors[index] or exc
+        self._raise()
+
+
+def parse_target(target):
+    """
+    Split an output target into its format and path.
+
+    Args:
+        target (str): ``path``, or ``format:path`` to override the format of the suffix.
+
+    Returns:
+        tuple: (format name, path)
+    """
+    prefix, separator, rest = target.partition(":")
+    # Single letters are Windows drive letters, not formats
+    if separator and len(prefix) > 1 and prefix in WRITERS:
+        return prefix, rest
+    return format_for_path(target), target
+
+
+def format_for_path(path):
+    """
+    Infer an output format from a file suffix.
+
+    Args:
+        path (str or Path): Output path.
+
+    Returns:
+        str: Format name, "csv" when the suffix is not recognized.
+    """
+    return SUFFIX_FORMATS.get(Path(path).suffix.lower(), "csv")
+
+
+def open_writer(path, file_format=None, partition_by=None, **options):
+    """
+    Open the writer of an output format.
+
+    Args:
+        path (str or Path): Destination file, or the dataset directory when partitioned.
+        file_format (str, optional): Name in WRITERS. Defaults to the format of the path's suffix.
+        partition_by (list, optional): Hive partition keys; see PartitionedWriter. Defaults to None.
+        **options: Format-specific writer options.
+
+    Returns:
+        BatchWriter: The opened writer.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    file_format = file_format or format_for_path(path)
+    if file_format not in WRITERS:
+        raise ValueError(f"Unsupported output format '{file_format}'; choose from {', '.join(WRITERS)}.")
+    if partition_by:
+        return PartitionedWriter(path, partition_by, file_format, **options)
+    return WRITERS[file_format](path, **options)
+
+
+def iter_batches(df, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield consecutive zero-copy slices of a frame.
+
+    Args:
+        df (pl.DataFrame): Generated calls.
+        batch_size (int, optional): Rows per slice. Defaults to DEFAULT_BATCH_SIZE.
+
+    Yields:
+        pl.DataFrame: Slices of at most batch_size rows.
+
+    Raises:
+        ValueError: If batch_size is not positive.
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be a positive integer.")
+    for start in range(0, len(df), batch_size):
+        yield df.slice(start, batch_size)
+
+
+def record_batch_reader(df, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Export a frame as an Arrow RecordBatchReader, for in-process consumers.
+
+    The batches are produced lazily from zero-copy slices, so nothing is serialized.
+
+    Args:
+        df (pl.DataFrame): Generated calls.
+        batch_size (int, optional): Rows per record batch. Defaults to DEFAULT_BATCH_SIZE.
+
+    Returns:
+        pa.RecordBatchReader: Reader over the calls.
+    """
+    schema = df.head(0).to_arrow(compat_level=pl.CompatLevel.oldest()).schema
+
+    def batches():
+        for batch in iter_batches(df, batch_size):
+            yield from batch.to_arrow(compat_level=pl.CompatLevel.oldest()).to_batches()
+
+    return pa.RecordBatchReader.from_batches(schema, batches())
+
+
+def write_outputs(df, targets, batch_size=DEFAULT_BATCH_SIZE, queue_depth=DEFAULT_QUEUE_DEPTH, **options):
+    """
+    Write a frame to several outputs concurrently, in one pass over its batches.
+
+    The frame is already in memory; the batches are slices of it, and the bounded queues
+    limit only how many of them each writer has pending.
+
+    Args:
+        df (pl.DataFrame): Generated calls.
+        targets (list): Output targets; see parse_target().
+        batch_size (int, optional): Rows per batch. Defaults to DEFAULT_BATCH_SIZE.
+        queue_depth (int, optional): Batches queued per writer. Defaults to DEFAULT_QUEUE_DEPTH.
+        **options: Writer options, passed to every writer.
+
+    Returns:
+        int: Number of rows written to each output.
+    """
+    writers = []
+    try:
+        for target in targets:
+            file_format, path = parse_target(target)
+            writers.append(open_writer(path, file_format, **options))
+    except Exception:
+        for writer in writers:
+            writer.close()
+        raise
+    with FanOutWriter(writers, queue_depth) as fan_out:
+        for batch in iter_batches(df, batch_size):
+            fan_out.write(batch)
+    return fan_out.rows
+
+
+def write_batches(df, path, file_format=None, batch_size=DEFAULT_BATCH_SIZE, **options):
+    """
+    Write an in-memory frame to one output, batch by batch.
+
+    Args:
+        df (pl.DataFrame): Generated calls.
+        path (str or Path): Destination file or directory.
+        file_format (str, optional): Name in WRITERS. Defaults to the format of the path's suffix.
+        batch_size (int, optional): Rows per batch. Defaults to DEFAULT_BATCH_SIZE.
+        **options: Format-specific writer options.
+
+    Returns:
+        int: Number of rows written.
+    """
+    with open_writer(path, file_format, **options) as writer:
+        for batch in iter_batches(df, batch_size):
+            writer.write(batch)
+    return writer.rows
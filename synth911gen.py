@@ -6,18 +6,36 @@ This module provides the main logic for generating synthetic 911 dispatch data,
 """
 
 import argparse
-import random
+import os
 import re
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any
 
 import numpy as np
 import polars as pl
 from faker import Faker
-from faker.providers import DynamicProvider
 
-from shared.constants import DEFAULT_LOCALE, validate_locale
+from shared.addresses import (DEFAULT_ADDRESS_SKEW, AddressModel, AddressSource, load_address_classes,
+                              load_address_source)
+from shared.agencies import AgencyRegistry, default_registry, load_registry
+from shared.ali import AliWriter  # noqa: F401 -- registers the ali output format
+from shared.arrivals import ArrivalProfile, arrival_offsets, load_arrival_profile
+from shared.catalog import CallTypeCatalog, load_catalog
+from shared.clusters import ClusterModel, expand_clusters
+from shared.constants import DEFAULT_LOCALE, TIMESTAMP_FORMAT, validate_locale
+from shared.distributions import DistributionProfile, load_distribution_profile
+from shared.durations import row_scales
+from shared.eido import EidoWriter  # noqa: F401 -- registers the eido output format
+from shared.event_stream import write_event_stream
+from shared.geo import GeoModel, load_geo_model
+from shared.simulation import fleet_sizes, simulate_dispatch
+from shared.staffing import assign_positions, staff_utilization
+from shared.star_schema import build_star_schema, write_star_schema
+from shared.units import generate_units
+from shared.writers import (CSV_COMPRESSION_SUFFIXES, CSV_COMPRESSIONS, DEFAULT_BATCH_SIZE, DEFAULT_PARQUET_COMPRESSION,
+                            PARQUET_COMPRESSIONS, WRITERS, format_for_path, parse_target,
+                            record_batch_reader, write_batches, write_outputs)
 
 # Try to import PyInquirer, but provide fallback if it's not available
 class ValidationError(Exception):
@@ -89,243 +107,24 @@ def sanitize_cli():
 # Note: This function is for testing sanitization only
 # The actual entry point is at the bottom of the file
 
-# Law enforcement problems with their associated priority levels
+# Call types, priorities, weights, dispositions and translations live in the call-type
+# catalog (shared/call_types.json). It is compiled once into integer-coded tables and
+# cached, so every run reuses the compiled form instead of rebuilding providers and maps.
 # Priority 1: Immediate response, life-threatening
 # Priority 2: Urgent response, potential for harm
 # Priority 3: Prompt response, no immediate danger
 # Priority 4: Routine response, minor issues
 # Priority 5: Non-urgent, administrative or delayed response
+DEFAULT_CATALOG = load_catalog()
 
-LAW_PROBLEMS = [
-    # Priority 1 (Immediate response, life-threatening)
-    ("WEAPON VIOL GUN IN PROG", 1),
-    ("ALARM RESIDENTIAL NIGHTIME", 1),
-    ("ROBBERY IN PROGRESS", 1),
-    ("SHOOTING", 1),
-    ("STABBING", 1),
-    ("OFFICER NEEDS ASSISTANCE", 1),
-    ("HOSTAGE SITUATION", 1),
-    ("SUICIDAL SUBJECT", 1),
-
-    # Priority 2 (Urgent response, potential for harm)
-    ("DOMESTIC VIOL NO INJ", 2),
-    ("DOMESTIC VIOL WITH INJ", 2),
-    ("DWI - DRUNK/INTOX DRIVER", 2),
-    ("DISORDERLY CONDUCT", 2),
-    ("911 HANG UP", 2),
-    ("ASSAULT", 2),
-    ("BURGLARY IN PROGRESS", 2),
-    ("SUSPICIOUS PERSON WITH WEAPON", 2),
-
-    # Priority 3 (Prompt response, no immediate danger)
-    ("SUSPICIOUS EVENT", 3),
-    ("SUSPICIOUS PERSON", 3),
-    ("SUSPICIOUS VEHICLE", 3),
-    ("TRESPASSING", 3),
-    ("LARCENY IN PROGRESS", 3),
-    ("TRAFFIC ACCIDENT NO INJURY", 3),
-    ("ALARM COMMERCIAL", 3),
-
-    # Priority 4 (Routine response, minor issues)
-    ("NOISE COMPLAINT IN PROG", 4),
-    ("NOISE COMPLAINT DELAY", 4),
-    ("PARKING COMPLAINT", 4),
-    ("TRAFFIC STOP", 4),
-    ("DISABLED MOTORIST", 4),
-    ("PUBLIC SERVICE - LAW", 4),
-    ("ASSIST CITIZEN", 4),
-
-    # Priority 5 (Non-urgent, administrative or delayed)
-    ("PROPERTY LOST TRU", 5),
-    ("POLICE INFORMATION", 5),
-    ("FOLLOW UP", 5),
-    ("LARCENY REPORT", 5),
-    ("FRAUD REPORT", 5),
-    ("VANDALISM REPORT", 5),
-    ("MENTAL HEALTH", 5),
-    ("DRUG COMPLAINT", 5),
-    ("FLAG DOWN", 5),
-    ("GLA", 5),
-]
-
-# Create the DynamicProvider with just the problem names
-law_problem_provider = DynamicProvider(
-    provider_name="law_problem",
-    elements=[problem for problem, _ in LAW_PROBLEMS]
-)
-
-# Fire problems with their associated priority levels
-# Priority 1: Immediate response, life-threatening
-# Priority 2: Urgent response, potential for harm
-# Priority 3: Prompt response, no immediate danger
-# Priority 4: Routine response, minor issues
-# Priority 5: Non-urgent, administrative or delayed response
-
-FIRE_PROBLEMS = [
-    # Priority 1 (Immediate response, life-threatening)
-    ("RESIDENTIAL BUILDING FIRE", 1),
-    ("HIGHRISE BUILDING FIRE", 1),
-    ("COMMERCIAL BUILDING FIRE", 1),
-    ("ENTRAPMENT", 1),
-    ("MVC SCHOOL BUS", 1),
-    ("HAZMAT MAJOR", 1),
-    ("STRUCTURE COLLAPSE", 1),
-
-    # Priority 2 (Urgent response, potential for harm)
-    ("MVC AUTO", 2),
-    ("GAS LEAK", 2),
-    ("CO ALARM", 2),
-    ("OUTSIDE FIRE", 2),
-    ("APPLIANCE FIRE", 2),
-    ("MVC MOTORCYCLE", 2),
-    ("WIRES DOWN", 2),
-    ("HAZMAT", 2),
-
-    # Priority 3 (Prompt response, no immediate danger)
-    ("FIRE ALARM", 3),
-    ("ELEVATOR", 3),
-    ("ODOR OF SMOKE", 3),
-    ("WATER LEAK", 3),
-    ("SMOKE DETECTOR", 3),
-
-    # Priority 4 (Routine response, minor issues)
-    ("PUBLIC SERVICE - FIRE", 4),
-    ("LOCKOUT", 4),
-    ("ASSIST CITIZEN - FIRE", 4),
-    ("ANIMAL RESCUE", 4),
-
-    # Priority 5 (Non-urgent, administrative or delayed)
-    ("FIRE INSPECTION", 5),
-    ("FIRE PREVENTION", 5),
-    ("FIRE EDUCATION", 5),
-    ("SMOKE DETECTOR INSTALLATION", 5),
-]
-
-# Create the DynamicProvider with just the problem names
-fire_problem_provider = DynamicProvider(
-    provider_name="fire_problem",
-    elements=[problem for problem, _ in FIRE_PROBLEMS]
-)
-
-# EMS problems with their associated priority levels
-# Priority 1: Immediate response, life-threatening
-# Priority 2: Urgent response, potential for harm
-# Priority 3: Prompt response, no immediate danger
-# Priority 4: Routine response, minor issues
-# Priority 5: Non-urgent, administrative or delayed response
-
-EMS_PROBLEMS = [
-    # Priority 1 (Immediate response, life-threatening)
-    ("CARDIAC ARREST ALS", 1),
-    ("UNCONSCIOUS ALS", 1),
-    ("ALTERED LOC ALS", 1),
-    ("STROKE ALS", 1),
-    ("MUTUAL ALS", 1),
-    ("ALLERGIC REACTION ALS", 1),
-    ("OVERDOSE ALS", 1),
-    ("TRAUMATIC INJURY ALS", 1),
-    ("DROWNING", 1),
-
-    # Priority 2 (Urgent response, potential for harm)
-    ("TROUBLE BREATHING ALS", 2),
-    ("CHEST PAIN ALS", 2),
-    ("HEART PROBLEMS ALS", 2),
-    ("SEIZURE ALS", 2),
-    ("DIABETIC EMERGENCY ALS", 2),
-    ("ASSAULT ALS", 2),
-    ("PSYCHIATRIC EMERGENCY ALS", 2),
-    ("ALS EMERGENCY", 2),
-
-    # Priority 3 (Prompt response, no immediate danger)
-    ("BLS EMERGENCY", 3),
-    ("FALL BLS", 3),
-    ("INJURED PERSON BLS", 3),
-    ("BACK PAIN BLS", 3),
-    ("HEADACHE BLS", 3),
-    ("SICK PERSON BLS", 3),
-
-    # Priority 4 (Routine response, minor issues)
-    ("PUBLIC SERICE EMS", 4),
-    ("MINOR MEDICAL", 4),
-    ("ASSIST CITIZEN - EMS", 4),
-
-    # Priority 5 (Non-urgent, administrative or delayed)
-    ("MEDICAL ALARM", 5),
-    ("ROUTINE TRANSPORT", 5),
-    ("MENTAL HEALTH ALS", 5),
-    ("WELFARE CHECK", 5),
-]
-
-# Create the DynamicProvider with just the problem names
-ems_problem_provider = DynamicProvider(
-    provider_name="ems_problem",
-    elements=[problem for problem, _ in EMS_PROBLEMS]
-)
-
-# RESCUE problems with their associated priority levels
-# Priority 1: Immediate response, life-threatening
-# Priority 2: Urgent response, potential for harm
-# Priority 3: Prompt response, no immediate danger
-# Priority 4: Routine response, minor issues
-# Priority 5: Non-urgent, administrative or delayed response
-
-RESCUE_PROBLEMS = [
-    # Priority 1 (Immediate response, life-threatening)
-    ("WATER RESCUE IN PROGRESS", 1),
-    ("MOUNTAIN RESCUE IN PROGRESS", 1),
-    ("VEHICLE EXTRICATION WITH ENTRAPMENT", 1),
-    ("CONFINED SPACE RESCUE", 1),
-    ("HIGH ANGLE RESCUE", 1),
-    ("SEARCH AND RESCUE - MISSING PERSON", 1),
-    ("TECHNICAL RESCUE - STRUCTURE COLLAPSE", 1),
-
-    # Priority 2 (Urgent response, potential for harm)
-    ("WATER RESCUE STANDBY", 2),
-    ("MOUNTAIN RESCUE STANDBY", 2),
-    ("VEHICLE EXTRICATION NO ENTRAPMENT", 2),
-    ("SEARCH AND RESCUE - NON-CRITICAL", 2),
-    ("ANIMAL RESCUE - DANGEROUS SITUATION", 2),
-
-    # Priority 3 (Prompt response, no immediate danger)
-    ("ANIMAL RESCUE - NON-URGENT", 3),
-    ("PUBLIC ASSIST RESCUE", 3),
-    ("STANDBY FOR EVENT", 3),
-
-    # Priority 4 (Routine response, minor issues)
-    ("EQUIPMENT CHECK RESCUE", 4),
-    ("TRAINING EXERCISE RESCUE", 4),
-    ("PUBLIC EDUCATION RESCUE", 4),
-
-    # Priority 5 (Non-urgent, administrative or delayed)
-    ("RESCUE REPORT ONLY", 5),
-    ("RESCUE INFORMATION", 5),
-    ("FOLLOW UP RESCUE", 5),
-]
-
-# Create the DynamicProvider with just the problem names
-rescue_problem_provider = DynamicProvider(
-    provider_name="rescue_problem",
-    elements=[problem for problem, _ in RESCUE_PROBLEMS]
-)
+LAW_PROBLEMS = DEFAULT_CATALOG.problems("LAW")
+FIRE_PROBLEMS = DEFAULT_CATALOG.problems("FIRE")
+EMS_PROBLEMS = DEFAULT_CATALOG.problems("EMS")
+RESCUE_PROBLEMS = DEFAULT_CATALOG.problems("RESCUE")
 
 # List of Dispositions
 # These are the final outcomes of a call, which can be used to indicate how the call was resolved.
-DISPOSITIONS = [
-    "CANCELLED",
-    "NO ACTION TAKEN",
-    "REFERRED TO OTHER AGENCY",
-    "REPORT TAKEN",
-    "ARREST MADE",
-    "CITATION ISSUED",
-    "UNIT CLEARED",
-    "TAKEN TO HOSPITAL",
-]
-
-# Create a DynamicProvider for dispositions
-disposition_provider = DynamicProvider(
-    provider_name="disposition",
-    elements=DISPOSITIONS
-)
+DISPOSITIONS = DEFAULT_CATALOG.dispositions
 
 # Street address provider will be created in the generate_911_data function
 # after Faker is initialized with the specified locale
@@ -354,7 +153,7 @@ def filter_agencies(agencies, selected_agencies):
     # Return only the valid selected agencies
     return [agency for agency in agencies if agency in selected_agencies]
 
-def generate_911_data(num_records=10000, start_date=None, end_date=None, num_names=8, locale=DEFAULT_LOCALE, selected_agencies=None, agency_probabilities=None):
+def generate_911_data(num_records=10000, start_date=None, end_date=None, num_names=8, locale=DEFAULT_LOCALE, selected_agencies=None, agency_probabilities=None, catalog=None, translate=False, problems=None, priorities=None, agency_registry=None, format_timestamps=True, arrival_profile=None, distribution_profile=None, clusters=None, simulate=False, workload_staffing=False, address_source=None, address_weights=None, geo_model=None, address_skew=DEFAULT_ADDRESS_SKEW, address_classes=None, rng=None):
     """
     Generate synthetic 911 dispatch data for a given number of records.
 
@@ -368,25 +167,61 @@ def generate_911_data(num_records=10000, start_date=None, end_date=None, num_nam
         locale (str, optional): Faker locale for generating localized data. Defaults to "en_US".
         selected_agencies (list, optional): List of agencies to include. Defaults to None (all agencies).
         agency_probabilities (list, optional): List of probabilities for each agency. Defaults to None.
+        catalog (str or CallTypeCatalog, optional): Call-type catalog file or compiled catalog. Defaults to the bundled catalog.
+        translate (bool, optional): Translate call types into the locale's language when the catalog has a translation. Defaults to False.
+        problems (list, optional): Only generate these call types. Defaults to None (all call types).
+        priorities (list, optional): Only generate call types with these priority numbers. Defaults to None (all priorities).
+        agency_registry (str or AgencyRegistry, optional): Agency registry file or compiled registry. Defaults to one agency per catalog discipline.
+        format_timestamps (bool, optional): Format timestamp columns as 'YYYY-MM-DD HH:MM:SS' strings; keep native datetimes when False. Defaults to True.
+        arrival_profile (str or ArrivalProfile, optional): Arrival profile file or compiled profile giving the hourly, weekly, monthly and holiday call volume. Defaults to the built-in profile.
+        distribution_profile (str or DistributionProfile, optional): Distribution profile file or compiled profile giving the duration column distributions. Defaults to shared/distributions.json.
+        clusters (ClusterModel, optional): Grow bursts of related calls from high-priority incidents; adds an ``incident_id`` column. Defaults to None (independent calls).
+        simulate (bool, optional): Simulate each agency's unit fleet so calls wait in queue while all units are committed. Fleet sizes come from the registry's ``units`` or are sized from the offered load. Defaults to False.
+        workload_staffing (bool, optional): Give each call to the call taker and dispatcher of its PSAP and shift who became free first instead of one drawn at random; waits for a free call taker are added to queue_time and phone_time, waits for a free dispatcher to dispatch_time. Defaults to False.
+        address_source (str or AddressSource, optional): CSV or Parquet file of real address points, or an opened source; adds ``latitude``/``longitude`` columns when the file has coordinates. Defaults to None (Faker addresses).
+        address_weights (list, optional): Address weight terms, ``column`` or ``column:VALUE:factor``. Defaults to None (equal weights).
+        geo_model (str or GeoModel, optional): Geo profile file or compiled model; adds hotspot-weighted ``latitude``/``longitude`` columns unless the address source already supplies coordinates. Defaults to None.
+        address_skew (float, optional): Zipf exponent of address popularity; 0 draws every address equally often. Defaults to DEFAULT_ADDRESS_SKEW.
+        address_classes (str or dict, optional): Address class file or definitions (shelters, bars, nursing homes and the call types they attract); ``{}`` disables the classes. Defaults to None (DEFAULT_ADDRESS_CLASSES).
+        rng (np.random.Generator, optional): Random generator; pass the same one to generate_units to continue the run. Defaults to a fresh generator.
 
     Returns:
-        tuple: (DataFrame of generated data, dict of call_taker names, dict of dispatcher names)
+        tuple: (DataFrame of generated data, dict of call_taker names, dict of dispatcher names).
+        The name dicts are keyed by shift, or by PSAP and then shift when the agency registry
+        defines more than one PSAP; in that case the DataFrame also has a ``psap`` column.
     """
     # Validate locale before proceeding
     if not validate_locale(locale):
         print(f"Warning: Unsupported locale '{locale}'. Falling back to {DEFAULT_LOCALE}")
         locale = DEFAULT_LOCALE
 
+    # Resolve the call-type catalog
+    if catalog is None:
+        catalog = DEFAULT_CATALOG
+    elif not isinstance(catalog, CallTypeCatalog):
+        catalog = load_catalog(catalog)
+
+    # Resolve the agency registry
+    if agency_registry is None:
+        agency_registry = default_registry(catalog)
+    elif not isinstance(agency_registry, AgencyRegistry):
+        agency_registry = load_registry(agency_registry, catalog)
+
+    # Resolve the duration distribution profile
+    if not isinstance(distribution_profile, DistributionProfile):
+        distribution_profile = load_distribution_profile(distribution_profile)
+
+    rng = rng or np.random.default_rng()
+
     # Initialize Faker with the specified locale
     local_fake = Faker(locale)
 
-    # Generate address list with the specified locale
-    address_list = [local_fake.unique.street_address() for _ in range(2500)]
-
-    # Create street address provider
-    street_address_provider = DynamicProvider(
-        provider_name="street_address", elements=address_list
-    )
+    # Real address points replace the Faker address pool
+    if address_source is not None and not isinstance(address_source, AddressSource):
+        address_source = load_address_source(address_source)
+    if address_source is None:
+        # Generate address list with the specified locale
+        address_list = pl.Series("address", [local_fake.unique.street_address() for _ in range(2500)])
 
     def generate_names(num_names=8):
         """
@@ -404,15 +239,30 @@ def generate_911_data(num_records=10000, start_date=None, end_date=None, num_nam
             raise RuntimeError("Faker missing 'last_name' or 'first_name' provider.")
         return [f"{local_fake.last_name()}, {local_fake.first_name()}" for _ in range(num_names)]
 
-    call_taker_names = {key: generate_names(num_names) for key in ["A", "B", "C", "D"]}
-    dispatcher_names = {key: generate_names(num_names) for key in ["A", "B", "C", "D"]}
+    # Each PSAP staffs its own call-taker and dispatcher rosters
+    shifts = ["A", "B", "C", "D"]
+    call_taker_rosters = {
+        psap: {key: generate_names(agency_registry.roster_sizes[psap] or num_names) for key in shifts}
+        for psap in agency_registry.psaps
+    }
+    dispatcher_rosters = {
+        psap: {key: generate_names(agency_registry.roster_sizes[psap] or num_names) for key in shifts}
+        for psap in agency_registry.psaps
+    }
+    if agency_registry.multi_psap:
+        call_taker_names, dispatcher_names = call_taker_rosters, dispatcher_rosters
+    else:
+        call_taker_names = call_taker_rosters[agency_registry.psaps[0]]
+        dispatcher_names = dispatcher_rosters[agency_registry.psaps[0]]
 
-    # Define the probabilities for each agency
-    probabilities = [0.72, 0.15, 0.10, 0.03]  # LAW, EMS, FIRE, RESCUE
-    agencies = ["LAW", "EMS", "FIRE", "RESCUE"]
+    # Agencies and their default share of calls come from the registry
+    agencies = agency_registry.names
 
     # Filter agencies based on user selection
     filtered_agencies = filter_agencies(agencies, selected_agencies)
+    if not filtered_agencies:
+        raise ValueError("None of the selected agencies are defined.")
+    filtered_codes = np.array(agency_registry.indices(filtered_agencies), dtype=np.int64)
 
     # Handle user-specified probabilities
     if agency_probabilities is not None:
@@ -420,17 +270,28 @@ def generate_911_data(num_records=10000, start_date=None, end_date=None, num_nam
             raise ValueError("Number of agency probabilities must match number of selected agencies.")
         if not np.isclose(sum(agency_probabilities), 1.0):
             raise ValueError("Agency probabilities must sum to 1.")
-        probabilities = agency_probabilities
+        probabilities = np.asarray(agency_probabilities, dtype=float)
     elif len(filtered_agencies) < len(agencies):
-        probabilities = [1.0 / len(filtered_agencies)] * len(filtered_agencies)
+        probabilities = np.full(len(filtered_agencies), 1.0 / len(filtered_agencies))
     else:
-        probabilities = [0.72, 0.15, 0.10, 0.03]
+        probabilities = agency_registry.shares / agency_registry.shares.sum()
+
+    # Targeted generation: weight each agency by the share of its calls that match the
+    # problem/priority filter and renormalize, so every sampled row already matches
+    selection = catalog.selection_mask(problems, priorities)
+    if selection is not None:
+        probabilities = probabilities * [
+            agency_registry.selected_share(code, selection) for code in filtered_codes
+        ]
+        if probabilities.sum() <= 0:
+            raise ValueError("None of the selected agencies handle the requested call types.")
+        probabilities = probabilities / probabilities.sum()
 
-    # Generate the agency column with the specified distribution
-    agency_choices = np.random.choice(filtered_agencies, size=num_records, p=probabilities)
+    # Generate the agency codes with the specified distribution
+    agency_codes = rng.choice(filtered_codes, size=num_records, p=probabilities)
 
-    # Map agency to prefix
-    agency_prefix = {"LAW": "L", "EMS": "M", "FIRE": "F", "RESCUE": "R"}
+    # Assign problem type from each agency's call mix in one vectorized draw
+    problem_codes = agency_registry.sample_problems(agency_codes, rng, mask=selection)
 
     # Set default start and end dates if not provided
     if start_date is None:
@@ -445,49 +306,45 @@ def generate_911_data(num_records=10000, start_date=None, end_date=None, num_nam
     # Get the year from start date for call_id prefix
     year_suffix = str(start_date_dt.year)[-2:]
 
-    # Determine starting numbers for each agency
-    def get_start_number():
-        if start_date_dt.month == 1 and start_date_dt.day == 1:
-            return 1
-        else:
-            # Generate a random starting number between 1000 and 100000
-            return random.randint(1000, 100000)
-
-    # Generate sequential numbers for each agency
-    agency_counters = {
-        "L": get_start_number(),
-        "M": get_start_number(),
-        "F": get_start_number(),
-        "R": get_start_number()
-    }
-    call_ids_full = []
-
-    for agency in agency_choices:
-        prefix = agency_prefix[agency]
-        call_id = f"{year_suffix}-{prefix}{agency_counters[prefix]:06d}"
-        call_ids_full.append(call_id)
-        agency_counters[prefix] += 1
-
-    # Generate random datetimes within the specified range
-    date_range = int((end_date_dt - start_date_dt).total_seconds())
-    random_seconds = np.random.randint(0, date_range, size=num_records)
-    datetimes_full = [
-        start_date_dt + timedelta(seconds=int(sec)) for sec in sorted(random_seconds.tolist())
-    ]
+    # Draw event times from the arrival model; they come out in chronological order
+    if arrival_profile is not None and not isinstance(arrival_profile, ArrivalProfile):
+        arrival_profile = load_arrival_profile(arrival_profile)
+    offsets = arrival_offsets(start_date_dt, end_date_dt, num_records, rng, arrival_profile)
+    total_seconds = int((end_date_dt - start_date_dt).total_seconds())
+
+    # Grow incident clusters; follow-up calls share their incident's agency and address
+    incident_rows = None
+    if clusters is not None:
+        offsets, agency_codes, problem_codes, incident_rows = expand_clusters(
+            offsets, agency_codes, problem_codes, num_records, total_seconds, rng, clusters,
+            catalog, agency_registry, mask=selection,
+        )
+    datetimes_full = np.datetime64(start_date_dt, "us") + offsets.astype("timedelta64[s]")
+
+    # Generate sequential call_ids for each agency in one vectorized pass
+    agency_counters = agency_registry.start_numbers(start_date_dt, rng)
+    call_ids_full = agency_registry.assign_call_ids(agency_codes, year_suffix, agency_counters)
 
     # Create DataFrame
     df_full = pl.DataFrame(
         {
             "call_id": call_ids_full,
-            "agency": agency_choices,
+            "agency": pl.Series(agency_codes, dtype=pl.UInt32).cast(agency_registry.agency_dtype),
             "event_time": datetimes_full,
         }
     )
-
-    # Sort the DataFrame by event_time to ensure chronological order
+    if agency_registry.multi_psap:
+        psap_codes = agency_registry.psap_codes[agency_codes]
+        df_full = df_full.insert_column(
+            2, pl.Series("psap", psap_codes, dtype=pl.UInt32).cast(agency_registry.psap_dtype)
+        )
+    if incident_rows is not None:
+        # An incident is identified by the call_id of its first call
+        df_full = df_full.insert_column(1, call_ids_full.gather(incident_rows).alias("incident_id"))
+
+    # Rows are already in event_time order, so no sort is needed
     if not isinstance(df_full, pl.DataFrame):
         raise TypeError("df_full is not a polars DataFrame!")
-    df_full = df_full.sort("event_time")
 
     # Add various time-based columns
     df_full = df_full.with_columns([
@@ -552,89 +409,89 @@ def generate_911_data(num_records=10000, start_date=None, end_date=None, num_nam
         pl.col("hour").map_elements(determine_shift_part, return_dtype=pl.Utf8).alias("shift_part")
     )
 
-    # Assign problem type based on agency
-    def assign_problem(agency):
-        """
-        Assign a problem type based on the agency type using Faker providers.
-
-        Args:
-            agency (str): The agency type (LAW, EMS, FIRE, RESCUE).
-
-        Returns:
-            str: A random problem type for the agency.
-        """
-        if local_fake is None:
-            raise RuntimeError("Faker instance is not initialized.")
-        if agency == "LAW":
-            if not hasattr(local_fake, "law_problem"):
-                raise RuntimeError("Faker missing 'law_problem' provider.")
-            return local_fake.law_problem()
-        elif agency == "FIRE":
-            if not hasattr(local_fake, "fire_problem"):
-                raise RuntimeError("Faker missing 'fire_problem' provider.")
-            return local_fake.fire_problem()
-        elif agency == "EMS":
-            if not hasattr(local_fake, "ems_problem"):
-                raise RuntimeError("Faker missing 'ems_problem' provider.")
-            return local_fake.ems_problem()
-        elif agency == "RESCUE":
-            if not hasattr(local_fake, "rescue_problem"):
-                raise RuntimeError("Faker missing 'rescue_problem' provider.")
-            return local_fake.rescue_problem()
-        else:
-            return None
-
-    # Register the dynamic providers with Faker
-    local_fake.add_provider(law_problem_provider)
-    local_fake.add_provider(fire_problem_provider)
-    local_fake.add_provider(ems_problem_provider)
-    local_fake.add_provider(disposition_provider)
-    local_fake.add_provider(rescue_problem_provider)
-
     df_full = df_full.with_columns(
-        pl.col("agency").map_elements(assign_problem, return_dtype=pl.Utf8).alias("problem")
+        pl.Series("problem", problem_codes).cast(catalog.problem_dtype)
     )
 
-    # Add address column with a street address
-    local_fake.add_provider(street_address_provider)
-    addresses = [local_fake.street_address() for _ in range(len(df_full))]
-    df_full = df_full.with_columns(pl.Series("address", addresses))
-
-
-    # Create dictionaries to map problems to their priority numbers
-    law_priority_map = {problem: priority for problem, priority in LAW_PROBLEMS}
-    fire_priority_map = {problem: priority for problem, priority in FIRE_PROBLEMS}
-    ems_priority_map = {problem: priority for problem, priority in EMS_PROBLEMS}
-    rescue_priority_map = {problem: priority for problem, priority in RESCUE_PROBLEMS}
-
-    # Function to assign priority number based on agency and problem
-    priority_expr = (
-        pl.when(pl.col("agency") == "LAW").then(pl.col("problem").replace_strict(law_priority_map, default=3))
-        .when(pl.col("agency") == "FIRE").then(pl.col("problem").replace_strict(fire_priority_map, default=3))
-        .when(pl.col("agency") == "EMS").then(pl.col("problem").replace_strict(ems_priority_map, default=3))
-        .when(pl.col("agency") == "RESCUE").then(pl.col("problem").replace_strict(rescue_priority_map, default=3))
-        .otherwise(3)
-        .alias("priority_number")
-    )
-    df_full = df_full.with_columns(priority_expr)
-
-    # Define a function to assign call_taker based on shift
-    def assign_call_taker(shift):
+    # Add address column; popular addresses and class affinities come from the address model
+    if isinstance(address_classes, (str, os.PathLike)):
+        address_classes = load_address_classes(address_classes)
+    if address_source is not None:
+        labels = None
+        if "address_class" in address_source.frame.columns:
+            labels = address_source.frame["address_class"].cast(pl.Utf8).to_numpy()
+        address_model = AddressModel(
+            address_source.weights(address_weights), catalog, rng,
+            skew=address_skew, classes=address_classes, labels=labels,
+        )
+    else:
+        address_model = AddressModel(
+            np.ones(len(address_list)), catalog, rng, skew=address_skew, classes=address_classes
+        )
+    address_rows = address_model.sample(problem_codes, rng)
+    if incident_rows is not None:
+        address_rows = address_rows[incident_rows]
+    if address_source is not None:
+        df_full = df_full.with_columns(address_source.columns(address_rows))
+    else:
+        df_full = df_full.with_columns(address_list.gather(address_rows))
+
+    # Hotspot-weighted coordinates, drawn from each agency's raster at the call's hour
+    if geo_model is not None and "latitude" not in df_full.columns:
+        if not isinstance(geo_model, GeoModel):
+            geo_model = load_geo_model(geo_model)
+        latitudes, longitudes = geo_model.sample(
+            agency_codes, df_full["hour"].to_numpy(), rng, agency_registry.names
+        )
+        if incident_rows is not None:
+            latitudes, longitudes = latitudes[incident_rows], longitudes[incident_rows]
+        df_full = df_full.with_columns(
+            pl.Series("latitude", latitudes), pl.Series("longitude", longitudes)
+        )
+
+
+    # Look up the priority number of each call type
+    df_full = df_full.with_columns(pl.Series("priority_number", catalog.priorities[problem_codes]))
+
+    # Flatten the PSAP rosters into one name table indexed by (PSAP, shift, position)
+    shift_codes = df_full["shift"].replace_strict(
+        {shift: code for code, shift in enumerate(shifts)}, default=0, return_dtype=pl.Int64
+    ).to_numpy()
+    row_psap_codes = agency_registry.psap_codes[agency_codes]
+    roster_codes = row_psap_codes * len(shifts) + shift_codes
+
+    def draw_staff(rosters, positions=None):
         """
-        Assign a call_taker name based on the shift.
+        Draw a staff member for each call from the roster of its PSAP and shift.
 
         Args:
-            shift (str): The shift label (A, B, C, D).
+            rosters (dict): Names keyed by PSAP and then shift.
+            positions (np.ndarray, optional): Position of each call within its roster, as
+                assigned by workload staffing. Drawn at random when None.
 
         Returns:
-            str: The name of the call_taker.
+            pl.Series: The name drawn for each call.
         """
-        return random.choice(call_taker_names[shift])
-
-    # Apply the function to create the call_taker column
-    df_full = df_full.with_columns(
-        pl.col("shift").map_elements(assign_call_taker, return_dtype=pl.Utf8).alias("call_taker")
-    )
+        names = []
+        offsets = np.zeros((len(agency_registry.psaps), len(shifts)), dtype=np.int64)
+        sizes = np.zeros(len(agency_registry.psaps), dtype=np.int64)
+        for psap_code, psap in enumerate(agency_registry.psaps):
+            for shift_code, shift in enumerate(shifts):
+                offsets[psap_code, shift_code] = len(names)
+                names.extend(rosters[psap][shift])
+            sizes[psap_code] = len(rosters[psap][shifts[0]])
+        if positions is None:
+            positions = (rng.random(len(row_psap_codes)) * sizes[row_psap_codes]).astype(np.int64)
+        positions = offsets[row_psap_codes, shift_codes] + positions
+        return pl.Series(names, dtype=pl.Utf8).gather(positions)
+
+    def roster_sizes(rosters):
+        """Return the number of positions of every (PSAP, shift) roster code."""
+        return np.array([len(rosters[psap][shift]) for psap in agency_registry.psaps for shift in shifts])
+
+    # Create the call_taker column; workload staffing fills it once positions are assigned
+    call_takers = pl.lit(None, dtype=pl.Utf8) if workload_staffing else draw_staff(call_taker_rosters)
+    df_full = df_full.with_columns(call_takers.alias("call_taker"))
 
     # Define the probabilities for each call reception method
     probabilities_reception = [0.55, 0.20, 0.10, 0.10, 0.05]
@@ -643,73 +500,61 @@ def generate_911_data(num_records=10000, start_date=None, end_date=None, num_nam
     reception_methods = ["E-911", "PHONE", "OFFICER", "TEXT", "C2C"]
 
     # Generate the call_reception column with the specified distribution
-    reception_choices = np.random.choice(
-        reception_methods, size=len(df_full), p=probabilities_reception
+    reception_choices = rng.choice(
+        len(reception_methods), size=len(df_full), p=probabilities_reception
     )
-    df_full = df_full.with_columns(pl.Series("call_reception", reception_choices))
-
-
-    # Define a function to assign dispatcher based on shift
-    def assign_dispatcher(shift):
-        """
-        Assign a dispatcher name based on the shift.
-
-        Args:
-            shift (str): The shift label (A, B, C, D).
-
-        Returns:
-            str: The name of the dispatcher.
-        """
-        return random.choice(dispatcher_names[shift])
-
-    # Apply the function to create the dispatcher column
     df_full = df_full.with_columns(
-        pl.col("shift").map_elements(assign_dispatcher, return_dtype=pl.Utf8).alias("dispatcher")
+        pl.Series("call_reception", reception_choices, dtype=pl.UInt32).cast(pl.Enum(reception_methods))
     )
 
-    mu = 3.5
-    sigma = 1.2
-
-    # Generate columns with distributions
-    queue_time = np.random.lognormal(
-        mean=mu, sigma=sigma, size=len(df_full)
-    ).astype(int)
-    queue_time = (
-        queue_time * 200 / queue_time.mean()
-    ).astype(int)
-    queue_time = np.clip(queue_time, a_min=0, a_max=90)
-
-    dispatch_time = (
-        np.random.chisquare(df=5, size=len(df_full)) * 2
-    ).astype(int)
-    dispatch_time = np.clip(dispatch_time, a_min=5, a_max=600)
-
-    # More varied phone_time using gamma
-    phone_time = np.concatenate(
-        [
-            np.random.exponential(scale=80, size=int(len(df_full) * 0.8)),  # Fast calls
-            np.random.gamma(
-                shape=2, scale=200, size=int(len(df_full) * 0.2)
-            ),  # Slower calls
-        ]
-    ).astype(int)
-    np.random.shuffle(phone_time)
 
-    # ack_time describes the time from the first dispatch to the time the unit marks enroute
-    ack_time = np.random.gamma(2.0, 30.0, size=len(df_full)).astype(int)
-    ack_time = np.clip(ack_time, a_min=2, a_max=40)
+    # Create the dispatcher column; workload staffing fills it once positions are assigned
+    dispatchers = pl.lit(None, dtype=pl.Utf8) if workload_staffing else draw_staff(dispatcher_rosters)
+    df_full = df_full.with_columns(dispatchers.alias("dispatcher"))
 
-    # More varied enroute_time using gamma with different parameters
-    enroute_time = np.random.gamma(6.0, 70.0, size=len(df_full)).astype(
-        int
-    )
-    enroute_time = np.clip(enroute_time, a_min=300, a_max=900)
+    # Scale factors per row from the (agency, priority) tables; each draw, bounds included,
+    # is multiplied by the row's factor, so P1 calls run faster
+    scales = row_scales(agency_registry, agency_codes, catalog.priorities[problem_codes])
 
-    # More varied on_scene_time using gamma with heavy tail
-    on_scene_time = np.random.gamma(3.0, 800.0, size=len(df_full)).astype(
-        int
-    )
-    on_scene_time = np.clip(on_scene_time, a_min=300, a_max=7200)
+    # Duration columns are drawn from the distribution profile's compiled samplers
+    num_rows = len(df_full)
+    queue_time = distribution_profile.sample("queue_time", rng, num_rows, scales["queue_time"])
+    dispatch_time = distribution_profile.sample("dispatch_time", rng, num_rows, scales["dispatch_time"])
+    phone_time = distribution_profile.sample("phone_time", rng, num_rows)
+
+    # ack_time describes the time from the first dispatch to the time the unit marks enroute
+    ack_time = distribution_profile.sample("ack_time", rng, num_rows, scales["ack_time"])
+    enroute_time = distribution_profile.sample("enroute_time", rng, num_rows, scales["enroute_time"])
+    on_scene_time = distribution_profile.sample("on_scene_time", rng, num_rows, scales["on_scene_time"])
+
+    # Workload staffing: a call waits on hold until a call taker of its roster is free
+    if workload_staffing:
+        taker_positions, taker_waits = assign_positions(
+            offsets, phone_time, roster_codes, roster_sizes(call_taker_rosters), rng
+        )
+        queue_time = queue_time + taker_waits
+        phone_time = phone_time + taker_waits
+
+    # Workload staffing: the queued call waits until a dispatcher of its roster is free. This
+    # runs before the simulation so the unit it commits stays busy for the final dispatch time
+    if workload_staffing:
+        dispatcher_positions, dispatcher_waits = assign_positions(
+            offsets + queue_time, dispatch_time, roster_codes, roster_sizes(dispatcher_rosters), rng
+        )
+        dispatch_time = dispatch_time + dispatcher_waits
+        df_full = df_full.with_columns(
+            draw_staff(call_taker_rosters, taker_positions).alias("call_taker"),
+            draw_staff(dispatcher_rosters, dispatcher_positions).alias("dispatcher"),
+        )
+
+    # Simulation mode: calls wait in queue until one of their agency's units is free
+    if simulate:
+        busy_times = dispatch_time + ack_time + enroute_time + on_scene_time
+        ready_times = offsets + queue_time
+        fleet = fleet_sizes(agency_registry, agency_codes, ready_times, busy_times)
+        queue_time = queue_time + simulate_dispatch(
+            ready_times, catalog.priorities[problem_codes], agency_codes, busy_times, fleet
+        )
 
     df_full = df_full.with_columns([
         pl.Series("queue_time", queue_time),
@@ -742,31 +587,12 @@ def generate_911_data(num_records=10000, start_date=None, end_date=None, num_nam
         (pl.col("event_time") + pl.duration(seconds=pl.col("total_time"))).alias("time_call_closed")
     )
 
-    nonlaw_dispositions = [d for d in DISPOSITIONS if d != "ARREST MADE"]
-
-    def assign_disposition(agency):
-        """
-        Assign a disposition based on the agency type.
-
-        Args:
-            agency (str): The agency type (LAW, EMS, FIRE, RESCUE).
-
-        Returns:
-            str: The disposition for the call.
-        """
-        if agency == "LAW":
-            if local_fake is None or not hasattr(local_fake, "disposition"):
-                raise RuntimeError("Faker instance is not initialized or missing 'disposition' provider.")
-            return local_fake.disposition()
-        else:
-            return random.choice(nonlaw_dispositions)
-
-    # Add disposition column with random dispositions
+    # Add disposition column, drawn from the dispositions each call type allows
+    disposition_codes = catalog.sample_dispositions(problem_codes, rng)
     df_full = df_full.with_columns(
-        pl.col("agency").map_elements(assign_disposition, return_dtype=pl.Utf8).alias("disposition")
+        pl.Series("disposition", disposition_codes).cast(catalog.disposition_dtype)
     )
 
-
     # List all your datetime columns
     datetime_cols = [
         "event_time",
@@ -779,12 +605,36 @@ def generate_911_data(num_records=10000, start_date=None, end_date=None, num_nam
     ]
 
     # Format each datetime column as 'YYYY-MM-DD HH:mm:ss'
-    for col in datetime_cols:
-        df_full = df_full.with_columns(pl.col(col).dt.strftime("%Y-%m-%d %H:%M:%S"))
-        
+    if format_timestamps:
+        for col in datetime_cols:
+            df_full = df_full.with_columns(pl.col(col).dt.strftime(TIMESTAMP_FORMAT))
+
+    # Translation only swaps the Enum categories, so it costs nothing per row
+    if translate:
+        df_full = catalog.translate(df_full, locale)
 
     return df_full, call_taker_names, dispatcher_names
 
+
+def generate_911_batches(batch_size=DEFAULT_BATCH_SIZE, **kwargs):
+    """
+    Generate calls and export them as an Arrow RecordBatchReader, for in-process consumers
+    that take batches without serializing them.
+
+    The whole run is generated first, since simulation, staffing and incident clusters span
+    it; the reader then hands out zero-copy slices, so memory is that of the full frame.
+
+    Args:
+        batch_size (int, optional): Rows per record batch. Defaults to DEFAULT_BATCH_SIZE.
+        **kwargs: Arguments of generate_911_data; timestamps always stay native.
+
+    Returns:
+        pa.RecordBatchReader: Reader over the generated calls.
+    """
+    kwargs["format_timestamps"] = False
+    df_full, _, _ = generate_911_data(**kwargs)
+    return record_batch_reader(df_full, batch_size)
+
 # Only define DateValidator if Validator is a valid class (not a dummy object or object itself)
 if (
     'Validator' in globals()
@@ -882,6 +732,33 @@ def main():
         locale = answers['locale']
         output_file = answers['output_file']
         selected_agencies = answers['selected_agencies'].split(',') if answers['selected_agencies'] else None
+        catalog_path = None
+        translate = False
+        problems = None
+        priorities = None
+        agency_registry = None
+        layout = "flat"
+        units_file = None
+        arrival_profile = None
+        distribution_profile = None
+        clusters = None
+        simulate = False
+        workload_staffing = False
+        utilization_file = None
+        address_source = None
+        address_weights = None
+        geo_profile = None
+        address_skew = DEFAULT_ADDRESS_SKEW
+        address_classes = None
+        event_stream_file = None
+        file_format = None
+        parquet_compression = DEFAULT_PARQUET_COMPRESSION
+        compress = None
+        eido_per_incident = False
+        ali_layout = None
+        outputs = None
+        batch_size = DEFAULT_BATCH_SIZE
+        partition_by = None
         agency_probabilities = None
         if answers.get('agency_probabilities') and isinstance(answers['agency_probabilities'], str):
             agency_prob_str = answers['agency_probabilities'].strip()
@@ -918,10 +795,74 @@ def main():
                             help=f'Faker locale for generating localized data (default: {DEFAULT_LOCALE})')
         parser.add_argument('-o', '--output-file', type=str, default='computer_aided_dispatch.csv',
                             help='Output file path (default: computer_aided_dispatch.csv)')
+        parser.add_argument('--output', action='append', default=None,
+                            help='Output target, repeatable: path or format:path; several targets are written '
+                                 'concurrently from one generation pass (overrides --output-file)')
         parser.add_argument('-a', '--agencies', type=str, default='',
                             help='Comma-separated list of agencies to include (e.g., LAW,FIRE)')
         parser.add_argument('--agency-probabilities', type=str, default='',
                             help='Comma-separated probabilities for selected agencies (e.g., 0.7,0.2,0.1)')
+        parser.add_argument('--catalog', type=str, default=None,
+                            help='Call-type catalog JSON file (default: shared/call_types.json)')
+        parser.add_argument('--translate', action='store_true',
+                            help="Translate call types into the locale's language when the catalog has a translation")
+        parser.add_argument('--problems', type=str, default='',
+                            help='Comma-separated call types to generate (e.g., "CARDIAC ARREST ALS,STROKE ALS")')
+        parser.add_argument('--priorities', type=str, default='',
+                            help='Comma-separated priority numbers to generate (e.g., 1,2)')
+        parser.add_argument('--agency-registry', type=str, default=None,
+                            help='Agency registry JSON file defining agencies, PSAPs and call mixes')
+        parser.add_argument('--layout', choices=['flat', 'star'], default='flat',
+                            help='Output layout: one flat file, or a directory with a fact table and '
+                                 'dimension tables named after the output file (default: flat)')
+        parser.add_argument('--format', choices=list(WRITERS), default=None,
+                            help='Output format (default: from the output file suffix, else csv)')
+        parser.add_argument('--parquet-compression', choices=PARQUET_COMPRESSIONS,
+                            default=DEFAULT_PARQUET_COMPRESSION,
+                            help=f'Parquet compression codec (default: {DEFAULT_PARQUET_COMPRESSION})')
+        parser.add_argument('--compress', choices=CSV_COMPRESSIONS, default=None,
+                            help='Compress CSV output batch by batch on a thread pool '
+                                 '(default: from a .gz/.zst output suffix, else none)')
+        parser.add_argument('--eido-per-incident', action='store_true',
+                            help='With --format eido, write one NDJSON file per incident into a directory '
+                                 'named after the output file')
+        parser.add_argument('--ali-layout', type=str, default=None,
+                            help='With --format ali, a fixed-width layout JSON (fields, widths, value maps)')
+        parser.add_argument('--row-group-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f'Rows per written batch, one Parquet row group each; bounds writer buffering, '
+                                 f'not peak memory, since the whole run is generated first (default: {DEFAULT_BATCH_SIZE})')
+        parser.add_argument('--partition-by', type=str, default='',
+                            help='Comma-separated Hive partition keys (year, month, day or a column such as agency); '
+                                 'writes a directory named after the output file')
+        parser.add_argument('--units-file', type=str, default=None,
+                            help='Also write the responding units of each call to this CSV file')
+        parser.add_argument('--arrival-profile', type=str, default=None,
+                            help='Arrival profile JSON with hourly, weekly, monthly and holiday call volume')
+        parser.add_argument('--distribution-profile', type=str, default=None,
+                            help='Distribution profile JSON overriding the duration column distributions')
+        parser.add_argument('--clusters', action='store_true',
+                            help='Add bursts of related calls for high-priority incidents, linked by incident_id')
+        parser.add_argument('--cluster-ratio', type=float, default=0.6,
+                            help='Mean follow-up calls per high-priority call when --clusters is set (default: 0.6)')
+        parser.add_argument('--simulate', action='store_true',
+                            help='Simulate unit availability so queue times grow while units are committed')
+        parser.add_argument('--workload-staffing', action='store_true',
+                            help='Give each call to the first free call taker and dispatcher of its shift')
+        parser.add_argument('--utilization-file', type=str, default=None,
+                            help='Also write per-position call counts and utilization to this CSV file')
+        parser.add_argument('--address-source', type=str, default=None,
+                            help='CSV or Parquet file of real address points to draw addresses from')
+        parser.add_argument('--address-weight', action='append', default=None,
+                            help='Address weight term, repeatable: a numeric column (e.g. population) '
+                                 'or column:VALUE:factor (e.g. land_use:COMMERCIAL:3)')
+        parser.add_argument('--geo-profile', type=str, default=None,
+                            help='Geo profile JSON (service-area polygon and hotspots) for latitude/longitude columns')
+        parser.add_argument('--address-skew', type=float, default=DEFAULT_ADDRESS_SKEW,
+                            help=f'Zipf exponent of address popularity; 0 for uniform (default: {DEFAULT_ADDRESS_SKEW})')
+        parser.add_argument('--address-classes', type=str, default=None,
+                            help='Address class JSON (shelters, bars, ... and the call types they attract)')
+        parser.add_argument('--event-stream-file', type=str, default=None,
+                            help='Also write a time-ordered status log (one row per status change) to this CSV file')
 
         args = parser.parse_args()
 
@@ -939,7 +880,49 @@ def main():
         num_names = args.num_names
         locale = args.locale
         output_file = args.output_file
+        outputs = args.output
         selected_agencies = args.agencies.split(',') if args.agencies else None
+        catalog_path = args.catalog
+        translate = args.translate
+        problems = args.problems.split(',') if args.problems else None
+        agency_registry = args.agency_registry
+        layout = args.layout
+        units_file = args.units_file
+        arrival_profile = args.arrival_profile
+        distribution_profile = args.distribution_profile
+        simulate = args.simulate
+        workload_staffing = args.workload_staffing
+        utilization_file = args.utilization_file
+        address_source = args.address_source
+        address_weights = args.address_weight
+        geo_profile = args.geo_profile
+        address_skew = args.address_skew
+        address_classes = args.address_classes
+        event_stream_file = args.event_stream_file
+        file_format = args.format
+        parquet_compression = args.parquet_compression
+        compress = args.compress
+        eido_per_incident = args.eido_per_incident
+        ali_layout = args.ali_layout
+        batch_size = args.row_group_size
+        partition_by = args.partition_by.split(',') if args.partition_by else None
+        if batch_size < 1:
+            print("Error: --row-group-size must be a positive integer")
+            sys.exit(1)
+        clusters = None
+        if args.clusters:
+            try:
+                clusters = ClusterModel(branching_ratio=args.cluster_ratio)
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        priorities = None
+        if args.priorities:
+            try:
+                priorities = [int(x) for x in args.priorities.split(',')]
+            except ValueError:
+                print("Invalid priorities format. Must be comma-separated integers.")
+                sys.exit(1)
         agency_probabilities = None
         if args.agency_probabilities:
             agency_prob_str = args.agency_probabilities.strip()
@@ -952,6 +935,32 @@ def main():
                     print("Invalid agency probabilities format. Must be comma-separated floats.")
                     sys.exit(1)
 
+    file_format = file_format or format_for_path(output_file)
+    # A .gz or .zst output suffix compresses CSV output, partitioned or not
+    output_stem, output_suffix = os.path.splitext(output_file)
+    if output_suffix.lower() in CSV_COMPRESSION_SUFFIXES:
+        if file_format == "csv":
+            compress = compress or CSV_COMPRESSION_SUFFIXES[output_suffix.lower()]
+        output_stem = os.path.splitext(output_stem)[0]
+    if layout == "star" and file_format not in ("csv", "parquet"):
+        print("Error: The star layout is written as csv or parquet files")
+        sys.exit(1)
+    if outputs and (layout == "star" or partition_by):
+        print("Error: Several --output targets are written as flat files, without --layout star or --partition-by")
+        sys.exit(1)
+    output_formats = [parse_target(target)[0] for target in outputs] if outputs else [file_format]
+
+    # The star layout needs the compiled catalog and registry to describe its dimensions
+    catalog = load_catalog(catalog_path) if catalog_path else DEFAULT_CATALOG
+    if agency_registry:
+        agency_registry = load_registry(agency_registry, catalog)
+    else:
+        agency_registry = default_registry(catalog)
+
+    # The calls and their units share one distribution profile and random generator
+    distribution_profile = load_distribution_profile(distribution_profile)
+    rng = np.random.default_rng()
+
     # Generate data with specified parameters
     df_full, call_taker_names, dispatcher_names = generate_911_data(
         num_records=num_records,
@@ -960,26 +969,82 @@ def main():
         num_names=num_names,
         locale=locale,
         selected_agencies=selected_agencies,
-        agency_probabilities=agency_probabilities
+        agency_probabilities=agency_probabilities,
+        catalog=catalog,
+        translate=translate,
+        problems=problems,
+        priorities=priorities,
+        agency_registry=agency_registry,
+        format_timestamps=False,
+        arrival_profile=arrival_profile,
+        distribution_profile=distribution_profile,
+        clusters=clusters,
+        simulate=simulate,
+        workload_staffing=workload_staffing,
+        address_source=address_source,
+        address_weights=address_weights,
+        geo_model=geo_profile,
+        address_skew=address_skew,
+        address_classes=address_classes,
+        rng=rng
     )
 
-    # Save the DataFrame to a CSV file
-    df_full.write_csv(output_file)
-
-    print(f"\nCSV file saved to {output_file}")
+    # Child table of responding units, keyed by call_id; EIDO documents list them too
+    df_units = None
+    if units_file or "eido" in output_formats:
+        df_units = generate_units(df_full, agency_registry, rng, distribution_profile=distribution_profile)
+    writer_options = {"compression": parquet_compression, "compress": compress,
+                      "units": df_units, "per_incident": eido_per_incident, "layout": ali_layout}
+
+    if outputs:
+        # One pass over the batches feeds every output's writer thread
+        write_outputs(df_full, outputs, batch_size, **writer_options)
+        print(f"\nOutputs saved to {', '.join(outputs)}")
+    elif layout == "star":
+        # Write the fact and dimension tables into a directory named after the output file
+        output_dir = os.path.splitext(output_file)[0]
+        tables = build_star_schema(df_full, call_taker_names, dispatcher_names, catalog, agency_registry)
+        write_star_schema(tables, output_dir, file_format)
+        print(f"\nStar schema saved to {output_dir}/ ({', '.join(tables)})")
+    elif partition_by:
+        # Route each batch into Hive partition directories under a directory named after the output file
+        output_dir = output_stem
+        write_batches(df_full, output_dir, file_format, batch_size, partition_by=partition_by, **writer_options)
+        print(f"\n{file_format.upper()} dataset saved to {output_dir}/ (partitioned by {', '.join(partition_by)})")
+    else:
+        # Write the calls to the output file in batches; timestamps stay native until written
+        write_batches(df_full, output_file, file_format, batch_size, **writer_options)
+        if file_format == "eido" and eido_per_incident:
+            # The writer puts the incident files in a directory named after the output file
+            output_file = os.path.splitext(output_file)[0]
+        print(f"\n{file_format.upper()} output saved to {output_file}")
     print(f"Total records generated: {len(df_full)}")
 
+    if units_file:
+        df_units.write_csv(units_file, datetime_format=TIMESTAMP_FORMAT)
+        print(f"Units file saved to {units_file} ({len(df_units)} units)")
+
+    if utilization_file:
+        staff_utilization(df_full).write_csv(utilization_file)
+        print(f"Utilization file saved to {utilization_file}")
+
+    if event_stream_file:
+        events = write_event_stream(df_full, event_stream_file)
+        print(f"Event stream saved to {event_stream_file} ({events} status events)")
+
     # Quick summary statistics of the new columns
     print("\nSummary Statistics for New Columns:")
     print(df_full.select(["phone_time", "process_time", "total_time"]).describe())
 
-    print("\nCall Taker Names per Shift:")
-    for shift, names in call_taker_names.items():
-        print(f"Shift {shift}: {names}")
-
-    print("\nDispatcher Names per Shift:")
-    for shift, names in dispatcher_names.items():
-        print(f"Shift {shift}: {names}")
+    # Multi-PSAP registries return the rosters keyed by PSAP, then shift
+    for title, rosters in (("Call Taker", call_taker_names), ("Dispatcher", dispatcher_names)):
+        print(f"\n{title} Names per Shift:")
+        for key, value in rosters.items():
+            if isinstance(value, dict):
+                for shift, names in value.items():
+                    print(f"{key} Shift {shift}: {names}")
+            else:
+                print(f"Shift {key}: {value}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
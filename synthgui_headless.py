@@ -78,7 +78,7 @@ def validate_positive_int(value_str):
 
 def sanitize_input(user_input):
     """Sanitize user input to prevent command injection"""
-    pattern = r'^[a-zA-Z0-9\s\-\.\/\\:_]+$'
+    pattern = r'^[a-zA-Z0-9\s\-\.\/\\:_,]+$'
     if not re.match(pattern, user_input):
         raise ValueError("Input contains invalid characters.")
     return user_input
@@ -121,6 +121,63 @@ def generate_data_cli():
                         help='Comma-separated probabilities for selected agencies (e.g., 0.7,0.2,0.1)')
     parser.add_argument('--list-locales', action='store_true',
                         help='List available locales and exit')
+    parser.add_argument('--catalog', type=str, default='',
+                        help='Call-type catalog JSON file (default: shared/call_types.json)')
+    parser.add_argument('--translate', action='store_true',
+                        help="Translate call types into the locale's language when the catalog has a translation")
+    parser.add_argument('--problems', type=str, default='',
+                        help='Comma-separated call types to generate (e.g., "CARDIAC ARREST ALS,STROKE ALS")')
+    parser.add_argument('--priorities', type=str, default='',
+                        help='Comma-separated priority numbers to generate (e.g., 1,2)')
+    parser.add_argument('--agency-registry', type=str, default='',
+                        help='Agency registry JSON file defining agencies, PSAPs and call mixes')
+    parser.add_argument('--layout', choices=['flat', 'star'], default='flat',
+                        help='Output layout: one flat file, or a fact table plus dimension tables (default: flat)')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'ndjson', 'arrow', 'sqlite', 'eido', 'ali'], default='',
+                        help='Output format (default: from the output file suffix, else csv)')
+    parser.add_argument('--parquet-compression', choices=['zstd', 'lz4', 'snappy', 'none'], default='zstd',
+                        help='Parquet compression codec (default: zstd)')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'], default='',
+                        help='Compress CSV output batch by batch on a thread pool')
+    parser.add_argument('--eido-per-incident', action='store_true',
+                        help='With --format eido, write one NDJSON file per incident')
+    parser.add_argument('--output', action='append', default=[],
+                        help='Output target, repeatable: path or format:path, written concurrently')
+    parser.add_argument('--ali-layout', type=str, default='',
+                        help='With --format ali, a fixed-width layout JSON (fields, widths, value maps)')
+    parser.add_argument('--row-group-size', type=int, default=100000,
+                        help='Rows per written batch, one Parquet row group each; bounds writer buffering, '
+                             'not peak memory (default: 100000)')
+    parser.add_argument('--partition-by', type=str, default='',
+                        help='Comma-separated Hive partition keys (year, month, day or a column such as agency)')
+    parser.add_argument('--units-file', type=str, default='',
+                        help='Also write the responding units of each call to this CSV file')
+    parser.add_argument('--arrival-profile', type=str, default='',
+                        help='Arrival profile JSON with hourly, weekly, monthly and holiday call volume')
+    parser.add_argument('--distribution-profile', type=str, default='',
+                        help='Distribution profile JSON overriding the duration column distributions')
+    parser.add_argument('--clusters', action='store_true',
+                        help='Add bursts of related calls for high-priority incidents, linked by incident_id')
+    parser.add_argument('--cluster-ratio', type=float, default=0.6,
+                        help='Mean follow-up calls per high-priority call when --clusters is set (default: 0.6)')
+    parser.add_argument('--simulate', action='store_true',
+                        help='Simulate unit availability so queue times grow while units are committed')
+    parser.add_argument('--workload-staffing', action='store_true',
+                        help='Give each call to the first free call taker and dispatcher of its shift')
+    parser.add_argument('--utilization-file', type=str, default='',
+                        help='Also write per-position call counts and utilization to this CSV file')
+    parser.add_argument('--address-source', type=str, default='',
+                        help='CSV or Parquet file of real address points to draw addresses from')
+    parser.add_argument('--address-weight', action='append', default=[],
+                        help='Address weight term, repeatable: a numeric column or column:VALUE:factor')
+    parser.add_argument('--geo-profile', type=str, default='',
+                        help='Geo profile JSON (service-area polygon and hotspots) for latitude/longitude columns')
+    parser.add_argument('--address-skew', type=float, default=0.7,
+                        help='Zipf exponent of address popularity; 0 for uniform (default: 0.7)')
+    parser.add_argument('--address-classes', type=str, default='',
+                        help='Address class JSON (shelters, bars, ... and the call types they attract)')
+    parser.add_argument('--event-stream-file', type=str, default='',
+                        help='Also write a time-ordered status log (one row per status change) to this CSV file')
 
     args = parser.parse_args()
 
@@ -189,6 +246,63 @@ def generate_data_cli():
             print(f"Error: {str(e)}")
             return
 
+    # Add call-type catalog options if specified
+    if args.catalog:
+        try:
+            cmd.extend(["--catalog", sanitize_input(args.catalog)])
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            return
+    if args.translate:
+        cmd.append("--translate")
+    if args.clusters:
+        cmd.extend(["--clusters", "--cluster-ratio", str(args.cluster_ratio)])
+    if args.simulate:
+        cmd.append("--simulate")
+    if args.workload_staffing:
+        cmd.append("--workload-staffing")
+    cmd.extend(["--address-skew", str(args.address_skew)])
+    if args.layout != "flat":
+        cmd.extend(["--layout", args.layout])
+    if args.format:
+        cmd.extend(["--format", args.format])
+    if args.compress:
+        cmd.extend(["--compress", args.compress])
+    if args.eido_per_incident:
+        cmd.append("--eido-per-incident")
+    cmd.extend(["--parquet-compression", args.parquet_compression, "--row-group-size", str(args.row_group_size)])
+
+    # Add call-type filters and the optional input/output files if specified
+    for flag, value in (("--problems", args.problems), ("--priorities", args.priorities),
+                        ("--agency-registry", args.agency_registry), ("--units-file", args.units_file),
+                        ("--arrival-profile", args.arrival_profile),
+                        ("--distribution-profile", args.distribution_profile),
+                        ("--utilization-file", args.utilization_file),
+                        ("--address-source", args.address_source),
+                        ("--geo-profile", args.geo_profile),
+                        ("--address-classes", args.address_classes),
+                        ("--event-stream-file", args.event_stream_file),
+                        ("--partition-by", args.partition_by),
+                        ("--ali-layout", args.ali_layout)):
+        if value:
+            try:
+                cmd.extend([flag, sanitize_input(value)])
+            except ValueError as e:
+                print(f"Error: {str(e)}")
+                return
+    for term in args.address_weight:
+        try:
+            cmd.extend(["--address-weight", sanitize_input(term)])
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            return
+    for target in args.output:
+        try:
+            cmd.extend(["--output", sanitize_input(target)])
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            return
+
     # Run the command
     print("\nStarting data generation...")
     print(f"Number of records: {args.num_records}")
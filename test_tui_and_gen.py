@@ -48,3 +48,505 @@ def test_generate_911_data_disposition_logic():
     # "ARREST MADE" can appear for LAW
     law_dispositions = df.filter(pl.col("agency") == "LAW")["disposition"].unique()
     assert "ARREST MADE" in law_dispositions or len(law_dispositions) > 0
+
+def test_generate_911_data_catalog_translation():
+    from synth911gen import DEFAULT_CATALOG
+    df, _, _ = generate_911_data(num_records=200, locale="fr_CA", translate=True)
+    translated = set(DEFAULT_CATALOG.translated_names("fr"))
+    assert set(df["problem"].cast(pl.Utf8).unique().to_list()).issubset(translated)
+    # Priorities still follow the original call type codes
+    codes = df["problem"].to_physical().to_numpy()
+    assert (df["priority_number"].to_numpy() == DEFAULT_CATALOG.priorities[codes]).all()
+
+def test_generate_911_data_targeted_problems():
+    df, _, _ = generate_911_data(num_records=300, problems=["CARDIAC ARREST ALS"])
+    assert len(df) == 300
+    assert df["problem"].cast(pl.Utf8).unique().to_list() == ["CARDIAC ARREST ALS"]
+    assert df["agency"].unique().to_list() == ["EMS"]
+    df, _, _ = generate_911_data(num_records=300, priorities=[1], selected_agencies=["LAW", "FIRE"])
+    assert len(df) == 300
+    assert df["priority_number"].unique().to_list() == [1]
+
+def test_generate_911_data_agency_registry():
+    df, call_taker_names, _ = generate_911_data(
+        num_records=500, agency_registry="data/example_region.json"
+    )
+    assert set(call_taker_names) == {"NORTH", "SOUTH"}
+    assert all(len(names) == 6 for names in call_taker_names["SOUTH"].values())
+    assert set(df["psap"].unique().to_list()).issubset({"NORTH", "SOUTH"})
+    # call_ids are sequential per agency in event_time order
+    for agency, group in df.group_by("agency"):
+        numbers = group["call_id"].str.slice(6).cast(pl.Int64)
+        assert (numbers.diff().drop_nulls() == 1).all()
+        south = group["psap"][0] == "SOUTH"
+        assert set(group["call_taker"].unique().to_list()).issubset(
+            {name for names in call_taker_names["SOUTH" if south else "NORTH"].values() for name in names}
+        )
+
+def test_star_schema_round_trip(tmp_path):
+    from shared.agencies import default_registry
+    from shared.star_schema import build_star_schema, write_star_schema
+    from synth911gen import DEFAULT_CATALOG
+    registry = default_registry(DEFAULT_CATALOG)
+    df, call_takers, dispatchers = generate_911_data(
+        num_records=300, agency_registry=registry, format_timestamps=False
+    )
+    tables = build_star_schema(df, call_takers, dispatchers, DEFAULT_CATALOG, registry)
+    fact = tables["fact_calls"]
+    assert fact.height == 300 and fact.null_count().sum_horizontal().item() == 0
+    rebuilt = (
+        fact.join(tables["dim_call_type"], on="call_type_key")
+        .join(tables["dim_staff"].rename({"name": "call_taker"}), left_on="call_taker_key", right_on="staff_key")
+        .sort("call_id")
+    )
+    expected = df.sort("call_id")
+    assert rebuilt["problem"].to_list() == expected["problem"].cast(pl.Utf8).to_list()
+    assert rebuilt["call_taker"].to_list() == expected["call_taker"].to_list()
+    paths = write_star_schema(tables, tmp_path / "star")
+    assert len(paths) == 7 and all(path.exists() for path in paths)
+
+def test_generate_units_child_table():
+    from shared.agencies import default_registry
+    from shared.units import generate_units
+    from synth911gen import DEFAULT_CATALOG
+    registry = default_registry(DEFAULT_CATALOG)
+    df, _, _ = generate_911_data(num_records=400, agency_registry=registry)
+    units = generate_units(df, registry)
+    counts = units.group_by("call_id").len()
+    assert counts.height == 400 and counts["len"].min() >= 1
+    # The first unit of each call carries the call's own timeline
+    first = units.filter(pl.col("unit_seq") == 1).join(df, on="call_id")
+    assert (first["time_unit_cleared"].dt.strftime("%Y-%m-%d %H:%M:%S") == first["time_call_closed"]).all()
+    assert (units["time_unit_cleared"] > units["time_unit_dispatched"]).all()
+    # Unit numbers stay inside the default fleet of 40 and differ within a call
+    numbers = units["unit_id"].str.split("-").list.last().cast(pl.Int64)
+    assert numbers.is_between(1, 40).all()
+    assert (units.group_by("call_id").agg(pl.col("unit_id").n_unique(), pl.len())
+            .select((pl.col("unit_id") == pl.col("len")).all()).item())
+
+def test_arrival_profile_shapes_event_times():
+    import numpy as np
+    from datetime import datetime
+    from shared.arrivals import ArrivalProfile, arrival_offsets
+    # All calls between 17:00 and 18:00, doubled on the holiday
+    hour_of_week = np.zeros(168)
+    hour_of_week[17::24] = 1.0
+    profile = ArrivalProfile(hour_of_week, holidays={"2024-03-02": 2.0})
+    offsets = arrival_offsets(datetime(2024, 3, 1), datetime(2024, 3, 4), 6000, np.random.default_rng(7), profile)
+    assert (np.diff(offsets) >= 0).all()
+    assert set(((offsets // 3600) % 24).tolist()) == {17}
+    per_day = np.bincount(offsets // 86400, minlength=3)
+    assert per_day[1] > 1.5 * per_day[0] and per_day[1] > 1.5 * per_day[2]
+    df, _, _ = generate_911_data(num_records=200, arrival_profile=profile, format_timestamps=False)
+    assert df["event_time"].is_sorted() and (df["hour"] == 17).all()
+
+def test_priority_conditioned_durations():
+    from shared.agencies import Agency, AgencyRegistry
+    from synth911gen import DEFAULT_CATALOG
+    df, _, _ = generate_911_data(num_records=5000)
+    means = df.group_by("priority_number").agg(pl.col("process_time", "enroute_time").mean())
+    p1 = means.filter(pl.col("priority_number") == 1)
+    p5 = means.filter(pl.col("priority_number") == 5)
+    assert p1["process_time"].item() < p5["process_time"].item()
+    assert p1["enroute_time"].item() < p5["enroute_time"].item()
+    # Registry entries can override the scale factors of a column
+    registry = AgencyRegistry([
+        Agency("EMS", "EMS", "M", duration_scales={"on_scene_time": [2.0, 2.0, 2.0, 2.0, 2.0]})
+    ], DEFAULT_CATALOG)
+    df, _, _ = generate_911_data(num_records=500, agency_registry=registry)
+    assert df["on_scene_time"].min() >= 600
+
+def test_distribution_profile_override(tmp_path):
+    import json
+    import numpy as np
+    from shared.distributions import compile_spec, load_distribution_profile
+    profile_path = tmp_path / "profile.json"
+    profile_path.write_text(json.dumps({"columns": {
+        "phone_time": {"type": "empirical", "quantiles": [10, 20, 30]},
+        "queue_time": {"type": "truncated", "min": 5, "max": 8, "mode": "resample",
+                       "base": {"type": "parametric", "family": "uniform", "low": 0, "high": 10}},
+    }}))
+    profile = load_distribution_profile(profile_path)
+    assert set(profile.samplers) >= {"phone_time", "queue_time", "enroute_time"}
+    df, _, _ = generate_911_data(num_records=401, distribution_profile=profile)
+    assert df["phone_time"].is_between(10, 30).all()
+    # Mixtures fill every row, whatever the component weights
+    mixture = compile_spec({"type": "mixture", "components": [
+        {"type": "parametric", "family": "exponential", "scale": 1, "weight": 0.8},
+        {"type": "parametric", "family": "gamma", "shape": 2, "scale": 1, "weight": 0.2},
+    ]})
+    assert len(mixture(np.random.default_rng(), 401)) == 401
+
+def test_units_follow_distribution_profile(tmp_path, monkeypatch):
+    import json
+    import sys
+    import synth911gen
+    profile_path = tmp_path / "profile.json"
+    profile_path.write_text(json.dumps({"columns": {
+        "unit_stagger": {"type": "empirical", "quantiles": [500, 600]},
+    }}))
+    output, units_file = tmp_path / "calls.parquet", tmp_path / "units.csv"
+    monkeypatch.setattr(synth911gen, "PYINQUIRER_AVAILABLE", False)
+    monkeypatch.setattr(sys, "argv", [
+        "synth911gen.py", "-n", "300", "-o", str(output), "--units-file", str(units_file),
+        "--distribution-profile", str(profile_path),
+    ])
+    synth911gen.main()
+    calls = pl.read_parquet(output).select("call_id", "time_call_dispatched")
+    units = pl.read_csv(units_file, try_parse_dates=True).join(calls, on="call_id")
+    stagger = (units["time_unit_dispatched"] - units["time_call_dispatched"]).dt.total_seconds()
+    later = units["unit_seq"] > 1
+    assert later.any()
+    assert stagger.filter(later).is_between(500, 600).all()
+    assert (stagger.filter(~later) == 0).all()
+
+def test_clustered_incidents():
+    from datetime import datetime
+    from shared.clusters import ClusterModel
+    df, _, _ = generate_911_data(num_records=3000, clusters=ClusterModel(branching_ratio=0.8))
+    assert len(df) == 3000 and df["event_time"].is_sorted()
+    incidents = df.group_by("incident_id").agg(
+        pl.len(), pl.col("address").n_unique(), pl.col("agency").n_unique(), pl.col("call_id").first()
+    )
+    assert incidents["len"].max() > 1
+    assert (incidents["address"] == 1).all() and (incidents["agency"] == 1).all()
+    # The incident is named after its first call
+    assert (incidents["call_id"] == incidents["incident_id"]).all()
+    # Follow-up calls keep a related call type: same discipline (agency) and priority
+    assert (df.group_by("incident_id").agg(pl.col("priority_number").n_unique())["priority_number"] == 1).all()
+    # Follow-up calls past the end of the range are dropped rather than piled onto its last second
+    df, _, _ = generate_911_data(num_records=2000, start_date="2024-03-01", end_date="2024-03-02",
+                                 clusters=ClusterModel(branching_ratio=0.9, decay=20000), format_timestamps=False)
+    assert df["event_time"].max() < datetime(2024, 3, 3)
+    assert df.group_by("event_time").len()["len"].max() <= 3
+
+def test_simulated_unit_availability():
+    import numpy as np
+    from shared.agencies import Agency, AgencyRegistry
+    from shared.simulation import simulate_dispatch
+    from synth911gen import DEFAULT_CATALOG
+    # One unit: the P1 call that arrives last is served before the waiting P5 call
+    waits = simulate_dispatch(
+        np.array([0, 1, 2]), np.array([5, 5, 1]), np.zeros(3, dtype=np.int64),
+        np.array([10, 10, 10]), np.array([1]),
+    )
+    assert waits.tolist() == [0, 19, 8]
+    registry = AgencyRegistry([Agency("EMS", "EMS", "M", units=2)], DEFAULT_CATALOG)
+    df, _, _ = generate_911_data(
+        num_records=300, start_date="2024-03-01", end_date="2024-03-08",
+        agency_registry=registry, simulate=True,
+    )
+    assert df["queue_time"].max() > 600
+    # With workload staffing too, no agency ever has more calls between queued and closed
+    # than it has units, even when a busy shared dispatcher delays the dispatch
+    registry = AgencyRegistry(
+        [Agency("EMS", "EMS", "M", units=3), Agency("FIRE", "FIRE", "F", units=3)], DEFAULT_CATALOG
+    )
+    df, _, _ = generate_911_data(
+        num_records=3000, start_date="2024-03-01", end_date="2024-03-02", num_names=1,
+        agency_registry=registry, simulate=True, workload_staffing=True, format_timestamps=False,
+    )
+    events = pl.concat([
+        df.select("agency", pl.col("time_call_queued").alias("time"), pl.lit(1).alias("change")),
+        df.select("agency", pl.col("time_call_closed").alias("time"), pl.lit(-1).alias("change")),
+    ]).sort("agency", "time", "change")
+    in_progress = events.select(pl.col("change").cum_sum().over("agency"))["change"]
+    assert in_progress.max() <= 3
+
+def test_workload_staffing():
+    import numpy as np
+    from shared.staffing import assign_positions, staff_utilization
+    # Two positions, three overlapping calls: the third waits for the first position to clear
+    positions, waits = assign_positions(
+        np.array([0, 5, 10]), np.array([20, 100, 10]), np.zeros(3, dtype=np.int64),
+        np.array([2]), np.random.default_rng(0),
+    )
+    assert positions[0] != positions[1] and positions[2] == positions[0]
+    assert waits.tolist() == [0, 0, 10]
+    df, _, _ = generate_911_data(num_records=2000, num_names=2, workload_staffing=True, format_timestamps=False)
+    assert df["call_taker"].null_count() == 0 and df["dispatcher"].null_count() == 0
+    utilization = staff_utilization(df)
+    assert set(utilization["role"].unique()) == {"CALL TAKER", "DISPATCHER"}
+    assert utilization["calls"].sum() == 2 * len(df)
+
+def test_address_source_weighted_sampling(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    address_file = tmp_path / "addresses.csv"
+    pl.DataFrame({
+        "Full_Address": ["1 MAIN ST", "2 MAIN ST", "3 OAK AVE", "4 OAK AVE"],
+        "Lat": [35.1, 35.2, 35.3, 35.4],
+        "Lon": [-80.1, -80.2, -80.3, -80.4],
+        "population": [0, 5, 5, 5],
+        "land_use": ["RES", "RES", "COM", "IND"],
+    }).write_csv(address_file)
+    df, _, _ = generate_911_data(
+        num_records=1000, address_source=str(address_file),
+        address_weights=["population", "land_use:IND:0"],
+    )
+    assert set(df["address"].unique().to_list()) == {"2 MAIN ST", "3 OAK AVE"}
+    assert df.filter(pl.col("address") == "3 OAK AVE")["latitude"].unique().to_list() == [35.3]
+    assert list((tmp_path / "cache" / "synth911gen2").glob("addresses-*.arrow"))
+
+def test_geo_hotspot_coordinates():
+    import numpy as np
+    from shared.geo import GeoModel, points_in_polygon
+    triangle = [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]]
+    model = GeoModel(triangle, grid=(20, 20), base=0.0, hotspots=[
+        {"center": [0.2, 0.2], "radius_km": 2.0, "weight": 1.0, "hours": [3]},
+        {"center": [0.6, 0.1], "radius_km": 2.0, "weight": 1.0, "agencies": ["FIRE"]},
+    ])
+    rng = np.random.default_rng(3)
+    lats, lons = model.sample(np.zeros(2000, dtype=np.int64), np.full(2000, 3), rng, ["LAW", "FIRE"])
+    assert points_in_polygon(lons, lats, model.polygon).all()
+    assert np.hypot(lons - 0.2, lats - 0.2).max() < 0.15
+    # The FIRE-only hotspot applies to FIRE at any hour
+    lats, lons = model.sample(np.ones(500, dtype=np.int64), np.full(500, 12), rng, ["LAW", "FIRE"])
+    assert np.hypot(lons - 0.6, lats - 0.1).max() < 0.15
+    df, _, _ = generate_911_data(num_records=200, geo_model="data/example_geo.json")
+    assert df["latitude"].is_between(35.0, 35.43).all() and df["longitude"].is_between(-80.08, -79.58).all()
+
+def test_address_popularity_and_affinity():
+    import numpy as np
+    from shared.addresses import AddressModel
+    from shared.catalog import load_catalog
+    catalog = load_catalog()
+    rng = np.random.default_rng(5)
+    model = AddressModel(np.ones(1000), catalog, rng, skew=1.0, classes={
+        "BAR": {"share": 0.01, "weight": 1.0, "affinity": {"DISORDERLY CONDUCT": 1e5}},
+    })
+    bars = model._members[1]
+    fights = model.sample(np.full(2000, catalog.index["DISORDERLY CONDUCT"]), rng)
+    assert np.isin(fights, bars).mean() > 0.8
+    # Zipf popularity: the ten busiest addresses take far more than 1% of the calls
+    rows = model.sample(np.full(20000, catalog.index["TRAFFIC STOP"]), rng)
+    assert np.sort(np.bincount(rows, minlength=1000))[-10:].sum() > 0.1 * len(rows)
+    df, _, _ = generate_911_data(num_records=500, address_skew=0.0, address_classes={})
+    assert df["address"].n_unique() > 100
+
+def test_event_stream_is_time_ordered(tmp_path):
+    from shared.event_stream import iter_status_events, write_event_stream
+    df, _, _ = generate_911_data(num_records=300)
+    batches = list(iter_status_events(df, batch_size=37))
+    events = pl.concat(batches)
+    assert len(events) == 7 * len(df)
+    assert events["status_time"].is_sorted()
+    first = events.filter(pl.col("call_id") == df["call_id"][0])
+    assert first["status"].cast(pl.Utf8).to_list()[0] == "CREATED"
+    path = tmp_path / "events.csv"
+    assert write_event_stream(df, path, batch_size=50) == len(events)
+    assert pl.read_csv(path).columns[:3] == ["call_id", "status", "status_time"]
+
+def test_streaming_parquet_writer(tmp_path):
+    import pyarrow.parquet as pq
+    from shared.writers import write_batches
+    df, _, _ = generate_911_data(num_records=500, format_timestamps=False)
+    path = tmp_path / "calls.parquet"
+    assert write_batches(df, path, batch_size=200, compression="lz4") == 500
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_row_groups == 3
+    assert metadata.row_group(0).column(0).compression == "LZ4"
+    back = pl.read_parquet(path)
+    assert back.schema["event_time"] == pl.Datetime("us") and isinstance(back.schema["agency"], pl.Enum)
+    assert back.equals(df)
+
+def test_hive_partitioned_output(tmp_path):
+    import json
+    from shared.writers import write_batches
+    df, _, _ = generate_911_data(num_records=400, start_date="2024-01-01", end_date="2024-03-31",
+                                 format_timestamps=False)
+    root = tmp_path / "calls"
+    write_batches(df, root, "parquet", batch_size=100, partition_by=["year", "month", "agency"], max_open=2)
+    index = json.loads((root / "year=2024" / "month=03" / "agency=LAW" / "_index.json").read_text())
+    assert index["partition"] == {"year": "2024", "month": "03", "agency": "LAW"}
+    assert len(index["files"]) >= 1 and index["files"][0]["min_event_time"].startswith("2024-03")
+    back = pl.scan_parquet(root / "**" / "*.parquet", hive_partitioning=True)
+    assert back.select(pl.len()).collect().item() == 400
+    law_march = back.filter((pl.col("month") == 3) & (pl.col("agency") == "LAW")).collect()
+    assert len(law_march) == len(df.filter((pl.col("event_time").dt.month() == 3) & (pl.col("agency") == "LAW")))
+
+def test_arrow_ipc_and_record_batch_reader(tmp_path):
+    from synth911gen import generate_911_batches
+    from shared.writers import write_batches
+    reader = generate_911_batches(batch_size=64, num_records=300)
+    batches = list(reader)
+    assert sum(batch.num_rows for batch in batches) == 300 and max(batch.num_rows for batch in batches) == 64
+    df = pl.from_arrow(batches)
+    path = tmp_path / "calls.arrow"
+    write_batches(df, path, batch_size=100)
+    mapped = pl.read_ipc(path, memory_map=True)
+    assert mapped.schema == df.schema
+    assert mapped.select(pl.all().cast(pl.Utf8)).equals(df.select(pl.all().cast(pl.Utf8)))
+
+def test_parallel_compressed_csv(tmp_path):
+    import gzip
+    from shared.writers import write_batches
+    df, _, _ = generate_911_data(num_records=400, format_timestamps=False)
+    plain = tmp_path / "calls.csv"
+    write_batches(df, plain, batch_size=90)
+    gz = tmp_path / "calls.csv.gz"
+    write_batches(df, gz, batch_size=90, workers=3)
+    with gzip.open(gz, "rb") as handle:
+        assert handle.read() == plain.read_bytes()
+    zst = tmp_path / "calls.zst"
+    write_batches(df, zst, "csv", batch_size=90, compress="zstd")
+    import pyarrow as pa
+    with pa.CompressedInputStream(pa.OSFile(str(zst)), "zstd") as handle:
+        assert handle.read() == plain.read_bytes()
+
+def test_partitioned_output_compressed_by_suffix(tmp_path, monkeypatch):
+    import gzip
+    import sys
+    import synth911gen
+    monkeypatch.setattr(synth911gen, "PYINQUIRER_AVAILABLE", False)
+    monkeypatch.setattr(sys, "argv", [
+        "synth911gen.py", "-n", "200", "-s", "2024-01-01", "-e", "2024-01-31",
+        "-o", str(tmp_path / "calls.csv.gz"), "--partition-by", "year,month,agency",
+    ])
+    synth911gen.main()
+    parts = sorted((tmp_path / "calls").rglob("part-*"))
+    assert parts and all(part.name == "part-0001.csv.gz" for part in parts)
+    assert not (tmp_path / "calls.csv").exists()
+    rows = sum(len(pl.read_csv(gzip.decompress(part.read_bytes()))) for part in parts)
+    assert rows == 200
+
+def test_streaming_csv_to_json(tmp_path, monkeypatch):
+    import gzip
+    import json
+    import serializer
+    from serializer import csv_to_json
+    df, _, _ = generate_911_data(num_records=250)
+    csv_path = tmp_path / "calls.csv"
+    df.write_csv(csv_path)
+    assert csv_to_json(csv_path, tmp_path / "calls.ndjson", chunk_size=40) == 250
+    records = [json.loads(line) for line in (tmp_path / "calls.ndjson").read_text().splitlines()]
+    assert len(records) == 250 and isinstance(records[0]["queue_time"], int)
+    assert records[0]["event_time"] == df["event_time"][0]
+    csv_to_json(csv_path, tmp_path / "calls.json", chunk_size=40)
+    array = json.loads((tmp_path / "calls.json").read_text())
+    assert array == records
+    gzipped = tmp_path / "calls.csv.gz"
+    gzipped.write_bytes(gzip.compress(csv_path.read_bytes()))
+    csv_to_json(gzipped, tmp_path / "gzipped.ndjson", chunk_size=40)
+    assert (tmp_path / "gzipped.ndjson").read_text() == (tmp_path / "calls.ndjson").read_text()
+    # Columns that change type after the inferred head are widened instead of aborting
+    monkeypatch.setattr(serializer, "SCHEMA_INFERENCE_ROWS", 3)
+    mixed = tmp_path / "mixed.csv"
+    mixed.write_text("count,note\n" + "1,\n" * 3000 + "4.5,\nmany,late\n")
+    assert serializer.csv_to_json(mixed, tmp_path / "mixed.ndjson", chunk_size=500) == 3002
+    records = [json.loads(line) for line in (tmp_path / "mixed.ndjson").read_text().splitlines()]
+    assert records[0]["count"] == 1 and records[-2]["count"] == "4.5" and records[-1]["count"] == "many"
+    assert records[-1]["note"] == "late"
+    # A failed conversion leaves no truncated file behind
+    ragged = tmp_path / "ragged.csv"
+    ragged.write_text("a,b\n" + "1,2\n" * 5 + "1,2,3\n")
+    with pytest.raises(pl.exceptions.PolarsError):
+        serializer.csv_to_json(ragged, tmp_path / "ragged.json", chunk_size=2)
+    assert not (tmp_path / "ragged.json").exists()
+
+def test_sqlite_bulk_loader(tmp_path):
+    import sqlite3
+    from shared.writers import write_batches
+    df, _, _ = generate_911_data(num_records=300, format_timestamps=False)
+    path = tmp_path / "calls.db"
+    assert write_batches(df, path, batch_size=120) == 300
+    connection = sqlite3.connect(path)
+    count, first, queue = connection.execute(
+        "SELECT COUNT(*), MIN(event_time), typeof(queue_time) FROM calls"
+    ).fetchone()
+    indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    connection.close()
+    assert count == 300 and queue == "integer"
+    assert first == df["event_time"].min().strftime("%Y-%m-%d %H:%M:%S")
+    assert indexes == {"idx_calls_event_time", "idx_calls_agency", "idx_calls_call_id"}
+
+def test_eido_documents(tmp_path):
+    import json
+    from shared.agencies import default_registry
+    from shared.catalog import load_catalog
+    from shared.units import generate_units
+    from shared.writers import write_batches, write_outputs
+    df, _, _ = generate_911_data(num_records=200, format_timestamps=False)
+    units = generate_units(df, default_registry(load_catalog()))
+    path = tmp_path / "calls.ndjson"
+    write_batches(df, path, "eido", batch_size=64, units=units)
+    documents = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(documents) == 200
+    first = documents[0]
+    assert set(first) == {"incident", "call", "location", "units", "dispositions"}
+    assert first["call"]["id"] == df["call_id"][0] and first["location"]["address"] == df["address"][0]
+    assert len(first["units"]) == len(units.filter(pl.col("call_id") == df["call_id"][0]))
+    assert first["dispositions"][0]["code"] == df["disposition"].cast(pl.Utf8)[0]
+    write_outputs(df, [f"eido:{tmp_path / 'incidents.ndjson'}"], batch_size=64, per_incident=True)
+    assert len(list((tmp_path / "incidents").glob("*.ndjson"))) == 200
+
+def test_ali_fixed_width_records(tmp_path):
+    from shared.ali import encode_records
+    from shared.writers import write_batches
+    df, _, _ = generate_911_data(num_records=150, format_timestamps=False)
+    layout = {"terminator": "\n", "fields": [
+        {"name": "class", "width": 4, "column": "call_reception", "map": {"E-911": "WPH2"}},
+        {"name": "address", "width": 10, "column": "address"},
+        {"name": "priority", "width": 3, "column": "priority_number", "align": "right", "fill": "0"},
+        {"name": "callback", "width": 14, "column": "callback_number"},
+    ]}
+    records = encode_records(df, layout)
+    assert (records.str.len_chars() == 31).all()
+    assert records[0][4:14] == df["address"][0][:10].ljust(10)
+    assert records[0][14:17] == f"{df['priority_number'][0]:03d}"
+    path = tmp_path / "ali.txt"
+    write_batches(df, path, "ali", batch_size=40, layout=layout)
+    lines = path.read_text().splitlines()
+    assert len(lines) == 150 and lines == records.to_list()
+    # Call-back numbers depend only on the call_id, never on the polars hash
+    callbacks = encode_records(pl.DataFrame({"call_id": ["24-L000123", "24-L000124", "24-F000123"]}),
+                               {"fields": [{"name": "callback", "width": 14, "column": "callback_number"}]})
+    assert callbacks.to_list() == ["(555) 720-5601", "(555) 457-4388", "(555) 940-7347"]
+    assert encode_records(df, layout).str.slice(17).n_unique() == 150
+
+def test_extract_pushes_down_filters(tmp_path):
+    from extract import extract
+    from shared.writers import write_batches
+    df, _, _ = generate_911_data(num_records=600, start_date="2024-01-01", end_date="2024-02-29",
+                                 format_timestamps=False)
+    expected = df.filter(
+        (pl.col("agency") == "LAW") & (pl.col("event_time").dt.month() == 2) & pl.col("priority_number").is_in([1, 2])
+    ).select("address", "problem", "priority_number")
+    for name in ("calls.csv", "calls.parquet"):
+        source = tmp_path / name
+        write_batches(df, source, batch_size=250)
+        output = tmp_path / f"subset-{name}"
+        count = extract(source, output, columns=["address", "problem", "priority_number"], agencies=["LAW"],
+                        start_date="2024-02-01", end_date="2024-02-29", priorities=["1", "2"])
+        assert count == len(expected)
+        subset = pl.read_csv(output) if name.endswith(".csv") else pl.read_parquet(output)
+        assert subset["address"].to_list() == expected["address"].to_list()
+    # Partitioned datasets: parts outside the date range are never opened, so a corrupt one is harmless
+    for file_format, options in (("parquet", {}), ("csv", {"compress": "gzip"})):
+        source = tmp_path / f"dataset-{file_format}"
+        write_batches(df, source, file_format, batch_size=250, partition_by=["year", "month", "agency"], **options)
+        for part in (source / "year=2024" / "month=01").rglob("part-*"):
+            part.write_bytes(b"corrupt")
+        output = tmp_path / f"subset-{file_format}.csv"
+        count = extract(source, output, columns=["address", "problem", "priority_number"], agencies=["LAW"],
+                        start_date="2024-02-01", end_date="2024-02-29", priorities=["1", "2"])
+        assert count == len(expected)
+        assert sorted(pl.read_csv(output)["address"].to_list()) == sorted(expected["address"].to_list())
+
+
+def test_fan_out_to_several_outputs(tmp_path):
+    import sqlite3
+    from shared.writers import parse_target, write_outputs
+    df, _, _ = generate_911_data(num_records=500, start_date="2024-01-01", end_date="2024-01-31",
+                                 format_timestamps=False)
+    targets = [str(tmp_path / "calls.csv"), str(tmp_path / "calls.parquet"),
+               str(tmp_path / "calls.ndjson"), f"csv:{tmp_path / 'calls.txt'}", str(tmp_path / "calls.sqlite")]
+    assert parse_target(targets[3]) == ("csv", str(tmp_path / "calls.txt"))
+    assert parse_target("C:/calls.parquet") == ("parquet", "C:/calls.parquet")
+    assert write_outputs(df, targets, batch_size=128) == 500
+    expected = df["call_id"].to_list()
+    assert pl.read_csv(tmp_path / "calls.csv")["call_id"].to_list() == expected
+    assert pl.read_csv(tmp_path / "calls.txt")["call_id"].to_list() == expected
+    assert pl.read_parquet(tmp_path / "calls.parquet")["call_id"].to_list() == expected
+    assert pl.read_ndjson(tmp_path / "calls.ndjson")["call_id"].to_list() == expected
+    with sqlite3.connect(tmp_path / "calls.sqlite") as connection:
+        assert [row[0] for row in connection.execute("SELECT call_id FROM calls ORDER BY rowid")] == expected